@@ -0,0 +1,137 @@
+"""
+Employee document helpers shared by the Function App and the maintenance scripts.
+Pure Python - no Azure SDK imports, so scripts can reuse it without the Functions runtime.
+"""
+import re
+import unicodedata
+import uuid
+from datetime import datetime
+
+# Container partition key path is /departmentId (see cosmosDb.tf)
+PARTITION_KEY_FIELD = "departmentId"
+
+# Partition used for employees without a usable department name
+UNASSIGNED_DEPARTMENT_ID = "unassigned"
+
+# Fields every new employee must carry
+REQUIRED_FIELDS = ["firstName", "lastName", "email", "department"]
+
+_NON_SLUG_CHARS = re.compile(r"[^a-z0-9]+")
+
+
+def derive_department_id(department):
+    """Stable partition key for a department name, e.g. "R&D Europe" -> "r-d-europe"
+
+    The same name always maps to the same id, regardless of case, accents or
+    surrounding whitespace, so every write for a department lands in one
+    logical partition.
+    """
+    if not isinstance(department, str):
+        return UNASSIGNED_DEPARTMENT_ID
+    normalized = unicodedata.normalize("NFKD", department).encode("ascii", "ignore").decode("ascii")
+    slug = _NON_SLUG_CHARS.sub("-", normalized.lower()).strip("-")
+    return slug or UNASSIGNED_DEPARTMENT_ID
+
+
+# Properties Cosmos DB adds to every document
+SYSTEM_PROPERTIES = ("_rid", "_self", "_etag", "_attachments", "_ts")
+
+
+# Precomputed, indexed search field (see build_search_tokens)
+SEARCH_TOKENS_FIELD = "searchTokens"
+SEARCHABLE_FIELDS = ("firstName", "lastName", "email")
+
+# Longest prefix stored per word; longer search terms are cut to this length
+MAX_PREFIX_LENGTH = 20
+
+# Words of a search box entry that are matched (all must match)
+MAX_SEARCH_TERMS = 5
+
+_WORD_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_search_text(text):
+    """Lowercase ASCII form used for both stored tokens and search terms"""
+    if not isinstance(text, str):
+        return ""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def search_words(text):
+    """Words of a name or email address, e.g. "am.obrien@contoso.com" -> am, obrien, contoso, com"""
+    return [word for word in _WORD_SEPARATORS.split(normalize_search_text(text)) if word]
+
+
+def build_search_tokens(employee):
+    """Prefixes of every word in the searchable fields, e.g. "Ann" -> a, an, ann
+
+    Stored on the document so searches are indexed ARRAY_CONTAINS lookups
+    instead of CONTAINS(LOWER(...)) scans.
+    """
+    tokens = set()
+    for field in SEARCHABLE_FIELDS:
+        for word in search_words(employee.get(field)):
+            tokens.update(word[:length] for length in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1))
+    return sorted(tokens)
+
+
+def search_terms(search):
+    """Distinct search box words, cut to the stored prefix length"""
+    terms = []
+    for word in search_words(search):
+        term = word[:MAX_PREFIX_LENGTH]
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+
+def search_rank(employee, terms):
+    """Relevance of a matching employee for search terms (higher is better)"""
+    score = 0
+    names = [normalize_search_text(employee.get(field)) for field in ("lastName", "firstName")]
+    email = normalize_search_text(employee.get("email"))
+    for term in terms:
+        if term in names:
+            score += 4  # Whole first or last name
+        elif any(name.startswith(term) for name in names):
+            score += 3
+        elif email.startswith(term):
+            score += 2
+        else:
+            score += 1  # Matched a later word of a name or the email
+    return score
+
+
+def strip_system_properties(document):
+    """Copy of a document without Cosmos DB system properties"""
+    return {k: v for k, v in document.items() if k not in SYSTEM_PROPERTIES}
+
+
+def missing_required_field(body):
+    """Name of the first required field missing from a request body, or None"""
+    for field in REQUIRED_FIELDS:
+        if field not in body:
+            return field
+    return None
+
+
+def build_employee(body, employee_id=None):
+    """New employee document from a validated request body"""
+    now = datetime.utcnow()
+    employee = {
+        "id": employee_id or str(uuid.uuid4()),
+        "firstName": body["firstName"],
+        "lastName": body["lastName"],
+        "email": body["email"],
+        "department": body["department"],
+        "departmentId": derive_department_id(body["department"]),
+        "position": body.get("position", ""),
+        "phone": body.get("phone", ""),
+        "hireDate": body.get("hireDate", now.strftime("%Y-%m-%d")),
+        "salary": body.get("salary", 0),
+        "isActive": True,
+        "createdAt": now.isoformat(),
+        "updatedAt": now.isoformat()
+    }
+    employee[SEARCH_TOKENS_FIELD] = build_search_tokens(employee)
+    return employee
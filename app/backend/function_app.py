@@ -3,61 +3,1369 @@ Azure Function App - Employee Management API
 Backend for the DTE Employee Management System
 """
 import azure.functions as func
+import asyncio
+import contextlib
+import contextvars
+import csv
+import functools
+import inspect
+import io
 import json
 import logging
+import base64
+import gzip
+import hashlib
+import importlib
+import math
 import os
-import uuid
-from datetime import datetime
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from urllib.parse import urlencode
 
 app = func.FunctionApp(http_auth_level=func.AuthLevel.ANONYMOUS)
 
-# Cosmos DB connection (using Azure SDK)
-from azure.cosmos import CosmosClient, PartitionKey, exceptions
 
-def get_cosmos_client():
-    """Get Cosmos DB client using endpoint and key from environment"""
+class LazyModule:
+    """Module proxy that imports the module on first attribute access"""
+    
+    def __init__(self, name):
+        self._name = name
+    
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+
+# Cosmos DB connection (using Azure SDK). azure.cosmos and azure.identity are
+# heavy, so they load on first use - health checks and CORS preflights never
+# pay for them. except clauses are only evaluated once an exception is raised.
+exceptions = LazyModule("azure.cosmos.exceptions")
+
+from employee_model import (
+    PARTITION_KEY_FIELD,
+    SEARCH_TOKENS_FIELD,
+    SEARCHABLE_FIELDS,
+    build_employee,
+    build_search_tokens,
+    derive_department_id,
+    missing_required_field,
+    normalize_search_text,
+    search_rank,
+    search_terms,
+    strip_system_properties,
+)
+
+# ============================================================================
+# Cosmos client pool - one long-lived client per worker process
+# ============================================================================
+# CosmosClientMode=async uses azure.cosmos.aio; sync runs the blocking client on worker threads
+COSMOS_CLIENT_MODE = os.environ.get("CosmosClientMode", "async").strip().lower()
+
+_client_lock = threading.Lock()
+_clients = {}
+_container_cache = {}
+_client_stats = {"created": 0, "reused": 0, "rebuilt": 0, "auth_resets": 0, "auth_resets_skipped": 0}
+_last_auth_reset = 0.0
+
+# Errors that mean the current credentials are no longer accepted: every 401, and only the
+# 403 sub-status for a failed AAD credential grant. Other 403s (firewall/VNet, write-forbidden
+# during failover, missing RBAC permission) are not fixed by a new client.
+AUTH_ERROR_STATUS_CODES = (401,)
+CREDENTIAL_FORBIDDEN_SUBSTATUS_CODES = (5000,)
+
+# At most one auth-triggered client reset per this many seconds
+AUTH_RESET_MIN_INTERVAL = float(os.environ.get("CosmosAuthResetMinIntervalSeconds", "30"))
+
+# Seconds to keep a replaced aio client open so in-flight requests can finish
+RETIRED_CLIENT_CLOSE_DELAY = 30
+
+
+def get_credential_fingerprint():
+    """Fingerprint of the credential settings, used to detect rotation"""
+    digest = hashlib.sha256()
+    for name in ("CosmosDbConnectionString", "CosmosDbEndpoint", "CosmosDbKey"):
+        digest.update(os.environ.get(name, "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def build_cosmos_client(use_async=False):
+    """Build a new Cosmos DB client using endpoint and key from environment"""
     endpoint = os.environ.get("CosmosDbEndpoint")
     key = os.environ.get("CosmosDbKey")
     connection_string = os.environ.get("CosmosDbConnectionString")
+    if use_async:
+        from azure.cosmos.aio import CosmosClient as client_class
+    else:
+        from azure.cosmos import CosmosClient as client_class
+    # Let the SDK retry a throttled request once, quickly; execute_cosmos_operation owns the rest
+    retry_kwargs = {"retry_throttle_total": COSMOS_SDK_THROTTLE_RETRIES, "retry_throttle_backoff_max": 1}
     
-    # Debug logging
+    # Debug logging (only when a client is actually built)
     logging.info(f"Cosmos DB endpoint: {endpoint}")
     logging.info(f"Cosmos DB key exists: {bool(key)}")
     logging.info(f"Cosmos DB connection string exists: {bool(connection_string)}")
     
     # Try connection string first (most reliable)
     if connection_string:
-        return CosmosClient.from_connection_string(connection_string)
+        return client_class.from_connection_string(connection_string, **retry_kwargs)
     
     # Try endpoint + key
     if endpoint and key:
-        return CosmosClient(endpoint, key)
+        return client_class(endpoint, key, **retry_kwargs)
     
     # Try managed identity as fallback
     if endpoint:
         try:
-            from azure.identity import DefaultAzureCredential
+            if use_async:
+                from azure.identity.aio import DefaultAzureCredential
+            else:
+                from azure.identity import DefaultAzureCredential
             credential = DefaultAzureCredential()
-            return CosmosClient(endpoint, credential=credential)
+            return client_class(endpoint, credential=credential, **retry_kwargs)
         except Exception as e:
             logging.error(f"Managed identity failed: {str(e)}")
     
-    raise Exception("No valid Cosmos DB credentials found. Please check CosmosDbConnectionString, CosmosDbEndpoint, or CosmosDbKey environment variables.")
+    raise Exception("No valid Cosmos DB credentials found. Please check CosmosDbConnectionString, CosmosDbEndpoint, or CosmosDbKey environment variables.")
+
+
+def retire_cosmos_client(client):
+    """Close a replaced aio client once in-flight requests have had time to finish"""
+    if not inspect.iscoroutinefunction(getattr(client, "close", None)):
+        return  # Sync clients hold no sockets that need an explicit close
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.call_later(RETIRED_CLIENT_CLOSE_DELAY, lambda: loop.create_task(client.close()))
+
+
+def get_cosmos_client(use_async=False):
+    """Get the process-wide Cosmos DB client, building it lazily on first use"""
+    mode = "async" if use_async else "sync"
+    fingerprint = get_credential_fingerprint()
+    # aio clients are bound to the event loop that created them
+    loop = asyncio.get_running_loop() if use_async else None
+    
+    # Fast path - no lock needed once the client exists
+    entry = _clients.get(mode)
+    if entry is not None and entry[1:] == (fingerprint, loop):
+        _client_stats["reused"] += 1
+        return entry[0]
+    
+    with _client_lock:
+        # Another thread may have built the client while we waited
+        entry = _clients.get(mode)
+        if entry is not None and entry[1:] == (fingerprint, loop):
+            _client_stats["reused"] += 1
+            return entry[0]
+        
+        if entry is not None:
+            logging.info("Cosmos DB credentials changed, rebuilding client")
+            _client_stats["rebuilt"] += 1
+            retire_cosmos_client(entry[0])
+        
+        client = build_cosmos_client(use_async)
+        _clients[mode] = (client, fingerprint, loop)
+        for cache_key in [k for k in _container_cache if k[0] == mode]:
+            del _container_cache[cache_key]
+        _client_stats["created"] += 1
+        return client
+
+
+def reset_cosmos_client():
+    """Drop the pooled clients so the next request builds fresh ones"""
+    with _client_lock:
+        for client, _, _ in _clients.values():
+            retire_cosmos_client(client)
+        _clients.clear()
+        _container_cache.clear()
+
+
+def is_credential_error(e):
+    """True if Cosmos DB rejected the credentials themselves (not the network or the permission)"""
+    status_code = getattr(e, "status_code", None)
+    if status_code in AUTH_ERROR_STATUS_CODES:
+        return True
+    return status_code == 403 and getattr(e, "sub_status", None) in CREDENTIAL_FORBIDDEN_SUBSTATUS_CODES
+
+
+def handle_cosmos_error(e):
+    """Reset the pooled client when Cosmos DB rejects its credentials (rate-limited)"""
+    global _last_auth_reset
+    if not is_credential_error(e):
+        return
+    with _client_lock:
+        now = time.monotonic()
+        if now - _last_auth_reset < AUTH_RESET_MIN_INTERVAL:
+            _client_stats["auth_resets_skipped"] += 1
+            return
+        _last_auth_reset = now
+    logging.warning(f"Cosmos DB auth error ({e.status_code}/{getattr(e, 'sub_status', None)}), "
+                    f"resetting pooled client")
+    _client_stats["auth_resets"] += 1
+    reset_cosmos_client()
+
+
+def get_container(database_name=None, container_name=None, use_async=False):
+    """Get a cached container proxy (defaults to the employees container)"""
+    database_name = database_name or os.environ.get("CosmosDbDatabaseName", "employeedb")
+    container_name = container_name or os.environ.get("CosmosDbContainerName", "employees")
+    client = get_cosmos_client(use_async)
+    
+    cache_key = ("async" if use_async else "sync", database_name, container_name)
+    container = _container_cache.get(cache_key)
+    if container is None:
+        with _client_lock:
+            container = _container_cache.get(cache_key)
+            if container is None:
+                database = client.get_database_client(database_name)
+                container = database.get_container_client(container_name)
+                _container_cache[cache_key] = container
+    return container
+
+
+def get_client_stats():
+    """Snapshot of client pool counters for diagnostics"""
+    return dict(_client_stats, mode=COSMOS_CLIENT_MODE, cached_containers=len(_container_cache))
+
+
+# ============================================================================
+# Request instrumentation - RU charge, Cosmos time and payload size per route
+# ============================================================================
+_request_metrics = contextvars.ContextVar("request_metrics", default=None)
+_route_totals = {}
+_route_totals_lock = threading.Lock()
+
+# Custom metrics go to App Insights through azure-monitor-opentelemetry when
+# APPLICATIONINSIGHTS_CONNECTION_STRING is set; the log line is always written
+_otel_instruments = None
+_otel_lock = threading.Lock()
+
+
+class RequestMetrics:
+    """Cosmos cost and timing collected while one request is handled"""
+    
+    def __init__(self, route):
+        self.route = route
+        self.request_charge = 0.0
+        self.cosmos_calls = 0
+        self.cosmos_retries = 0
+        self.cosmos_seconds = 0.0
+        self._lock = threading.Lock()  # Sync mode records from worker threads
+    
+    def add_charge(self, headers):
+        charge = float((headers or {}).get("x-ms-request-charge", 0) or 0)
+        with self._lock:
+            self.request_charge += charge
+    
+    def add_call(self, seconds):
+        with self._lock:
+            self.cosmos_calls += 1
+            self.cosmos_seconds += seconds
+    
+    def add_retry(self):
+        with self._lock:
+            self.cosmos_retries += 1
+
+
+@contextlib.contextmanager
+def track_cosmos_call():
+    """Time one Cosmos call; yields a response_hook that records its RU charge"""
+    metrics = _request_metrics.get()
+    if metrics is None:
+        yield None
+        return
+    started = time.perf_counter()
+    try:
+        yield lambda headers, _: metrics.add_charge(headers)
+    except exceptions.CosmosHttpResponseError as e:
+        metrics.add_charge(e.headers)  # Failed requests (404, 412, 429) are charged too
+        raise
+    finally:
+        metrics.add_call(time.perf_counter() - started)
+
+
+def record_query_page_charge(container):
+    """Add the charge of the query page just fetched (best effort: the headers are per client)"""
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics.add_charge(container.client_connection.last_response_headers)
+
+
+def configure_otel():
+    """Set up the Azure Monitor exporter and custom-metric histograms (once, at worker startup)"""
+    global _otel_instruments
+    with _otel_lock:
+        if _otel_instruments is not None:
+            return
+        _otel_instruments = {}
+        connection_string = os.environ.get("APPLICATIONINSIGHTS_CONNECTION_STRING")
+        if not connection_string:
+            return  # Local runs and benchmarks - no exporter, no import cost
+        try:
+            from azure.monitor.opentelemetry import configure_azure_monitor
+            from opentelemetry import metrics as otel_metrics
+            # The Functions host already ships our log records to App Insights; a second
+            # root-logger exporter here would send every line twice. Some distro versions
+            # ignore disable_logging and only read OTEL_LOGS_EXPORTER, so set both
+            os.environ.setdefault("OTEL_LOGS_EXPORTER", "none")
+            configure_azure_monitor(connection_string=connection_string, disable_logging=True)
+        except Exception as e:
+            logging.warning(f"Azure Monitor OpenTelemetry not configured, custom metrics disabled: {str(e)}")
+            return
+        meter = otel_metrics.get_meter("employee-api")
+        _otel_instruments = {
+            "request_charge": meter.create_histogram("api.cosmos.request_charge", unit="RU"),
+            "cosmos_calls": meter.create_histogram("api.cosmos.calls"),
+            "cosmos_retries": meter.create_histogram("api.cosmos.retries"),
+            "cosmos_ms": meter.create_histogram("api.cosmos.duration", unit="ms"),
+            "handler_ms": meter.create_histogram("api.handler.duration", unit="ms"),
+            "response_bytes": meter.create_histogram("api.response.size", unit="By"),
+        }
+
+
+def get_otel_instruments():
+    """Histograms for App Insights custom metrics, or None when the exporter isn't configured"""
+    return _otel_instruments or None
+
+
+# The exporter must be running before the first request so its metrics aren't lost
+configure_otel()
+
+
+def emit_request_metrics(record):
+    """Send one request's metrics to the log stream, App Insights and per-route totals"""
+    logging.info(f"RequestMetrics {json.dumps(record)}")
+    
+    instruments = get_otel_instruments()
+    if instruments:
+        attributes = {"route": record["route"], "status_code": record["status_code"]}
+        for name, instrument in instruments.items():
+            instrument.record(record[name], attributes=attributes)
+    
+    with _route_totals_lock:
+        totals = _route_totals.setdefault(record["route"], {
+            "requests": 0, "request_charge": 0.0, "cosmos_calls": 0, "cosmos_retries": 0, "cosmos_ms": 0.0,
+            "handler_ms": 0.0, "response_bytes": 0
+        })
+        totals["requests"] += 1
+        for name in ("request_charge", "cosmos_calls", "cosmos_retries", "cosmos_ms", "handler_ms", "response_bytes"):
+            totals[name] += record[name]
+
+
+def finish_request_metrics(metrics, response, started):
+    """Emit a finished request's metrics and expose them on the response"""
+    handler_ms = (time.perf_counter() - started) * 1000
+    record = {
+        "route": metrics.route,
+        "status_code": response.status_code,
+        "request_charge": round(metrics.request_charge, 2),
+        "cosmos_calls": metrics.cosmos_calls,
+        "cosmos_retries": metrics.cosmos_retries,
+        "cosmos_ms": round(metrics.cosmos_seconds * 1000, 2),
+        "handler_ms": round(handler_ms, 2),
+        "response_bytes": len(response.get_body() or b""),
+    }
+    try:
+        emit_request_metrics(record)
+    except Exception as e:
+        logging.warning(f"Could not emit request metrics: {str(e)}")
+    response.headers["Server-Timing"] = (
+        f"cosmos;dur={record['cosmos_ms']}, handler;dur={record['handler_ms']}"
+    )
+    response.headers["x-ms-request-charge"] = str(record["request_charge"])
+    return response
+
+
+def instrumented(handler):
+    """Record Cosmos RU, call count, Cosmos vs handler time and response size for a route
+    
+    Also starts the request's Cosmos retry budget (see execute_cosmos_operation).
+    """
+    route = handler.__name__
+    
+    if inspect.iscoroutinefunction(handler):
+        @functools.wraps(handler)
+        async def wrapper(req: func.HttpRequest) -> func.HttpResponse:
+            metrics = RequestMetrics(route)
+            token = _request_metrics.set(metrics)
+            deadline_token = start_retry_budget()
+            started = time.perf_counter()
+            try:
+                response = await handler(req)
+            finally:
+                _request_metrics.reset(token)
+                _retry_deadline.reset(deadline_token)
+            return finish_request_metrics(metrics, response, started)
+    else:
+        @functools.wraps(handler)
+        def wrapper(req: func.HttpRequest) -> func.HttpResponse:
+            metrics = RequestMetrics(route)
+            token = _request_metrics.set(metrics)
+            deadline_token = start_retry_budget()
+            started = time.perf_counter()
+            try:
+                response = handler(req)
+            finally:
+                _request_metrics.reset(token)
+                _retry_deadline.reset(deadline_token)
+            return finish_request_metrics(metrics, response, started)
+    return wrapper
+
+
+def get_route_totals():
+    """Per-route totals since this worker started, for diagnostics"""
+    with _route_totals_lock:
+        return {route: dict(totals) for route, totals in _route_totals.items()}
+
+
+# ============================================================================
+# Execution policy - throttling-aware retries and admission control
+# ============================================================================
+# Time a request may spend waiting on throttled Cosmos calls before giving up with 429/503
+COSMOS_RETRY_BUDGET_SECONDS = float(os.environ.get("CosmosRetryBudgetSeconds", "10"))
+COSMOS_MAX_ATTEMPTS = int(os.environ.get("CosmosMaxAttempts", "6"))
+COSMOS_BACKOFF_BASE_SECONDS = 0.1
+COSMOS_BACKOFF_MAX_SECONDS = 5.0
+
+# In-flight Cosmos calls per worker; extra calls queue instead of piling onto a throttled account
+COSMOS_MAX_CONCURRENT_CALLS = int(os.environ.get("CosmosMaxConcurrentCalls", "32"))
+
+# How long a call may queue for a slot; independent of the retry budget, which only limits backoff
+COSMOS_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("CosmosQueueTimeoutSeconds", "10"))
+
+# SDK-level throttle retries (the SDK treats 0 as "use the default of 9")
+COSMOS_SDK_THROTTLE_RETRIES = 1
+
+# 429s were never executed, so any operation may retry them; 503/408 only for reads
+THROTTLED_STATUS_CODES = (429,)
+UNAVAILABLE_STATUS_CODES = (503, 408)
+
+_retry_deadline = contextvars.ContextVar("retry_deadline", default=None)
+_cosmos_semaphores = {}
+
+
+class CosmosBusyError(Exception):
+    """Cosmos stayed throttled or unavailable for the whole retry budget"""
+    
+    def __init__(self, status_code, message, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+
+def start_retry_budget():
+    """Start the current request's retry budget; returns the contextvar token"""
+    return _retry_deadline.set(time.monotonic() + COSMOS_RETRY_BUDGET_SECONDS)
+
+
+def get_cosmos_semaphore():
+    """Per-event-loop semaphore bounding in-flight Cosmos calls"""
+    loop = asyncio.get_running_loop()
+    semaphore = _cosmos_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _cosmos_semaphores.setdefault(loop, asyncio.Semaphore(COSMOS_MAX_CONCURRENT_CALLS))
+    return semaphore
+
+
+def retry_after_hint(e):
+    """Server's x-ms-retry-after-ms hint in seconds, or None"""
+    value = (getattr(e, "headers", None) or {}).get("x-ms-retry-after-ms")
+    try:
+        return float(value) / 1000 if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, hint):
+    """Wait before the next attempt: the server's hint when given, else full-jitter exponential"""
+    if hint is not None:
+        return hint + random.uniform(0, COSMOS_BACKOFF_BASE_SECONDS)
+    return random.uniform(0, min(COSMOS_BACKOFF_MAX_SECONDS, COSMOS_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+async def execute_cosmos_operation(operation, idempotent=False):
+    """Run a Cosmos call with admission control and budgeted retries on throttling"""
+    deadline = _retry_deadline.get() or time.monotonic() + COSMOS_RETRY_BUDGET_SECONDS
+    semaphore = get_cosmos_semaphore()
+    metrics = _request_metrics.get()
+    
+    for attempt in range(COSMOS_MAX_ATTEMPTS):
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=COSMOS_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise CosmosBusyError(503, "Too many concurrent Cosmos DB requests on this worker", retry_after=1)
+        try:
+            return await operation()
+        except Exception as e:
+            status_code = getattr(e, "status_code", None)
+            retryable = status_code in THROTTLED_STATUS_CODES or (idempotent and status_code in UNAVAILABLE_STATUS_CODES)
+            if not retryable:
+                raise
+            hint = retry_after_hint(e)
+            delay = backoff_delay(attempt, hint)
+            if attempt == COSMOS_MAX_ATTEMPTS - 1 or time.monotonic() + delay > deadline:
+                logging.warning(f"Cosmos DB {status_code} after {attempt + 1} attempts, giving up")
+                raise CosmosBusyError(status_code, getattr(e, "message", str(e)), retry_after=hint or delay)
+        finally:
+            semaphore.release()
+        
+        if metrics is not None:
+            metrics.add_retry()
+        await asyncio.sleep(delay)
+
+
+# ============================================================================
+# Container operations - one awaitable interface for both client modes
+# ============================================================================
+# Point operations that are safe to retry after a 503/408
+READ_METHODS = ("read_item",)
+
+
+class ContainerOps:
+    """Awaitable Cosmos container operations used by the handlers"""
+    
+    def __init__(self, container):
+        self.container = container
+    
+    async def read_item(self, item, partition_key):
+        return await self.call("read_item", item=item, partition_key=partition_key)
+    
+    async def create_item(self, body):
+        return await self.call("create_item", body=body)
+    
+    async def replace_item(self, item, body, **kwargs):
+        return await self.call("replace_item", item=item, body=body, **kwargs)
+    
+    async def upsert_item(self, body):
+        return await self.call("upsert_item", body=body)
+    
+    async def delete_item(self, item, partition_key, **kwargs):
+        return await self.call("delete_item", item=item, partition_key=partition_key, **kwargs)
+    
+    async def patch_item(self, item, partition_key, patch_operations, **kwargs):
+        return await self.call("patch_item", item=item, partition_key=partition_key,
+                               patch_operations=patch_operations, **kwargs)
+
+
+class SyncContainerOps(ContainerOps):
+    """Blocking azure.cosmos container - each call runs on the worker thread pool"""
+    
+    async def call(self, method, **kwargs):
+        async def operation():
+            with track_cosmos_call() as response_hook:
+                return await asyncio.to_thread(getattr(self.container, method), response_hook=response_hook, **kwargs)
+        return await execute_cosmos_operation(operation, idempotent=method in READ_METHODS)
+    
+    async def query(self, **kwargs):
+        def fetch_all():
+            items = []
+            for page in self.container.query_items(**kwargs).by_page():
+                items.extend(page)
+                record_query_page_charge(self.container)
+            return items
+        
+        async def operation():
+            with track_cosmos_call():
+                return await asyncio.to_thread(fetch_all)
+        return await execute_cosmos_operation(operation, idempotent=True)
+    
+    async def query_page(self, continuation_token, **kwargs):
+        def fetch_page():
+            pager = self.container.query_items(**kwargs).by_page(continuation_token)
+            # Cross-partition queries can return empty pages - skip ahead to real data
+            items = []
+            for page in pager:
+                items = list(page)
+                record_query_page_charge(self.container)
+                if items or not pager.continuation_token:
+                    break
+            return items, pager.continuation_token
+        
+        async def operation():
+            with track_cosmos_call():
+                return await asyncio.to_thread(fetch_page)
+        return await execute_cosmos_operation(operation, idempotent=True)
+
+
+class AsyncContainerOps(ContainerOps):
+    """azure.cosmos.aio container - calls run on the event loop"""
+    
+    async def call(self, method, **kwargs):
+        async def operation():
+            with track_cosmos_call() as response_hook:
+                return await getattr(self.container, method)(response_hook=response_hook, **kwargs)
+        return await execute_cosmos_operation(operation, idempotent=method in READ_METHODS)
+    
+    async def query(self, **kwargs):
+        async def operation():
+            items = []
+            with track_cosmos_call():
+                async for page in self.container.query_items(**kwargs).by_page():
+                    items.extend([item async for item in page])
+                    record_query_page_charge(self.container)
+            return items
+        return await execute_cosmos_operation(operation, idempotent=True)
+    
+    async def query_page(self, continuation_token, **kwargs):
+        async def operation():
+            pager = self.container.query_items(**kwargs).by_page(continuation_token)
+            # Cross-partition queries can return empty pages - skip ahead to real data
+            items = []
+            with track_cosmos_call():
+                async for page in pager:
+                    items = [item async for item in page]
+                    record_query_page_charge(self.container)
+                    if items or not pager.continuation_token:
+                        break
+            return items, pager.continuation_token
+        return await execute_cosmos_operation(operation, idempotent=True)
+
+
+def get_container_ops(database_name=None, container_name=None):
+    """Container operations for the configured client mode"""
+    use_async = COSMOS_CLIENT_MODE == "async"
+    container = get_container(database_name, container_name, use_async=use_async)
+    return AsyncContainerOps(container) if use_async else SyncContainerOps(container)
+
+
+# ============================================================================
+# Read cache - bounded LRU with TTL for repeated reads on a warm worker
+# ============================================================================
+# ReadCacheEnabled=false switches the cache off without a redeploy
+READ_CACHE_ENABLED = os.environ.get("ReadCacheEnabled", "true").strip().lower() == "true"
+READ_CACHE_MAX_BYTES = int(os.environ.get("ReadCacheMaxBytes", str(16 * 1024 * 1024)))
+READ_CACHE_TTL_SECONDS = float(os.environ.get("ReadCacheTtlSeconds", "30"))
+
+# After the TTL an entry is still served for this long while one request refreshes it
+READ_CACHE_STALE_SECONDS = float(os.environ.get("ReadCacheStaleSeconds", "30"))
+
+
+class ReadCache:
+    """LRU cache of JSON documents bounded by an approximate serialized size
+    
+    Other workers don't see this worker's writes, so entries expire after a
+    TTL; writes made here update or drop the affected entries immediately.
+    Cached values are shared - callers must treat them as read-only.
+    
+    get_or_load() adds single-flight loading: concurrent misses for one key
+    share a single Cosmos query, and entries inside the stale window are
+    returned immediately while one background load refreshes them.
+    """
+    
+    def __init__(self, max_bytes, ttl_seconds, enabled=True, stale_seconds=0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.enabled = enabled
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._inflight = {}  # key -> asyncio.Task loading the value
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0,
+                       "stale_hits": 0, "coalesced": 0, "loads": 0}
+    
+    def get(self, key):
+        value, fresh = self._lookup(key)
+        return value if fresh else None
+    
+    async def get_or_load(self, key, loader, ttl_seconds=None):
+        """Cached value for key, or the result of loader() shared with concurrent callers"""
+        value, fresh = self._lookup(key)
+        if fresh:
+            return value
+        task = self._load(key, loader, ttl_seconds)
+        if value is not None:
+            return value  # Stale - served now, refreshed in the background
+        # shield: one caller giving up must not cancel the load for the others
+        return await asyncio.shield(task)
+    
+    def set(self, key, value, ttl_seconds=None):
+        with self._lock:
+            # A write-through value is newer than anything an in-flight load returns
+            self._inflight.pop(key, None)
+        self._store(key, value, ttl_seconds)
+    
+    def invalidate(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self._remove(key):
+                self._stats["invalidations"] += 1
+    
+    def invalidate_kind(self, kind):
+        """Drop every entry whose key starts with kind, e.g. all list pages"""
+        with self._lock:
+            for key in [k for k in self._inflight if k[0] == kind]:
+                del self._inflight[key]
+            for key in [k for k in self._entries if k[0] == kind]:
+                self._remove(key)
+                self._stats["invalidations"] += 1
+    
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, enabled=self.enabled, entries=len(self._entries), inflight=len(self._inflight),
+                        bytes=self._bytes, max_bytes=self.max_bytes, ttl_seconds=self.ttl_seconds,
+                        stale_seconds=self.stale_seconds)
+    
+    def _lookup(self, key):
+        """(value, fresh) for key - value is None on a miss, fresh is False inside the stale window"""
+        if not self.enabled:
+            return None, False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None, False
+            now = time.monotonic()
+            if entry[0] + self.stale_seconds < now:
+                self._remove(key)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if entry[0] < now:
+                self._stats["stale_hits"] += 1
+                return entry[2], False
+            self._stats["hits"] += 1
+            return entry[2], True
+    
+    def _load(self, key, loader, ttl_seconds):
+        """The in-flight load for key on this event loop, starting one if there is none"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._inflight.get(key)
+            if task is not None and task.get_loop() is loop:
+                self._stats["coalesced"] += 1
+                return task
+            task = loop.create_task(loader())
+            self._inflight[key] = task
+            self._stats["loads"] += 1
+        task.add_done_callback(lambda done: self._load_done(key, done, ttl_seconds))
+        return task
+    
+    def _load_done(self, key, task, ttl_seconds):
+        with self._lock:
+            # Invalidated while loading: the result may predate the write, so don't keep it
+            current = self._inflight.get(key) is task
+            if current:
+                del self._inflight[key]
+        # Callers awaiting the load report its error; a failed refresh is retried by the next request
+        if task.cancelled() or task.exception() is not None:
+            return
+        if current and task.result() is not None:
+            self._store(key, task.result(), ttl_seconds)
+    
+    def _store(self, key, value, ttl_seconds):
+        if not self.enabled:
+            return
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes // 4:
+            return  # Not worth flushing a quarter of the cache for one entry
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + (ttl_seconds or self.ttl_seconds), size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[1]
+        return True
+
+
+read_cache = ReadCache(READ_CACHE_MAX_BYTES, READ_CACHE_TTL_SECONDS, READ_CACHE_ENABLED, READ_CACHE_STALE_SECONDS)
+
+
+def employee_written(document):
+    """Bookkeeping after any employee write: partition index and read cache"""
+    remember_partition_key(document)
+    read_cache.set(("employee", document["id"]), document)
+    read_cache.invalidate_kind("employees")
+    read_cache.invalidate_kind("dashboard")
+
+
+# ============================================================================
+# Partition key addressing - id -> partition key index for point operations
+# ============================================================================
+PARTITION_INDEX_MAX_ENTRIES = int(os.environ.get("PartitionIndexMaxEntries", "10000"))
+
+_partition_index = OrderedDict()
+_partition_index_lock = threading.Lock()
+
+
+def remember_partition_key(item):
+    """Record the partition key of a document we have seen"""
+    partition_key = item.get(PARTITION_KEY_FIELD) if item else None
+    if not partition_key or "id" not in item:
+        return
+    with _partition_index_lock:
+        _partition_index[item["id"]] = partition_key
+        _partition_index.move_to_end(item["id"])
+        while len(_partition_index) > PARTITION_INDEX_MAX_ENTRIES:
+            _partition_index.popitem(last=False)
+
+
+def forget_partition_key(employee_id):
+    """Drop a stale id -> partition key mapping"""
+    with _partition_index_lock:
+        _partition_index.pop(employee_id, None)
+
+
+def resolve_partition_key(req, employee_id):
+    """Partition key for an employee: explicit departmentId parameter, then the index"""
+    partition_key = req.params.get(PARTITION_KEY_FIELD)
+    if partition_key:
+        return partition_key
+    with _partition_index_lock:
+        return _partition_index.get(employee_id)
+
+
+async def find_employee(container, employee_id, partition_key=None, use_cache=False):
+    """Look up one employee, using a point read when the partition key is known
+    
+    Writers leave use_cache off so their ETag checks see the current document.
+    """
+    if use_cache:
+        return await read_cache.get_or_load(
+            ("employee", employee_id),
+            lambda: find_employee(container, employee_id, partition_key)
+        )
+    
+    if partition_key:
+        try:
+            item = await container.read_item(item=employee_id, partition_key=partition_key)
+            remember_partition_key(item)
+            return item
+        except exceptions.CosmosResourceNotFoundError:
+            # Wrong or stale partition key - fall through to the slow path
+            forget_partition_key(employee_id)
+    
+    # Legacy ids without a known partition key (need to search across partitions)
+    query = "SELECT * FROM c WHERE c.id = @id"
+    parameters = [{"name": "@id", "value": employee_id}]
+    items = await container.query(query=query, parameters=parameters, enable_cross_partition_query=True)
+    if not items:
+        return None
+    remember_partition_key(items[0])
+    return items[0]
+
+
+async def save_employee(container, employee, previous_partition_key, etag=None):
+    """Write an employee back, moving it when its partition key changed
+    
+    With an etag the write only succeeds if the stored document still has it
+    (CosmosAccessConditionFailedError otherwise).
+    """
+    partition_key = employee[PARTITION_KEY_FIELD]
+    if previous_partition_key == partition_key:
+        saved = await container.replace_item(item=employee["id"], body=employee, **if_match_condition(etag))
+    else:
+        # Partition keys are immutable and a transactional batch can't span partitions, so
+        # create the new copy, then remove the old one only if nobody changed it meanwhile.
+        # Legacy documents without departmentId live in the "undefined" partition.
+        from azure.cosmos.partition_key import NonePartitionKeyValue
+        saved = await container.create_item(body=strip_system_properties(employee))
+        try:
+            await container.delete_item(
+                item=employee["id"],
+                partition_key=previous_partition_key if previous_partition_key is not None else NonePartitionKeyValue,
+                **if_match_condition(etag)
+            )
+        except exceptions.CosmosResourceNotFoundError:
+            pass
+        except exceptions.CosmosAccessConditionFailedError:
+            # A concurrent write won - drop our copy so the caller can re-read and retry
+            await container.delete_item(item=employee["id"], partition_key=partition_key)
+            raise
+    employee_written(saved)
+    return saved
+
+
+# ============================================================================
+# Partial updates - patch only changed fields, guarded by ETags
+# ============================================================================
+UPDATABLE_FIELDS = ["firstName", "lastName", "email", "department", "position", "phone", "salary", "isActive"]
+
+# Changes to these need the current document (partition moves, department stats)
+STATEFUL_FIELDS = ("department", "isActive")
+
+# Internal read-then-patch attempts before giving up on a busy document
+MAX_CONFLICT_RETRIES = 3
+
+
+def if_match_condition(etag):
+    """Keyword arguments making a write conditional on the document's ETag"""
+    if not etag:
+        return {}
+    from azure.core import MatchConditions
+    return {"etag": etag, "match_condition": MatchConditions.IfNotModified}
+
+
+async def patch_employee(container, employee_id, partition_key, changes, etag=None, filter_predicate=None):
+    """Send only the changed fields (plus updatedAt) as patch operations"""
+    operations = [{"op": "set", "path": f"/{field}", "value": value} for field, value in changes.items()]
+    operations.append({"op": "set", "path": "/updatedAt", "value": datetime.utcnow().isoformat()})
+    if len(operations) > MAX_PATCH_OPERATIONS:
+        raise ValueError(f"Too many fields to patch at once ({len(operations)})")
+    kwargs = if_match_condition(etag)
+    if filter_predicate:
+        kwargs["filter_predicate"] = filter_predicate
+    patched = await container.patch_item(
+        item=employee_id, partition_key=partition_key, patch_operations=operations, **kwargs
+    )
+    employee_written(patched)
+    return patched
+
+
+def with_search_tokens(changes, existing=None):
+    """Add refreshed search tokens to changes that touch a searchable field"""
+    if not any(field in changes for field in SEARCHABLE_FIELDS):
+        if existing is None or SEARCH_TOKENS_FIELD in existing:
+            return changes
+    return dict(changes, **{SEARCH_TOKENS_FIELD: build_search_tokens(dict(existing or {}, **changes))})
+
+
+async def apply_employee_update(container, existing, changes, etag):
+    """Apply changes to a document we have read, moving it if its partition key changes"""
+    changes = {field: value for field, value in changes.items() if existing.get(field) != value}
+    if changes:
+        changes = with_search_tokens(changes, existing)
+    new_partition_key = derive_department_id(changes.get("department", existing.get("department")))
+    
+    if new_partition_key != existing.get(PARTITION_KEY_FIELD):
+        # Partition keys can't be patched - rewrite the document in its new partition
+        moved = dict(existing, **changes)
+        moved[PARTITION_KEY_FIELD] = new_partition_key
+        moved["updatedAt"] = datetime.utcnow().isoformat()
+        return await save_employee(container, moved, existing.get(PARTITION_KEY_FIELD), etag or existing.get("_etag"))
+    
+    if not changes:
+        return existing
+    return await patch_employee(container, existing["id"], new_partition_key, changes, etag)
+
+
+# ============================================================================
+# Pagination - opaque continuation tokens bound to the query they came from
+# ============================================================================
+DEFAULT_PAGE_SIZE = int(os.environ.get("EmployeesDefaultPageSize", "100"))
+MAX_PAGE_SIZE = int(os.environ.get("EmployeesMaxPageSize", "500"))
+
+
+class InvalidRequestError(Exception):
+    """Client supplied a malformed parameter (maps to HTTP 400)"""
+
+
+def parse_page_size(value):
+    """Page size from the limit parameter, clamped to the server-side cap"""
+    if value is None or value == "":
+        return min(DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidRequestError("limit must be an integer")
+    if limit < 1:
+        raise InvalidRequestError("limit must be at least 1")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def query_signature(query, parameters):
+    """Short hash identifying a query and its parameters"""
+    raw = json.dumps([query, parameters or []], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_continuation_token(cosmos_token, signature):
+    """Wrap a Cosmos continuation token so clients treat it as opaque"""
+    if not cosmos_token:
+        return None
+    raw = json.dumps({"q": signature, "c": cosmos_token}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_continuation_token(token, signature):
+    """Unwrap a client continuation token, rejecting tokens from a different query"""
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise InvalidRequestError("Invalid continuationToken")
+    if not isinstance(payload, dict) or payload.get("q") != signature:
+        raise InvalidRequestError("continuationToken does not match this query")
+    return payload.get("c")
+
+
+async def query_page(container, query, parameters, limit, continuation_token):
+    """Fetch one page of a cross-partition query, returning (items, next token)"""
+    signature = query_signature(query, parameters)
+    items, next_token = await container.query_page(
+        decode_continuation_token(continuation_token, signature),
+        query=query,
+        parameters=parameters,
+        enable_cross_partition_query=True,
+        max_item_count=limit
+    )
+    return items, encode_continuation_token(next_token, signature)
+
+
+async def count_query(container, where_clause, parameters):
+    """Total number of documents matching a WHERE clause (only run on request)"""
+    query = f"SELECT VALUE COUNT(1) FROM c{where_clause}"
+    results = await container.query(query=query, parameters=parameters, enable_cross_partition_query=True)
+    return sum(results)
+
+
+# ============================================================================
+# Projection - fields= allowlist and the compact (columnar) list encoding
+# ============================================================================
+# Fields a list request may ask for; the default projection returns all of them
+LIST_FIELDS = [
+    "id", "firstName", "lastName", "email", "department", "departmentId", "position", "phone",
+    "hireDate", "salary", "isActive", "createdAt", "updatedAt", "deletedAt", "_etag", "_ts"
+]
+DEFAULT_LIST_FIELDS = [field for field in LIST_FIELDS if not field.startswith("_")]
+
+# Always read (but only returned when asked for): list ETags and the partition index need them
+INTERNAL_LIST_FIELDS = ["id", "_etag", PARTITION_KEY_FIELD]
+
+LIST_FORMATS = ("json", "compact")
+
+# Sortable list fields - each needs the composite indexes in modules/cosmos_db/main.tf
+ORDER_BY_FIELDS = ("lastName", "hireDate")
+
+
+def parse_fields(value):
+    """Requested list fields (id always first), validated against the allowlist"""
+    if not value:
+        return list(DEFAULT_LIST_FIELDS)
+    fields = ["id"]
+    for field in (part.strip() for part in value.split(",")):
+        if field not in LIST_FIELDS:
+            raise InvalidRequestError(f"Unknown field '{field}'. Allowed fields: {', '.join(LIST_FIELDS)}")
+        if field not in fields:
+            fields.append(field)
+    return fields
+
+
+def parse_list_format(value):
+    """Response encoding for list endpoints: json (objects) or compact (columns + rows)"""
+    value = (value or "json").lower()
+    if value not in LIST_FORMATS:
+        raise InvalidRequestError(f"format must be one of: {', '.join(LIST_FORMATS)}")
+    return value
+
+
+def parse_order_by(value):
+    """Sort field for list requests (None keeps the unsorted, cheapest order)"""
+    if not value:
+        return None
+    if value not in ORDER_BY_FIELDS:
+        raise InvalidRequestError(f"orderBy must be one of: {', '.join(ORDER_BY_FIELDS)}")
+    return value
+
+
+def order_by_clause(order_by, equality_fields):
+    """ORDER BY led by the equality-filtered fields, so a composite index serves the sort
+
+    The leading fields are constant within the results, so the order is by order_by.
+    """
+    if not order_by:
+        return ""
+    return " ORDER BY " + ", ".join(f"c.{field} ASC" for field in [*equality_fields, order_by])
+
+
+def select_clause(fields, *extra):
+    """SELECT list for the requested fields plus the ones the API needs itself"""
+    columns = list(fields)
+    for field in [f for group in extra for f in group]:
+        if field not in columns:
+            columns.append(field)
+    return ", ".join(f"c.{field}" for field in columns)
+
+
+def encode_employee_list(result, fields, list_format):
+    """List response body with only the requested fields, as objects or columns"""
+    items = result["employees"]
+    if list_format == "compact":
+        body = {"fields": fields, "rows": [[item.get(field) for field in fields] for item in items]}
+    else:
+        body = {"employees": [{field: item[field] for field in fields if field in item} for item in items]}
+    body["continuationToken"] = result["continuationToken"]
+    if "count" in result:
+        body["count"] = result["count"]
+    return body
+
+
+# ============================================================================
+# Search - indexed lookups on precomputed prefix tokens
+# ============================================================================
+SEARCH_MAX_RESULTS = int(os.environ.get("EmployeesSearchMaxResults", "50"))
+
+# Matching documents fetched for ranking before the result limit is applied
+SEARCH_CANDIDATE_LIMIT = int(os.environ.get("EmployeesSearchCandidateLimit", "200"))
+
+
+def search_conditions(terms):
+    """Conditions requiring every term among the document's search tokens"""
+    conditions = [f"ARRAY_CONTAINS(c.{SEARCH_TOKENS_FIELD}, @term{i})" for i in range(len(terms))]
+    parameters = [{"name": f"@term{i}", "value": term} for i, term in enumerate(terms)]
+    return conditions, parameters
+
+
+async def search_employees(container, terms, where_clause, parameters, limit, select="*"):
+    """Best matches for a search query, ranked by how well the names match the terms"""
+    candidates = await container.query(
+        query=f"SELECT TOP {SEARCH_CANDIDATE_LIMIT} {select} FROM c{where_clause}",
+        parameters=parameters,
+        enable_cross_partition_query=True
+    )
+    candidates.sort(key=lambda e: (
+        -search_rank(e, terms),
+        normalize_search_text(e.get("lastName")),
+        normalize_search_text(e.get("firstName"))
+    ))
+    return candidates[:limit]
+
+
+# ============================================================================
+# Department statistics - materialized summary kept in the metadata container
+# ============================================================================
+METADATA_CONTAINER_NAME = os.environ.get("CosmosDbMetadataContainerName", "metadata")
+DEPARTMENT_STATS_ID = "departmentStats"
+
+# Bump when the summary layout changes - older summaries are rebuilt on read
+DEPARTMENT_STATS_VERSION = 2
+
+# Summary counters per department: {"active": {departmentId: n}, "inactive": {...}}
+HEADCOUNT_BUCKETS = {"active": True, "inactive": False}
+
+# Cosmos DB accepts at most 10 operations per patch request
+MAX_PATCH_OPERATIONS = 10
+
+
+def get_metadata_ops():
+    """Container operations for the metadata container (partitioned on /id)"""
+    return get_container_ops(container_name=METADATA_CONTAINER_NAME)
+
+
+def department_deltas(before, after):
+    """Change in active/inactive headcount per department between two versions of an employee
+
+    Keys are (bucket, departmentId), values (department name, delta).
+    """
+    deltas = {}
+    for employee, sign in ((before, -1), (after, 1)):
+        if not employee:
+            continue
+        for bucket, is_active in HEADCOUNT_BUCKETS.items():
+            if employee.get("isActive") is is_active:
+                name = employee.get("department", "Unknown")
+                key = (bucket, derive_department_id(name))
+                _, current = deltas.get(key, (name, 0))
+                deltas[key] = (name, current + sign)
+    return {k: v for k, v in deltas.items() if v[1]}
+
+
+async def apply_department_deltas(deltas):
+    """Incrementally update the department summary with patch increments"""
+    if not deltas:
+        return
+    invalidate_department_stats()
+    operations = []
+    for (bucket, department_id), (name, delta) in deltas.items():
+        operations.append({"op": "incr", "path": f"/{bucket}/{department_id}", "value": delta})
+        operations.append({"op": "set", "path": f"/names/{department_id}", "value": name})
+    try:
+        metadata = get_metadata_ops()
+        for start in range(0, len(operations), MAX_PATCH_OPERATIONS):
+            await metadata.patch_item(
+                item=DEPARTMENT_STATS_ID,
+                partition_key=DEPARTMENT_STATS_ID,
+                patch_operations=operations[start:start + MAX_PATCH_OPERATIONS]
+            )
+    except exceptions.CosmosResourceNotFoundError:
+        pass  # No summary yet - the next read builds it from scratch
+    except Exception as e:
+        # The employee write already succeeded; a drifted summary can be rebuilt
+        logging.warning(f"Could not update department stats: {str(e)}")
+    finally:
+        # Again after the patch: a read that raced it may have cached the old summary
+        invalidate_department_stats()
+
+
+def invalidate_department_stats():
+    """Drop the cached department summary and everything derived from it"""
+    read_cache.invalidate(("departments",))
+    read_cache.invalidate_kind("dashboard")
+
+
+async def rebuild_department_stats():
+    """Recompute the department summary using server-side aggregates"""
+    container = get_container_ops()
+    
+    summary = {
+        "id": DEPARTMENT_STATS_ID, "version": DEPARTMENT_STATS_VERSION, "names": {},
+        "rebuiltAt": datetime.utcnow().isoformat()
+    }
+    for bucket, is_active in HEADCOUNT_BUCKETS.items():
+        # The Python SDK can't run cross-partition GROUP BY, so count each department with COUNT(1)
+        status = {"name": "@isActive", "value": is_active}
+        names = await container.query(
+            query="SELECT DISTINCT VALUE c.department FROM c WHERE c.isActive = @isActive",
+            parameters=[status],
+            enable_cross_partition_query=True
+        )
+        counts = await asyncio.gather(*[
+            container.query(
+                query="SELECT VALUE COUNT(1) FROM c WHERE c.isActive = @isActive AND c.department = @department",
+                parameters=[status, {"name": "@department", "value": name}],
+                enable_cross_partition_query=True
+            )
+            for name in names
+        ])
+        
+        summary[bucket] = {}
+        for name, result in zip(names, counts):
+            department_id = derive_department_id(name)
+            summary[bucket][department_id] = summary[bucket].get(department_id, 0) + sum(result)
+            summary["names"].setdefault(department_id, name)
+    
+    summary = await get_metadata_ops().upsert_item(body=summary)
+    read_cache.set(("departments",), summary)
+    return summary
 
-def get_container():
-    """Get the employees container"""
-    client = get_cosmos_client()
-    database_name = os.environ.get("CosmosDbDatabaseName", "employeedb")
-    container_name = os.environ.get("CosmosDbContainerName", "employees")
-    database = client.get_database_client(database_name)
-    return database.get_container_client(container_name)
 
-def create_cors_response(body, status_code=200, headers=None):
+async def read_department_stats():
+    """Read the department summary from Cosmos DB, building it on first use"""
+    try:
+        summary = await get_metadata_ops().read_item(item=DEPARTMENT_STATS_ID, partition_key=DEPARTMENT_STATS_ID)
+    except exceptions.CosmosResourceNotFoundError:
+        return await rebuild_department_stats()
+    if summary.get("version") != DEPARTMENT_STATS_VERSION:
+        return await rebuild_department_stats()
+    return summary
+
+
+async def get_department_stats():
+    """Department summary, shared by concurrent requests and cached between them"""
+    return await read_cache.get_or_load(("departments",), read_department_stats)
+
+
+def department_list(summary):
+    """Department summary as the API's list of {name, count}"""
+    names = summary.get("names", {})
+    return [
+        {"name": names.get(department_id, department_id), "count": count}
+        for department_id, count in summary.get("active", {}).items()
+        if count > 0
+    ]
+
+
+# ============================================================================
+# Responses - one path for serialization, compression and CORS headers
+# ============================================================================
+try:
+    import orjson
+except ImportError:  # Local runs without the full requirements
+    orjson = None
+
+try:
+    import brotli  # Optional - br is only offered when the package is installed
+except ImportError:
+    brotli = None
+
+# Smaller bodies aren't worth the CPU (and often grow when compressed)
+COMPRESSION_MIN_BYTES = int(os.environ.get("ResponseCompressionMinBytes", "1024"))
+GZIP_COMPRESS_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def encode_json(payload):
+    """Serialize a response payload to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def negotiate_encoding(accept_encoding):
+    """Best content coding we support from an Accept-Encoding header, or None"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for coding in (["br"] if brotli is not None else []) + ["gzip"]:
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+
+def compress_body(req, body, headers):
+    """Compress a body for the client when it's big enough, updating headers in place"""
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return body
+    headers["Vary"] = "Accept-Encoding"
+    coding = negotiate_encoding(req.headers.get("Accept-Encoding"))
+    if coding == "br":
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    elif coding == "gzip":
+        body = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+    else:
+        return body
+    headers["Content-Encoding"] = coding
+    return body
+
+
+def json_response(req, payload, status_code=200, headers=None):
+    """JSON response for every route: fast serializer, negotiated compression, CORS headers"""
+    headers = dict(headers or {})
+    body = compress_body(req, encode_json(payload), headers)
+    return create_cors_response(body, status_code=status_code, headers=headers)
+
+
+def error_response(req, e):
+    """Error response for a failed request: 429/503 with Retry-After when Cosmos is busy, else 500"""
+    status_code = getattr(e, "status_code", None)
+    if status_code in THROTTLED_STATUS_CODES + UNAVAILABLE_STATUS_CODES:
+        retry_after = getattr(e, "retry_after", None) or retry_after_hint(e) or 1
+        return json_response(
+            req,
+            {"error": "The database is busy, please retry shortly"},
+            status_code=429 if status_code == 429 else 503,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+    return json_response(
+        req,
+        {"error": str(e)},
+        status_code=500
+    )
+
+
+def create_cors_response(body, status_code=200, headers=None, mimetype="application/json"):
     """Create HTTP response with CORS headers"""
     cors_headers = {
         "Access-Control-Allow-Origin": "*",
         "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-        "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With, Accept, Origin",
+        "Access-Control-Allow-Headers": "Content-Type, Authorization, X-Requested-With, Accept, Origin, If-Match, If-None-Match",
+        "Access-Control-Expose-Headers": "ETag, Cache-Control, Retry-After, Server-Timing, x-ms-request-charge, "
+                                         "Link, X-Continuation-Token, X-Export-Rows",
         "Access-Control-Max-Age": "86400"
     }
     if headers:
@@ -67,29 +1375,262 @@ def create_cors_response(body, status_code=200, headers=None):
         body=body,
         status_code=status_code,
         headers=cors_headers,
-        mimetype="application/json"
+        mimetype=mimetype
+    )
+
+
+def employee_response(req, employee, status_code=200):
+    """Single-employee response carrying the document's ETag"""
+    return json_response(
+        req,
+        employee,
+        status_code=status_code,
+        headers={"ETag": employee.get("_etag", "")}
+    )
+
+
+def precondition_failed_response(req):
+    """412 for writes whose If-Match ETag no longer matches"""
+    return json_response(
+        req,
+        {"error": "Employee was modified by another request - reload and try again"},
+        status_code=412
+    )
+
+
+def deleted_response(req):
+    """Response for a successful (or repeated) soft delete"""
+    return json_response(
+        req,
+        {"message": "Employee deleted successfully"},
+        status_code=200
     )
 
 
+# ============================================================================
+# Conditional GETs - ETag validators and Cache-Control policies
+# ============================================================================
+# Single employees, lists and the dashboard always revalidate (a 304 is cheap) so
+# the UI sees its own writes; the department list changes rarely enough to be
+# served from caches for a short while
+CACHE_CONTROL_EMPLOYEE = "private, no-cache"
+CACHE_CONTROL_EMPLOYEES = "private, no-cache"
+CACHE_CONTROL_DASHBOARD = "private, no-cache"
+CACHE_CONTROL_DEPARTMENTS = "public, max-age=30, stale-while-revalidate=60"
+
+
+def weak_etag(*parts):
+    """Weak validator from values that change whenever the response would"""
+    digest = hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def list_etag(items, *extra):
+    """Weak validator for a page of documents, from their ids and Cosmos ETags"""
+    return weak_etag([(item.get("id"), item.get("_etag")) for item in items], *extra)
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against our ETag"""
+    if not if_none_match or not etag:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in candidates]
+
+
+def conditional_response(req, payload, etag, cache_control):
+    """200 with the payload, or 304 without building it when the client's copy is current
+    
+    payload may be a callable, so 304s also skip shaping the response body.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(req.headers.get("If-None-Match"), etag):
+        return create_cors_response("", status_code=304, headers=headers)
+    if callable(payload):
+        payload = payload()
+    return json_response(req, payload, status_code=200, headers=headers)
+
+
 # ============================================================================
 # Health Check
 # ============================================================================
 @app.route(route="health", methods=["GET"])
+@instrumented
 def health_check(req: func.HttpRequest) -> func.HttpResponse:
     """Health check endpoint"""
-    return func.HttpResponse(
-        json.dumps({"status": "healthy", "timestamp": datetime.utcnow().isoformat()}),
-        mimetype="application/json",
+    return json_response(
+        req,
+        {"status": "healthy", "timestamp": datetime.utcnow().isoformat()},
         status_code=200
     )
 
+# ============================================================================
+# Warm-up - load Cosmos before a new instance takes traffic (Premium/EP plans)
+# ============================================================================
+@app.warm_up_trigger("warmup")
+async def warm_up(warmup) -> None:
+    """Import the Cosmos SDK, build the pooled client and prime the department summary"""
+    if os.environ.get("WarmUpEnabled", "true").strip().lower() != "true":
+        return
+    try:
+        get_container_ops()
+        await get_department_stats()
+        logging.info("Warm-up complete")
+    except Exception as e:
+        handle_cosmos_error(e)
+        logging.warning(f"Warm-up could not reach Cosmos DB: {str(e)}")
+
+# ============================================================================
+# Diagnostics probe - timed representative Cosmos operations (/diagnostics/probe)
+# ============================================================================
+PROBE_DEFAULT_ITERATIONS = 5
+PROBE_MAX_ITERATIONS = 20
+
+# Each iteration writes, reads and deletes a sentinel document in the metadata
+# container and runs one small cross-partition query on the employees container
+PROBE_OPERATIONS = ("write", "point_read", "query", "delete")
+
+
+def latency_summary(samples):
+    """p50/p95/p99/max of latency samples in milliseconds (nearest rank)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    rank = lambda fraction: ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+    return {"p50_ms": round(rank(0.50), 2), "p95_ms": round(rank(0.95), 2),
+            "p99_ms": round(rank(0.99), 2), "max_ms": round(ordered[-1], 2)}
+
+
+async def timed_probe_operation(results, name, operation):
+    """Run one probe operation, recording its latency, RU charge and retries"""
+    metrics = _request_metrics.get()
+    charge_before, retries_before = metrics.request_charge, metrics.cosmos_retries
+    started = time.perf_counter()
+    try:
+        await operation()
+    except Exception as e:
+        handle_cosmos_error(e)
+        results[name]["errors"].append(str(e))
+        return
+    results[name]["latencies"].append((time.perf_counter() - started) * 1000)
+    results[name]["charges"].append(metrics.request_charge - charge_before)
+    results[name]["retries"] += metrics.cosmos_retries - retries_before
+
+
+async def get_account_regions():
+    """Readable/writable regions of the account and the ones the client talks to
+    
+    Always read through the sync client: azure.cosmos.aio has no public
+    get_database_account() and its connection doesn't expose the endpoints.
+    """
+    client = get_cosmos_client()
+    account = await asyncio.to_thread(client.get_database_account)
+    readable = account.ReadableLocations or []
+    writable = account.WritableLocations or []
+    names = {location["databaseAccountEndpoint"]: location["name"] for location in readable + writable}
+    connection = client.client_connection
+    return {
+        "readable": [location["name"] for location in readable],
+        "writable": [location["name"] for location in writable],
+        "read_region": names.get(connection.ReadEndpoint),
+        "write_region": names.get(connection.WriteEndpoint),
+    }
+
+
+async def run_diagnostics_probe(iterations):
+    """Latency percentiles and RU per operation over several probe iterations"""
+    clients_created = _client_stats["created"]
+    metadata = get_metadata_ops()
+    container = get_container_ops()
+    sentinel_id = f"diagnosticsProbe-{os.getpid()}-{random.getrandbits(32):08x}"
+    results = {name: {"latencies": [], "charges": [], "retries": 0, "errors": []} for name in PROBE_OPERATIONS}
+    
+    started = time.perf_counter()
+    for iteration in range(iterations):
+        sentinel = {"id": sentinel_id, "iteration": iteration, "probedAt": datetime.utcnow().isoformat()}
+        await timed_probe_operation(results, "write", lambda: metadata.upsert_item(body=sentinel))
+        await timed_probe_operation(results, "point_read",
+                                    lambda: metadata.read_item(item=sentinel_id, partition_key=sentinel_id))
+        await timed_probe_operation(results, "query", lambda: container.query(
+            query="SELECT TOP 1 c.id FROM c WHERE c.isActive = true",
+            enable_cross_partition_query=True
+        ))
+        await timed_probe_operation(results, "delete",
+                                    lambda: metadata.delete_item(item=sentinel_id, partition_key=sentinel_id))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    operations = {}
+    for name, result in results.items():
+        charges = result["charges"]
+        operations[name] = {
+            "count": len(result["latencies"]),
+            "errors": len(result["errors"]),
+            **latency_summary(result["latencies"]),
+            "ru_per_operation": round(sum(charges) / len(charges), 2) if charges else None,
+            "retries": result["retries"],
+        }
+        if result["errors"]:
+            operations[name]["last_error"] = result["errors"][-1]
+    
+    # Before the region lookup, which builds the sync client in async mode
+    reused = _client_stats["created"] == clients_created
+    try:
+        regions = await get_account_regions()
+    except Exception as e:
+        handle_cosmos_error(e)
+        regions = {"error": str(e)}
+    
+    failed = any(operation["errors"] for operation in operations.values())
+    return {
+        "status": "failed" if failed else "ok",
+        "iterations": iterations,
+        "total_ms": round(elapsed_ms, 2),
+        "operations": operations,
+        "client": dict(get_client_stats(), mode=COSMOS_CLIENT_MODE, reused=reused),
+        "regions": regions,
+    }
+
+
 # ============================================================================
 # Diagnostics - Check environment and connectivity
 # ============================================================================
+# Writes on every iteration, so it needs a function key (unlike plain /diagnostics)
+@app.route(route="diagnostics/probe", methods=["GET"], auth_level=func.AuthLevel.FUNCTION)
+@instrumented
+async def diagnostics_probe(req: func.HttpRequest) -> func.HttpResponse:
+    """Time representative Cosmos operations (?iterations=N) and report latency, RU and regions"""
+    try:
+        try:
+            iterations = int(req.params.get("iterations", PROBE_DEFAULT_ITERATIONS))
+        except ValueError:
+            iterations = PROBE_DEFAULT_ITERATIONS
+        iterations = max(1, min(iterations, PROBE_MAX_ITERATIONS))
+        probe = await run_diagnostics_probe(iterations)
+        # A failing probe answers 503 so plain HTTP monitors alert on it
+        return json_response(
+            req,
+            {"probe": probe, "timestamp": datetime.utcnow().isoformat()},
+            status_code=503 if probe["status"] == "failed" else 200,
+            headers={"Cache-Control": "no-store"}
+        )
+    except Exception as e:
+        handle_cosmos_error(e)
+        logging.error(f"Error running diagnostics probe: {str(e)}")
+        return error_response(req, e)
+
+
 @app.route(route="diagnostics", methods=["GET"])
-def diagnostics(req: func.HttpRequest) -> func.HttpResponse:
+@instrumented
+async def diagnostics(req: func.HttpRequest) -> func.HttpResponse:
     """Diagnostics endpoint to check configuration"""
     try:
+        if req.params.get("probe", "").lower() == "true":
+            return json_response(
+                req,
+                {"error": "The probe is served by /api/diagnostics/probe and requires a function key"},
+                status_code=400
+            )
+        
         # Check environment variables
         env_vars = {
             "CosmosDbEndpoint": bool(os.environ.get("CosmosDbEndpoint")),
@@ -102,28 +1643,35 @@ def diagnostics(req: func.HttpRequest) -> func.HttpResponse:
         # Test Cosmos DB connection
         cosmos_status = "unknown"
         try:
-            client = get_cosmos_client()
             # Try to get database info
             database_name = os.environ.get("CosmosDbDatabaseName", "employeedb") 
-            database = client.get_database_client(database_name)
-            database_properties = database.read()
+            if COSMOS_CLIENT_MODE == "async":
+                database = get_cosmos_client(use_async=True).get_database_client(database_name)
+                database_properties = await database.read()
+            else:
+                database = get_cosmos_client().get_database_client(database_name)
+                database_properties = await asyncio.to_thread(database.read)
             cosmos_status = "connected"
         except Exception as e:
+            handle_cosmos_error(e)
             cosmos_status = f"failed: {str(e)}"
         
-        return func.HttpResponse(
-            json.dumps({
+        return json_response(
+            req,
+            {
                 "environment_variables": env_vars,
                 "cosmos_db_status": cosmos_status,
+                "cosmos_client": get_client_stats(),
+                "read_cache": read_cache.stats(),
+                "routes": get_route_totals(),
                 "timestamp": datetime.utcnow().isoformat()
-            }),
-            mimetype="application/json",
+            },
             status_code=200
         )
     except Exception as e:
-        return func.HttpResponse(
-            json.dumps({"error": str(e)}),
-            mimetype="application/json", 
+        return json_response(
+            req,
+            {"error": str(e)},
             status_code=500
         )
 
@@ -132,11 +1680,13 @@ def diagnostics(req: func.HttpRequest) -> func.HttpResponse:
 # OPTIONS handler for CORS preflight requests
 # ============================================================================
 @app.route(route="employees", methods=["OPTIONS"])
+@instrumented
 def options_employees(req: func.HttpRequest) -> func.HttpResponse:
     """Handle CORS preflight requests"""
     return create_cors_response("", status_code=200)
 
 @app.route(route="employees/{id}", methods=["OPTIONS"])  
+@instrumented
 def options_employee(req: func.HttpRequest) -> func.HttpResponse:
     """Handle CORS preflight requests for single employee"""
     return create_cors_response("", status_code=200)
@@ -145,254 +1695,803 @@ def options_employee(req: func.HttpRequest) -> func.HttpResponse:
 # GET /api/employees - List all employees
 # ============================================================================
 @app.route(route="employees", methods=["GET"])
-def get_employees(req: func.HttpRequest) -> func.HttpResponse:
-    """Get all employees with optional filtering"""
+@instrumented
+async def get_employees(req: func.HttpRequest) -> func.HttpResponse:
+    """Get one page of employees with optional filtering"""
     try:
-        container = get_container()
+        container = get_container_ops()
         
         # Get query parameters
         department = req.params.get("department")
         search = req.params.get("search")
+        limit = parse_page_size(req.params.get("limit"))
+        continuation_token = req.params.get("continuationToken")
+        include_count = req.params.get("includeCount", "").lower() == "true"
+        include_inactive = req.params.get("includeInactive", "").lower() == "true"
+        order_by = parse_order_by(req.params.get("orderBy"))
+        fields = parse_fields(req.params.get("fields"))
+        list_format = parse_list_format(req.params.get("format"))
+        
+        terms = search_terms(search) if search and not department else []
+        if terms and order_by:
+            raise InvalidRequestError("orderBy can't be combined with search (results are ranked)")
         
-        # Build query
+        # Build query - soft-deleted employees are filtered out unless asked for
+        conditions, parameters, equality_fields = [], [], []
+        if not include_inactive:
+            conditions.append("c.isActive = true")
+            equality_fields.append("isActive")
         if department:
-            query = "SELECT * FROM c WHERE c.department = @department"
-            parameters = [{"name": "@department", "value": department}]
-            items = list(container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True))
-        elif search:
-            query = "SELECT * FROM c WHERE CONTAINS(LOWER(c.firstName), LOWER(@search)) OR CONTAINS(LOWER(c.lastName), LOWER(@search)) OR CONTAINS(LOWER(c.email), LOWER(@search))"
-            parameters = [{"name": "@search", "value": search}]
-            items = list(container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True))
-        else:
-            items = list(container.read_all_items())
+            conditions.append("c.department = @department")
+            parameters.append({"name": "@department", "value": department})
+            equality_fields.append("department")
+        elif terms:
+            search_clauses, search_parameters = search_conditions(terms)
+            conditions.extend(search_clauses)
+            parameters.extend(search_parameters)
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order_clause = order_by_clause(order_by, equality_fields)
         
-        return create_cors_response(
-            json.dumps({"employees": items, "count": len(items)}),
-            status_code=200
+        # Ranking needs the searchable fields even when the caller didn't ask for them
+        select = select_clause(fields, INTERNAL_LIST_FIELDS, SEARCHABLE_FIELDS if terms else [])
+        
+        async def load_page():
+            if terms:
+                # Ranked results come back in one response, so there is no next page
+                items = await search_employees(container, terms, where_clause, parameters,
+                                               min(limit, SEARCH_MAX_RESULTS), select)
+                next_token = None
+            else:
+                items, next_token = await query_page(container, f"SELECT {select} FROM c{where_clause}{order_clause}",
+                                                     parameters, limit, continuation_token)
+            
+            for item in items:
+                remember_partition_key(item)
+            
+            page = {"employees": items, "continuationToken": next_token}
+            if include_count:
+                page["count"] = await count_query(container, where_clause, parameters)
+            return page
+        
+        # Identical concurrent list requests share one Cosmos query
+        cache_key = ("employees", select, where_clause + order_clause, json.dumps(parameters), limit,
+                     continuation_token, include_count)
+        result = await read_cache.get_or_load(cache_key, load_page)
+        
+        etag = list_etag(result["employees"], result["continuationToken"], result.get("count"), fields, list_format)
+        return conditional_response(req, lambda: encode_employee_list(result, fields, list_format), etag, CACHE_CONTROL_EMPLOYEES)
+    except InvalidRequestError as e:
+        return json_response(
+            req,
+            {"error": str(e)},
+            status_code=400
         )
     except Exception as e:
+        handle_cosmos_error(e)
         logging.error(f"Error getting employees: {str(e)}")
-        return create_cors_response(
-            json.dumps({"error": str(e)}),
-            status_code=500
+        return error_response(req, e)
+
+
+# ============================================================================
+# GET /api/employees/export - NDJSON/CSV export in bounded segments
+# ============================================================================
+# func.HttpResponse needs the whole body up front, so an export is served as a
+# chain of segments: each response holds at most EXPORT_SEGMENT_ROWS rows and
+# points at the next one (Link rel="next" / X-Continuation-Token)
+EXPORT_SEGMENT_ROWS = int(os.environ.get("EmployeesExportSegmentRows", "10000"))
+EXPORT_PAGE_SIZE = int(os.environ.get("EmployeesExportPageSize", "1000"))
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def parse_export_format(value):
+    """Export encoding: ndjson (one JSON object per line) or csv"""
+    value = (value or "ndjson").lower()
+    if value not in EXPORT_FORMATS:
+        raise InvalidRequestError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return value
+
+
+def parse_timestamp(value, name):
+    """ISO 8601 date or timestamp parameter as a naive UTC datetime (None when absent)"""
+    if not value:
+        return None
+    try:
+        timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise InvalidRequestError(f"{name} must be an ISO 8601 date or timestamp")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def parse_updated_since(value):
+    """updatedSince as the ISO string stored in updatedAt (UTC, no offset)"""
+    updated_since = parse_timestamp(value, "updatedSince")
+    return updated_since.isoformat() if updated_since else None
+
+
+def export_link(req, token):
+    """URL of the next export segment"""
+    params = {k: v for k, v in req.params.items() if k != "continuationToken"}
+    params["continuationToken"] = token
+    return f"{req.url.split('?', 1)[0]}?{urlencode(params)}"
+
+
+class ExportWriter:
+    """Encodes export rows page by page, so only one page of documents is held at a time"""
+    
+    def __init__(self, fields, export_format, include_header):
+        self.fields = fields
+        self.export_format = export_format
+        self.buffer = io.BytesIO()
+        self.rows = 0
+        if export_format == "csv" and include_header:
+            self.write_csv([fields])
+    
+    def write_csv(self, rows):
+        text = io.StringIO()
+        csv.writer(text, lineterminator="\r\n").writerows(rows)
+        self.buffer.write(text.getvalue().encode("utf-8"))
+    
+    def write_page(self, items):
+        if self.export_format == "csv":
+            self.write_csv([item.get(field) for field in self.fields] for item in items)
+        else:
+            for item in items:
+                self.buffer.write(encode_json({field: item[field] for field in self.fields if field in item}))
+                self.buffer.write(b"\n")
+        self.rows += len(items)
+    
+    def getvalue(self):
+        return self.buffer.getvalue()
+
+
+@app.route(route="employees/export", methods=["GET"])
+@instrumented
+async def export_employees(req: func.HttpRequest) -> func.HttpResponse:
+    """Export employees as NDJSON or CSV, one bounded segment per request"""
+    try:
+        container = get_container_ops()
+        
+        department = req.params.get("department")
+        updated_since = parse_updated_since(req.params.get("updatedSince"))
+        export_format = parse_export_format(req.params.get("format"))
+        fields = parse_fields(req.params.get("fields"))
+        
+        conditions, parameters = [], []
+        if department:
+            conditions.append("c.department = @department")
+            parameters.append({"name": "@department", "value": department})
+        if updated_since:
+            conditions.append("c.updatedAt >= @updatedSince")
+            parameters.append({"name": "@updatedSince", "value": updated_since})
+        where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"SELECT {select_clause(fields)} FROM c{where_clause}"
+        
+        signature = query_signature(query, parameters)
+        continuation_token = req.params.get("continuationToken")
+        cosmos_token = decode_continuation_token(continuation_token, signature)
+        
+        # The CSV header only opens the first segment, so segments concatenate into one file
+        writer = ExportWriter(fields, export_format, include_header=not continuation_token)
+        while writer.rows < EXPORT_SEGMENT_ROWS:
+            items, cosmos_token = await container.query_page(
+                cosmos_token,
+                query=query,
+                parameters=parameters,
+                enable_cross_partition_query=True,
+                max_item_count=min(EXPORT_PAGE_SIZE, EXPORT_SEGMENT_ROWS - writer.rows)
+            )
+            writer.write_page(items)
+            if not cosmos_token:
+                break
+        
+        headers = {
+            "Content-Disposition": f'attachment; filename="employees.{export_format}"',
+            "Cache-Control": "no-store",
+            "X-Export-Rows": str(writer.rows),
+        }
+        next_token = encode_continuation_token(cosmos_token, signature)
+        if next_token:
+            headers["X-Continuation-Token"] = next_token
+            headers["Link"] = f'<{export_link(req, next_token)}>; rel="next"'
+        body = compress_body(req, writer.getvalue(), headers)
+        return create_cors_response(body, status_code=200, headers=headers, mimetype=EXPORT_FORMATS[export_format])
+    except InvalidRequestError as e:
+        return json_response(
+            req,
+            {"error": str(e)},
+            status_code=400
+        )
+    except Exception as e:
+        handle_cosmos_error(e)
+        logging.error(f"Error exporting employees: {str(e)}")
+        return error_response(req, e)
+
+
+# ============================================================================
+# GET /api/employees/changes - Documents changed since a checkpoint
+# ============================================================================
+# Keyset pagination over the indexed (_ts, id) order, so a sync costs
+# O(changes) rather than O(headcount) and the checkpoint is just the last
+# (_ts, id) delivered. _ts has one-second resolution, so only seconds that
+# have closed (older than the settle window) are read: a later write can't
+# land behind the checkpoint inside a second that was already delivered.
+CHANGES_DEFAULT_LIMIT = int(os.environ.get("EmployeesChangesDefaultLimit", "500"))
+CHANGES_MAX_LIMIT = int(os.environ.get("EmployeesChangesMaxLimit", "1000"))
+CHANGES_SETTLE_SECONDS = int(os.environ.get("EmployeesChangesSettleSeconds", "5"))
+
+TOMBSTONE_FIELDS = ["id", PARTITION_KEY_FIELD, "deletedAt", "updatedAt"]
+
+
+def encode_checkpoint(ts, last_id, signature):
+    """Opaque checkpoint: the (_ts, id) of the last change delivered"""
+    raw = json.dumps({"q": signature, "t": ts, "i": last_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_checkpoint(token, signature):
+    """Unwrap a checkpoint, returning (_ts, id)"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        ts, last_id = int(payload["t"]), str(payload["i"])
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise InvalidRequestError("Invalid checkpoint")
+    if payload.get("q") != signature:
+        raise InvalidRequestError("checkpoint does not match this query")
+    return ts, last_id
+
+
+def change_record(document):
+    """A changed employee, or a tombstone for a soft-deleted one"""
+    if document.get("isActive") is False and document.get("deletedAt"):
+        record = {field: document[field] for field in TOMBSTONE_FIELDS if field in document}
+        record["deleted"] = True
+        return record
+    record = strip_system_properties(document)
+    record.pop(SEARCH_TOKENS_FIELD, None)
+    record["deleted"] = False
+    return record
+
+
+@app.route(route="employees/changes", methods=["GET"])
+@instrumented
+async def get_employee_changes(req: func.HttpRequest) -> func.HttpResponse:
+    """Employees created, updated or soft-deleted since a checkpoint (oldest first)"""
+    try:
+        container = get_container_ops()
+        
+        department = req.params.get("department")
+        checkpoint = req.params.get("checkpoint")
+        since = parse_timestamp(req.params.get("since"), "since")
+        try:
+            limit = int(req.params.get("limit", CHANGES_DEFAULT_LIMIT))
+        except ValueError:
+            raise InvalidRequestError("limit must be an integer")
+        if limit < 1:
+            raise InvalidRequestError("limit must be at least 1")
+        limit = min(limit, CHANGES_MAX_LIMIT)
+        
+        where_clause = "(c._ts > @ts OR (c._ts = @ts AND c.id > @id)) AND c._ts <= @until"
+        parameters = []
+        if department:
+            where_clause += " AND c.department = @department"
+            parameters.append({"name": "@department", "value": department})
+        signature = query_signature(where_clause, parameters)
+        
+        if checkpoint:
+            ts, last_id = decode_checkpoint(checkpoint, signature)
+        else:
+            # No checkpoint: start from ?since= or replay everything
+            ts = int(since.replace(tzinfo=timezone.utc).timestamp()) if since else 0
+            last_id = ""
+        
+        until = int(time.time()) - CHANGES_SETTLE_SECONDS
+        documents = await container.query(
+            query=f"SELECT TOP {limit} * FROM c WHERE {where_clause} ORDER BY c._ts, c.id",
+            parameters=[
+                {"name": "@ts", "value": ts},
+                {"name": "@id", "value": last_id},
+                {"name": "@until", "value": until},
+            ] + parameters,
+            enable_cross_partition_query=True
+        )
+        if documents:
+            ts, last_id = documents[-1]["_ts"], documents[-1]["id"]
+        
+        return json_response(
+            req,
+            {
+                "changes": [change_record(document) for document in documents],
+                "checkpoint": encode_checkpoint(ts, last_id, signature),
+                "hasMore": len(documents) == limit,
+            },
+            headers={"Cache-Control": "no-store"}
         )
+    except InvalidRequestError as e:
+        return json_response(
+            req,
+            {"error": str(e)},
+            status_code=400
+        )
+    except Exception as e:
+        handle_cosmos_error(e)
+        logging.error(f"Error getting employee changes: {str(e)}")
+        return error_response(req, e)
 
 
 # ============================================================================
 # GET /api/employees/{id} - Get single employee
 # ============================================================================
 @app.route(route="employees/{id}", methods=["GET"])
-def get_employee(req: func.HttpRequest) -> func.HttpResponse:
+@instrumented
+async def get_employee(req: func.HttpRequest) -> func.HttpResponse:
     """Get a single employee by ID"""
     try:
         employee_id = req.route_params.get("id")
-        container = get_container()
+        container = get_container_ops()
         
-        # Query by id (need to search across partitions)
-        query = "SELECT * FROM c WHERE c.id = @id"
-        parameters = [{"name": "@id", "value": employee_id}]
-        items = list(container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True))
+        employee = await find_employee(container, employee_id, resolve_partition_key(req, employee_id), use_cache=True)
         
-        if not items:
-            return create_cors_response(
-                json.dumps({"error": "Employee not found"}),
+        if not employee:
+            return json_response(
+                req,
+                {"error": "Employee not found"},
                 status_code=404
             )
         
-        return create_cors_response(
-            json.dumps(items[0]),
-            status_code=200
-        )
+        # Cosmos _etag values are already quoted strong validators
+        return conditional_response(req, employee, employee.get("_etag") or list_etag([employee]), CACHE_CONTROL_EMPLOYEE)
     except Exception as e:
+        handle_cosmos_error(e)
         logging.error(f"Error getting employee: {str(e)}")
-        return create_cors_response(
-            json.dumps({"error": str(e)}),
-            status_code=500
-        )
+        return error_response(req, e)
 
 
 # ============================================================================
 # POST /api/employees - Create new employee
 # ============================================================================
 @app.route(route="employees", methods=["POST"])
-def create_employee(req: func.HttpRequest) -> func.HttpResponse:
+@instrumented
+async def create_employee(req: func.HttpRequest) -> func.HttpResponse:
     """Create a new employee"""
     try:
         body = req.get_json()
         
         # Validate required fields
-        required_fields = ["firstName", "lastName", "email", "department"]
-        for field in required_fields:
-            if field not in body:
-                return func.HttpResponse(
-                    json.dumps({"error": f"Missing required field: {field}"}),
-                    mimetype="application/json",
-                    status_code=400
-                )
+        missing = missing_required_field(body)
+        if missing:
+            return json_response(
+                req,
+                {"error": f"Missing required field: {missing}"},
+                status_code=400
+            )
         
-        container = get_container()
+        container = get_container_ops()
         
         # Create employee document
-        employee = {
-            "id": str(uuid.uuid4()),
-            "firstName": body["firstName"],
-            "lastName": body["lastName"],
-            "email": body["email"],
-            "department": body["department"],
-            "position": body.get("position", ""),
-            "phone": body.get("phone", ""),
-            "hireDate": body.get("hireDate", datetime.utcnow().strftime("%Y-%m-%d")),
-            "salary": body.get("salary", 0),
-            "isActive": True,
-            "createdAt": datetime.utcnow().isoformat(),
-            "updatedAt": datetime.utcnow().isoformat()
-        }
+        employee = build_employee(body)
         
         # Insert into Cosmos DB
-        created = container.create_item(body=employee)
+        created = await container.create_item(body=employee)
+        employee_written(created)
+        await apply_department_deltas(department_deltas(None, created))
         
-        return func.HttpResponse(
-            json.dumps(created),
-            mimetype="application/json",
+        return json_response(
+            req,
+            created,
             status_code=201
         )
     except Exception as e:
+        handle_cosmos_error(e)
         logging.error(f"Error creating employee: {str(e)}")
-        return func.HttpResponse(
-            json.dumps({"error": str(e)}),
-            mimetype="application/json",
-            status_code=500
+        return error_response(req, e)
+
+
+# ============================================================================
+# POST /api/employees:batch - Bulk create/upsert employees
+# ============================================================================
+BATCH_MAX_ITEMS = int(os.environ.get("EmployeesBatchMaxItems", "1000"))
+BATCH_CONCURRENCY = int(os.environ.get("EmployeesBatchConcurrency", "16"))
+
+
+def parse_batch_body(req):
+    """Employees from a JSON array or NDJSON request body"""
+    raw = req.get_body().decode("utf-8").strip()
+    content_type = req.headers.get("Content-Type", "")
+    if "ndjson" in content_type or (raw and not raw.startswith("[")):
+        return [json.loads(line) for line in raw.splitlines() if line.strip()]
+    items = json.loads(raw or "[]")
+    if not isinstance(items, list):
+        raise ValueError("Request body must be a JSON array or NDJSON")
+    return items
+
+
+async def write_batch_item(container, index, body, upsert, semaphore, existing=None):
+    """Validate and write one batch item, returning (result, department deltas)"""
+    if not isinstance(body, dict):
+        return {"index": index, "status": 400, "error": "Item must be a JSON object"}, {}
+    missing = missing_required_field(body)
+    if missing:
+        return {"index": index, "status": 400, "error": f"Missing required field: {missing}"}, {}
+    
+    employee = build_employee(body, employee_id=body.get("id"))
+    async with semaphore:
+        try:
+            if upsert:
+                written, deltas = await upsert_batch_item(container, employee, existing)
+                status = 200
+            else:
+                written = await container.create_item(body=employee)
+                deltas = department_deltas(None, written)
+                status = 201
+        except (exceptions.CosmosHttpResponseError, CosmosBusyError) as e:
+            handle_cosmos_error(e)
+            return {"index": index, "id": employee["id"], "status": e.status_code, "error": e.message}, {}
+    
+    employee_written(written)
+    return {"index": index, "id": written["id"], "status": status}, deltas
+
+
+async def find_employees(container, employee_ids):
+    """Current documents for many ids, wherever they live: point reads where the
+    partition index knows the partition, one cross-partition query for the rest"""
+    employee_ids = list(dict.fromkeys(employee_ids))
+    with _partition_index_lock:
+        known = {employee_id: _partition_index.get(employee_id) for employee_id in employee_ids}
+    
+    async def point_read(employee_id, partition_key):
+        try:
+            return await container.read_item(item=employee_id, partition_key=partition_key)
+        except exceptions.CosmosResourceNotFoundError:
+            forget_partition_key(employee_id)
+            return None
+    
+    indexed = [(employee_id, pk) for employee_id, pk in known.items() if pk]
+    reads = await asyncio.gather(*[point_read(employee_id, pk) for employee_id, pk in indexed])
+    found = {item["id"]: item for item in reads if item}
+    
+    unknown = [employee_id for employee_id in employee_ids if employee_id not in found]
+    if unknown:
+        items = await container.query(
+            query="SELECT * FROM c WHERE ARRAY_CONTAINS(@ids, c.id)",
+            parameters=[{"name": "@ids", "value": unknown}],
+            enable_cross_partition_query=True
+        )
+        for item in items:
+            found.setdefault(item["id"], item)
+    for item in found.values():
+        remember_partition_key(item)
+    return found
+
+
+async def upsert_batch_item(container, employee, existing):
+    """Create or replace one employee wherever its id already lives, returning (written, deltas)
+    
+    existing is the current document with this id (from find_employees), so a
+    department change moves it instead of leaving a second copy in the old
+    partition. Writes are conditional on its ETag so the summary deltas stay exact.
+    """
+    changes = {field: value for field, value in employee.items() if field not in ("id", SEARCH_TOKENS_FIELD)}
+    for attempt in range(MAX_CONFLICT_RETRIES):
+        try:
+            if existing is None:
+                written = await container.create_item(body=employee)
+            elif existing.get(PARTITION_KEY_FIELD) == employee[PARTITION_KEY_FIELD]:
+                written = await container.replace_item(
+                    item=employee["id"], body=employee, **if_match_condition(existing.get("_etag"))
+                )
+            else:
+                # Department changed (or a legacy document) - move it the way updates do
+                written = await apply_employee_update(container, existing, changes, existing.get("_etag"))
+            return written, department_deltas(existing, written)
+        except (exceptions.CosmosResourceExistsError, exceptions.CosmosAccessConditionFailedError):
+            if attempt == MAX_CONFLICT_RETRIES - 1:
+                raise
+            # Written by someone else since we looked - find its current version and retry
+            existing = await find_employee(container, employee["id"])
+
+
+@app.route(route="employees:batch", methods=["OPTIONS"])
+@instrumented
+def options_employees_batch(req: func.HttpRequest) -> func.HttpResponse:
+    """Handle CORS preflight requests for bulk import"""
+    return create_cors_response("", status_code=200)
+
+
+@app.route(route="employees:batch", methods=["POST"])
+@instrumented
+async def batch_employees(req: func.HttpRequest) -> func.HttpResponse:
+    """Create (or with ?mode=upsert, upsert) many employees with bounded concurrency"""
+    try:
+        try:
+            items = parse_batch_body(req)
+        except ValueError as e:
+            return json_response(
+                req,
+                {"error": f"Invalid batch body: {str(e)}"},
+                status_code=400
+            )
+        
+        if len(items) > BATCH_MAX_ITEMS:
+            return json_response(
+                req,
+                {"error": f"Batch too large: {len(items)} items (max {BATCH_MAX_ITEMS})"},
+                status_code=413
+            )
+        
+        upsert = req.params.get("mode", "create").lower() == "upsert"
+        container = get_container_ops()
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        # Upserts replace (or move) whatever document already has the id, in any department
+        ids = [body.get("id") if isinstance(body, dict) and isinstance(body.get("id"), str) else None for body in items]
+        existing = await find_employees(container, [i for i in ids if i]) if upsert else {}
+        outcomes = await asyncio.gather(*[
+            write_batch_item(container, index, body, upsert, semaphore, existing.get(ids[index]))
+            for index, body in enumerate(items)
+        ])
+        
+        # One summary update for the whole batch instead of one per employee
+        results = [result for result, _ in outcomes]
+        totals = {}
+        for _, deltas in outcomes:
+            for key, (name, delta) in deltas.items():
+                _, current = totals.get(key, (name, 0))
+                totals[key] = (name, current + delta)
+        await apply_department_deltas({k: v for k, v in totals.items() if v[1]})
+        
+        failed = sum(1 for r in results if r["status"] >= 300)
+        return json_response(
+            req,
+            {"results": results, "succeeded": len(results) - failed, "failed": failed},
+            status_code=207 if failed else (200 if upsert else 201)
         )
+    except Exception as e:
+        handle_cosmos_error(e)
+        logging.error(f"Error importing employees: {str(e)}")
+        return error_response(req, e)
 
 
 # ============================================================================
 # PUT /api/employees/{id} - Update employee
 # ============================================================================
 @app.route(route="employees/{id}", methods=["PUT"])
-def update_employee(req: func.HttpRequest) -> func.HttpResponse:
-    """Update an existing employee"""
+@instrumented
+async def update_employee(req: func.HttpRequest) -> func.HttpResponse:
+    """Update an existing employee (partial update; honours If-Match)"""
     try:
         employee_id = req.route_params.get("id")
         body = req.get_json()
-        container = get_container()
+        container = get_container_ops()
+        if_match = req.headers.get("If-Match")
+        changes = {field: body[field] for field in UPDATABLE_FIELDS if field in body}
+        partition_key = resolve_partition_key(req, employee_id)
         
-        # Find existing employee
-        query = "SELECT * FROM c WHERE c.id = @id"
-        parameters = [{"name": "@id", "value": employee_id}]
-        items = list(container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True))
-        
-        if not items:
-            return func.HttpResponse(
-                json.dumps({"error": "Employee not found"}),
-                mimetype="application/json",
-                status_code=404
-            )
+        # Fast path - a single patch when we know the partition and don't need the old values
+        # (search tokens can be rebuilt from the body only when it carries every searchable field)
+        searchable = [field for field in SEARCHABLE_FIELDS if field in changes]
+        if (partition_key and not any(field in changes for field in STATEFUL_FIELDS)
+                and len(searchable) in (0, len(SEARCHABLE_FIELDS))):
+            try:
+                updated = await patch_employee(container, employee_id, partition_key, with_search_tokens(changes), if_match)
+                return employee_response(req, updated)
+            except exceptions.CosmosResourceNotFoundError:
+                forget_partition_key(employee_id)
+                partition_key = None
+            except exceptions.CosmosAccessConditionFailedError:
+                return precondition_failed_response(req)
+
+        for attempt in range(MAX_CONFLICT_RETRIES):
+            # Find existing employee
+            existing = await find_employee(container, employee_id, partition_key)
+            
+            if not existing:
+                return json_response(
+                    req,
+                    {"error": "Employee not found"},
+                    status_code=404
+                )
+            
+            if if_match and existing.get("_etag") != if_match:
+                return precondition_failed_response(req)
+            
+            try:
+                updated = await apply_employee_update(container, existing, changes, if_match or existing.get("_etag"))
+            except exceptions.CosmosAccessConditionFailedError:
+                if if_match:
+                    return precondition_failed_response(req)
+                continue  # Someone else wrote between our read and patch - re-read and retry
+            except exceptions.CosmosResourceExistsError:
+                return json_response(
+                    req,
+                    {"error": "An employee with this id already exists in the target department"},
+                    status_code=409
+                )
+            
+            await apply_department_deltas(department_deltas(existing, updated))
+            return employee_response(req, updated)
         
-        existing = items[0]
-        
-        # Update fields
-        existing["firstName"] = body.get("firstName", existing["firstName"])
-        existing["lastName"] = body.get("lastName", existing["lastName"])
-        existing["email"] = body.get("email", existing["email"])
-        existing["department"] = body.get("department", existing["department"])
-        existing["position"] = body.get("position", existing.get("position", ""))
-        existing["phone"] = body.get("phone", existing.get("phone", ""))
-        existing["salary"] = body.get("salary", existing.get("salary", 0))
-        existing["isActive"] = body.get("isActive", existing.get("isActive", True))
-        existing["updatedAt"] = datetime.utcnow().isoformat()
-        
-        # Replace in Cosmos DB
-        updated = container.replace_item(item=existing["id"], body=existing)
-        
-        return func.HttpResponse(
-            json.dumps(updated),
-            mimetype="application/json",
-            status_code=200
-        )
+        return precondition_failed_response(req)
     except Exception as e:
+        handle_cosmos_error(e)
         logging.error(f"Error updating employee: {str(e)}")
-        return func.HttpResponse(
-            json.dumps({"error": str(e)}),
-            mimetype="application/json",
-            status_code=500
-        )
+        return error_response(req, e)
 
 
 # ============================================================================
 # DELETE /api/employees/{id} - Delete employee
 # ============================================================================
 @app.route(route="employees/{id}", methods=["DELETE"])
-def delete_employee(req: func.HttpRequest) -> func.HttpResponse:
-    """Delete an employee (soft delete)"""
+@instrumented
+async def delete_employee(req: func.HttpRequest) -> func.HttpResponse:
+    """Delete an employee (soft delete as a single conditional patch)"""
     try:
         employee_id = req.route_params.get("id")
-        container = get_container()
-        
-        # Find existing employee
-        query = "SELECT * FROM c WHERE c.id = @id"
-        parameters = [{"name": "@id", "value": employee_id}]
-        items = list(container.query_items(query=query, parameters=parameters, enable_cross_partition_query=True))
-        
-        if not items:
-            return func.HttpResponse(
-                json.dumps({"error": "Employee not found"}),
-                mimetype="application/json",
-                status_code=404
-            )
-        
-        existing = items[0]
-        
-        # Soft delete - mark as inactive
-        existing["isActive"] = False
-        existing["deletedAt"] = datetime.utcnow().isoformat()
-        existing["updatedAt"] = datetime.utcnow().isoformat()
+        container = get_container_ops()
+        if_match = req.headers.get("If-Match")
+        partition_key = resolve_partition_key(req, employee_id)
+        soft_delete = {"isActive": False, "deletedAt": datetime.utcnow().isoformat()}
         
-        container.replace_item(item=existing["id"], body=existing)
+        for attempt in range(2):
+            if not partition_key:
+                # Find existing employee
+                existing = await find_employee(container, employee_id)
+                
+                if not existing:
+                    return json_response(
+                        req,
+                        {"error": "Employee not found"},
+                        status_code=404
+                    )
+                
+                if if_match and existing.get("_etag") != if_match:
+                    return precondition_failed_response(req)
+                
+                if PARTITION_KEY_FIELD not in existing:
+                    # Legacy document - move it into its departmentId partition while deleting
+                    deleted = await apply_employee_update(container, existing, soft_delete, if_match)
+                    await apply_department_deltas(department_deltas(existing, deleted))
+                    return deleted_response(req)
+                partition_key = existing[PARTITION_KEY_FIELD]
+            
+            try:
+                # Only matches active employees, so the summary is decremented exactly once
+                deleted = await patch_employee(
+                    container, employee_id, partition_key, soft_delete, if_match,
+                    filter_predicate="FROM c WHERE c.isActive = true"
+                )
+            except exceptions.CosmosResourceNotFoundError:
+                forget_partition_key(employee_id)
+                partition_key = None
+                continue
+            except exceptions.CosmosAccessConditionFailedError:
+                if if_match:
+                    return precondition_failed_response(req)
+                return deleted_response(req)  # Already inactive
+            
+            await apply_department_deltas(department_deltas(dict(deleted, isActive=True), deleted))
+            return deleted_response(req)
         
-        return func.HttpResponse(
-            json.dumps({"message": "Employee deleted successfully"}),
-            mimetype="application/json",
-            status_code=200
+        return json_response(
+            req,
+            {"error": "Employee not found"},
+            status_code=404
         )
     except Exception as e:
+        handle_cosmos_error(e)
         logging.error(f"Error deleting employee: {str(e)}")
-        return func.HttpResponse(
-            json.dumps({"error": str(e)}),
-            mimetype="application/json",
-            status_code=500
-        )
+        return error_response(req, e)
 
 
 # ============================================================================
 # GET /api/departments - Get department statistics
 # ============================================================================
 @app.route(route="departments", methods=["GET"])
-def get_departments(req: func.HttpRequest) -> func.HttpResponse:
-    """Get department statistics"""
+@instrumented
+async def get_departments(req: func.HttpRequest) -> func.HttpResponse:
+    """Get department statistics (single point read of the summary document)"""
     try:
-        container = get_container()
+        summary = await get_department_stats()
         
-        # Get all active employees
-        query = "SELECT c.department FROM c WHERE c.isActive = true"
-        items = list(container.query_items(query=query, enable_cross_partition_query=True))
+        # The summary document's own ETag changes on every counter update
+        etag = weak_etag(summary.get("_etag"), summary.get("rebuiltAt"))
+        return conditional_response(req, {"departments": department_list(summary)}, etag, CACHE_CONTROL_DEPARTMENTS)
+    except Exception as e:
+        handle_cosmos_error(e)
+        logging.error(f"Error getting departments: {str(e)}")
+        return error_response(req, e)
+
+
+# ============================================================================
+# GET /api/dashboard - Headcount summary and recent hires in one response
+# ============================================================================
+DASHBOARD_DEFAULT_RECENT_HIRES = 5
+DASHBOARD_MAX_RECENT_HIRES = 20
+
+RECENT_HIRE_FIELDS = ["id", "firstName", "lastName", "department", "departmentId", "position", "hireDate", "_etag"]
+
+
+async def build_dashboard(recent):
+    """Counts from the department summary plus the latest hires (TOP n by hireDate)"""
+    # isActive DESC, hireDate DESC walks the (isActive, hireDate) composite index backwards
+    summary, recent_hires = await asyncio.gather(
+        get_department_stats(),
+        get_container_ops().query(
+            query=f"SELECT TOP {recent} {select_clause(RECENT_HIRE_FIELDS)} FROM c "
+                  "WHERE c.isActive = true ORDER BY c.isActive DESC, c.hireDate DESC",
+            enable_cross_partition_query=True
+        )
+    )
+    names = summary.get("names", {})
+    departments = []
+    for department_id in sorted(set(summary.get("active", {})) | set(summary.get("inactive", {}))):
+        active = summary.get("active", {}).get(department_id, 0)
+        inactive = summary.get("inactive", {}).get(department_id, 0)
+        if active > 0 or inactive > 0:
+            departments.append({"name": names.get(department_id, department_id), "count": active, "inactive": inactive})
+    
+    active = sum(department["count"] for department in departments)
+    inactive = sum(department["inactive"] for department in departments)
+    return {
+        "headcount": active + inactive,
+        "active": active,
+        "inactive": inactive,
+        "departments": departments,
+        "recentHires": recent_hires,
+        "summaryEtag": summary.get("_etag"),
+        "rebuiltAt": summary.get("rebuiltAt"),
+    }
+
+
+@app.route(route="dashboard", methods=["GET"])
+@instrumented
+async def get_dashboard(req: func.HttpRequest) -> func.HttpResponse:
+    """Dashboard totals, per-department counts and recent hires (cost independent of headcount)"""
+    try:
+        try:
+            recent = int(req.params.get("recent", DASHBOARD_DEFAULT_RECENT_HIRES))
+        except ValueError:
+            raise InvalidRequestError("recent must be an integer")
+        if not 0 < recent <= DASHBOARD_MAX_RECENT_HIRES:
+            raise InvalidRequestError(f"recent must be between 1 and {DASHBOARD_MAX_RECENT_HIRES}")
         
-        # Count by department
-        dept_counts = {}
-        for item in items:
-            dept = item.get("department", "Unknown")
-            dept_counts[dept] = dept_counts.get(dept, 0) + 1
+        dashboard = await read_cache.get_or_load(("dashboard", recent), lambda: build_dashboard(recent))
         
-        departments = [{"name": k, "count": v} for k, v in dept_counts.items()]
+        etag = list_etag(dashboard["recentHires"], dashboard["summaryEtag"], dashboard["rebuiltAt"])
+        body = {k: v for k, v in dashboard.items() if k not in ("summaryEtag", "rebuiltAt")}
+        body["recentHires"] = [strip_system_properties(hire) for hire in dashboard["recentHires"]]
+        return conditional_response(req, body, etag, CACHE_CONTROL_DASHBOARD)
+    except InvalidRequestError as e:
+        return json_response(
+            req,
+            {"error": str(e)},
+            status_code=400
+        )
+    except Exception as e:
+        handle_cosmos_error(e)
+        logging.error(f"Error getting dashboard: {str(e)}")
+        return error_response(req, e)
+
+
+# ============================================================================
+# POST /api/departments/rebuild - Recompute department statistics
+# ============================================================================
+# Costs a full set of cross-partition COUNT queries, so it needs a function key
+@app.route(route="departments/rebuild", methods=["POST"], auth_level=func.AuthLevel.FUNCTION)
+@instrumented
+async def rebuild_departments(req: func.HttpRequest) -> func.HttpResponse:
+    """Rebuild the department summary from scratch (use when counts drift)"""
+    try:
+        summary = await rebuild_department_stats()
         
-        return func.HttpResponse(
-            json.dumps({"departments": departments}),
-            mimetype="application/json",
+        return json_response(
+            req,
+            {"departments": department_list(summary), "rebuiltAt": summary["rebuiltAt"]},
             status_code=200
         )
     except Exception as e:
-        logging.error(f"Error getting departments: {str(e)}")
-        return func.HttpResponse(
-            json.dumps({"error": str(e)}),
-            mimetype="application/json",
-            status_code=500
-        )
+        handle_cosmos_error(e)
+        logging.error(f"Error rebuilding departments: {str(e)}")
+        return error_response(req, e)
@@ -1,23 +1,48 @@
 import React, { useState, useEffect } from 'react';
 import { BrowserRouter as Router, Routes, Route, Link, useNavigate, useParams } from 'react-router-dom';
-import { QueryClient, QueryClientProvider, useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { QueryClient, QueryClientProvider, useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 
 // API Configuration
 const API_BASE_URL = window.REACT_APP_API_URL || process.env.REACT_APP_API_URL || '/api';
 
 const queryClient = new QueryClient();
 
+// Partition keys seen in list responses, so single-employee calls can be point reads
+const partitionKeys = new Map();
+
+const employeeUrl = (id) => {
+  const departmentId = partitionKeys.get(id);
+  const base = `${API_BASE_URL}/employees/${id}`;
+  return departmentId ? `${base}?departmentId=${encodeURIComponent(departmentId)}` : base;
+};
+
+// Columns the employee table shows (plus departmentId for point reads)
+const LIST_FIELDS = 'firstName,lastName,email,department,departmentId,position,isActive';
+
+// Compact list responses send field names once and each employee as an array
+const decodeEmployeeList = (data) => {
+  if (!data.rows) return data;
+  const employees = data.rows.map(row => Object.fromEntries(data.fields.map((field, i) => [field, row[i]])));
+  return { ...data, employees };
+};
+
 // API Functions
 const api = {
   getEmployees: async (params = {}) => {
-    const searchParams = new URLSearchParams(params).toString();
+    // Drop unset filters so they don't reach the API as "undefined"
+    const definedParams = Object.fromEntries(Object.entries(params).filter(([, v]) => v !== undefined && v !== ''));
+    const searchParams = new URLSearchParams(definedParams).toString();
     const url = searchParams ? `${API_BASE_URL}/employees?${searchParams}` : `${API_BASE_URL}/employees`;
     const res = await fetch(url);
     if (!res.ok) throw new Error('Failed to fetch employees');
-    return res.json();
+    const data = decodeEmployeeList(await res.json());
+    (data.employees || []).forEach(emp => {
+      if (emp.departmentId) partitionKeys.set(emp.id, emp.departmentId);
+    });
+    return data;
   },
   getEmployee: async (id) => {
-    const res = await fetch(`${API_BASE_URL}/employees/${id}`);
+    const res = await fetch(employeeUrl(id));
     if (!res.ok) throw new Error('Failed to fetch employee');
     return res.json();
   },
@@ -30,17 +55,21 @@ const api = {
     if (!res.ok) throw new Error('Failed to create employee');
     return res.json();
   },
-  updateEmployee: async ({ id, data }) => {
-    const res = await fetch(`${API_BASE_URL}/employees/${id}`, {
+  updateEmployee: async ({ id, data, etag }) => {
+    const headers = { 'Content-Type': 'application/json' };
+    // Reject the save if someone else changed the employee since it was loaded
+    if (etag) headers['If-Match'] = etag;
+    const res = await fetch(employeeUrl(id), {
       method: 'PUT',
-      headers: { 'Content-Type': 'application/json' },
+      headers,
       body: JSON.stringify(data),
     });
+    if (res.status === 412) throw new Error('This employee was changed by someone else - reload to see the latest version');
     if (!res.ok) throw new Error('Failed to update employee');
     return res.json();
   },
   deleteEmployee: async (id) => {
-    const res = await fetch(`${API_BASE_URL}/employees/${id}`, { method: 'DELETE' });
+    const res = await fetch(employeeUrl(id), { method: 'DELETE' });
     if (!res.ok) throw new Error('Failed to delete employee');
     return res.json();
   },
@@ -49,6 +78,11 @@ const api = {
     if (!res.ok) throw new Error('Failed to fetch departments');
     return res.json();
   },
+  getDashboard: async () => {
+    const res = await fetch(`${API_BASE_URL}/dashboard`);
+    if (!res.ok) throw new Error('Failed to fetch dashboard');
+    return res.json();
+  },
 };
 
 // Header Component
@@ -67,20 +101,15 @@ function Header() {
 
 // Dashboard Page
 function Dashboard() {
-  const { data: employeesData, isLoading: loadingEmployees } = useQuery({
-    queryKey: ['employees'],
-    queryFn: () => api.getEmployees(),
-  });
-  
-  const { data: deptData, isLoading: loadingDepts } = useQuery({
-    queryKey: ['departments'],
-    queryFn: api.getDepartments,
+  const { data, isLoading } = useQuery({
+    queryKey: ['dashboard'],
+    queryFn: api.getDashboard,
   });
 
-  if (loadingEmployees || loadingDepts) return <div className="loading">Loading...</div>;
+  if (isLoading) return <div className="loading">Loading...</div>;
 
-  const employees = employeesData?.employees || [];
-  const departments = deptData?.departments || [];
+  const departments = data?.departments || [];
+  const recentHires = data?.recentHires || [];
 
   return (
     <div className="container">
@@ -88,7 +117,7 @@ function Dashboard() {
       
       <div className="stats-grid">
         <div className="stat-card">
-          <div className="stat-value">{employees.length}</div>
+          <div className="stat-value">{data?.headcount || 0}</div>
           <div className="stat-label">Total Employees</div>
         </div>
         <div className="stat-card">
@@ -96,9 +125,13 @@ function Dashboard() {
           <div className="stat-label">Departments</div>
         </div>
         <div className="stat-card">
-          <div className="stat-value">{employees.filter(e => e.isActive).length}</div>
+          <div className="stat-value">{data?.active || 0}</div>
           <div className="stat-label">Active Employees</div>
         </div>
+        <div className="stat-card">
+          <div className="stat-value">{data?.inactive || 0}</div>
+          <div className="stat-label">Inactive Employees</div>
+        </div>
       </div>
 
       <div className="card">
@@ -109,7 +142,8 @@ function Dashboard() {
           <thead>
             <tr>
               <th>Department</th>
-              <th>Employees</th>
+              <th>Active</th>
+              <th>Inactive</th>
             </tr>
           </thead>
           <tbody>
@@ -117,6 +151,33 @@ function Dashboard() {
               <tr key={dept.name}>
                 <td>{dept.name}</td>
                 <td>{dept.count}</td>
+                <td>{dept.inactive}</td>
+              </tr>
+            ))}
+          </tbody>
+        </table>
+      </div>
+
+      <div className="card">
+        <div className="card-header">
+          <span className="card-title">Recent Hires</span>
+        </div>
+        <table className="table">
+          <thead>
+            <tr>
+              <th>Name</th>
+              <th>Department</th>
+              <th>Position</th>
+              <th>Hire Date</th>
+            </tr>
+          </thead>
+          <tbody>
+            {recentHires.map(emp => (
+              <tr key={emp.id}>
+                <td><Link to={`/employees/${emp.id}`}>{emp.firstName} {emp.lastName}</Link></td>
+                <td>{emp.department}</td>
+                <td>{emp.position || '-'}</td>
+                <td>{emp.hireDate || '-'}</td>
               </tr>
             ))}
           </tbody>
@@ -130,28 +191,40 @@ function Dashboard() {
 function EmployeeList() {
   const [search, setSearch] = useState('');
   const [department, setDepartment] = useState('');
+  const [includeInactive, setIncludeInactive] = useState(false);
+  const [orderBy, setOrderBy] = useState('');
   const queryClient = useQueryClient();
   
-  const { data, isLoading, error } = useQuery({
-    queryKey: ['employees', { search, department }],
-    queryFn: () => api.getEmployees({ search: search || undefined, department: department || undefined }),
+  const { data, isLoading, error, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+    queryKey: ['employees', { search, department, includeInactive, orderBy }],
+    queryFn: ({ pageParam }) => api.getEmployees({
+      search, department, continuationToken: pageParam, fields: LIST_FIELDS, format: 'compact',
+      includeInactive: includeInactive ? 'true' : undefined,
+      // Search results are ranked by relevance, so sorting only applies to plain listings
+      orderBy: search ? undefined : orderBy,
+    }),
+    initialPageParam: undefined,
+    getNextPageParam: (lastPage) => lastPage.continuationToken || undefined,
   });
 
   const deleteMutation = useMutation({
     mutationFn: api.deleteEmployee,
-    onSuccess: () => queryClient.invalidateQueries(['employees']),
+    onSuccess: () => {
+      queryClient.invalidateQueries(['employees']);
+      queryClient.invalidateQueries(['dashboard']);
+    },
   });
 
   if (isLoading) return <div className="loading">Loading employees...</div>;
   if (error) return <div className="error">Error: {error.message}</div>;
 
-  const employees = data?.employees || [];
+  const employees = data?.pages.flatMap(page => page.employees) || [];
 
   return (
     <div className="container">
       <div className="card">
         <div className="card-header">
-          <span className="card-title">Employees ({employees.length})</span>
+          <span className="card-title">Employees ({employees.length}{hasNextPage ? '+' : ''})</span>
           <Link to="/employees/new"><button className="btn btn-primary">+ Add Employee</button></Link>
         </div>
 
@@ -170,6 +243,15 @@ function EmployeeList() {
             <option value="HR">HR</option>
             <option value="Finance">Finance</option>
           </select>
+          <select value={orderBy} onChange={(e) => setOrderBy(e.target.value)} disabled={!!search}>
+            <option value="">Unsorted</option>
+            <option value="lastName">Sort by last name</option>
+            <option value="hireDate">Sort by hire date</option>
+          </select>
+          <label>
+            <input type="checkbox" checked={includeInactive} onChange={(e) => setIncludeInactive(e.target.checked)} />
+            {' '}Show inactive
+          </label>
         </div>
 
         <table className="table">
@@ -213,6 +295,12 @@ function EmployeeList() {
             ))}
           </tbody>
         </table>
+
+        {hasNextPage && (
+          <button className="btn btn-secondary" onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+            {isFetchingNextPage ? 'Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -309,6 +397,7 @@ function AddEmployee() {
     mutationFn: api.createEmployee,
     onSuccess: () => {
       queryClient.invalidateQueries(['employees']);
+      queryClient.invalidateQueries(['dashboard']);
       navigate('/employees');
     },
   });
@@ -338,9 +427,10 @@ function EditEmployee() {
   });
 
   const mutation = useMutation({
-    mutationFn: (data) => api.updateEmployee({ id, data }),
+    mutationFn: (data) => api.updateEmployee({ id, data, etag: employee?._etag }),
     onSuccess: () => {
       queryClient.invalidateQueries(['employees']);
+      queryClient.invalidateQueries(['dashboard']);
       navigate('/employees');
     },
   });
@@ -8,10 +8,11 @@ module "cosmos_db" {
   resource_group_name = module.resource_group.name
   tags                = local.common_tags
 
-  database_name      = "employeedb"
-  container_name     = "employees"
-  partition_key_path = "/departmentId"
-  throughput         = var.cosmos_db_throughput
+  database_name           = "employeedb"
+  container_name          = "employees"
+  metadata_container_name = "metadata"
+  partition_key_path      = "/departmentId"
+  throughput              = var.cosmos_db_throughput
 
   # Network Security Configuration (Required)
   private_endpoint_subnet_id = module.virtualsubnet.subnets["private_endpoints"].id
@@ -12,11 +12,16 @@ module "function_app" {
   python_version = var.function_app_runtime_version
 
   app_settings = {
-    "CosmosDbEndpoint"         = module.cosmos_db.endpoint
-    "CosmosDbConnectionString" = module.cosmos_db.connection_string
-    "CosmosDbDatabaseName"     = module.cosmos_db.database_name
-    "CosmosDbContainerName"    = module.cosmos_db.container_name
-    "KeyVaultUri"              = module.key_vault.uri
+    "CosmosDbEndpoint"              = module.cosmos_db.endpoint
+    "CosmosDbConnectionString"      = module.cosmos_db.connection_string
+    "CosmosDbDatabaseName"          = module.cosmos_db.database_name
+    "CosmosDbContainerName"         = module.cosmos_db.container_name
+    "CosmosDbMetadataContainerName" = module.cosmos_db.metadata_container_name
+    "KeyVaultUri"                   = module.key_vault.uri
+    "CosmosClientMode"              = var.cosmos_client_mode
+    "ReadCacheEnabled"              = tostring(var.read_cache_enabled)
+    "ReadCacheTtlSeconds"           = tostring(var.read_cache_ttl_seconds)
+    "ReadCacheStaleSeconds"         = tostring(var.read_cache_stale_seconds)
   }
 
   app_insights_connection_string = var.enable_monitoring ? module.app_insights[0].connection_string : ""
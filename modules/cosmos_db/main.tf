@@ -9,6 +9,34 @@ terraform {
   }
 }
 
+locals {
+  # Employee fields no query filters or sorts on. Everything else stays indexed
+  # through /*: id, departmentId, department, isActive, lastName, hireDate,
+  # updatedAt, searchTokens and _ts
+  unindexed_employee_paths = [
+    "/firstName/?",
+    "/email/?",
+    "/phone/?",
+    "/position/?",
+    "/salary/?",
+    "/createdAt/?",
+    "/deletedAt/?",
+    "/\"_etag\"/?",
+  ]
+
+  # Equality filters lead, sort field last (see order_by_clause in function_app.py)
+  employee_composite_indexes = [
+    ["/isActive", "/department", "/lastName"],
+    ["/isActive", "/department", "/hireDate"],
+    ["/isActive", "/lastName"],
+    ["/isActive", "/hireDate"],
+    ["/department", "/lastName"],
+    ["/department", "/hireDate"],
+    # /api/employees/changes pages through (_ts, id)
+    ["/_ts", "/id"],
+  ]
+}
+
 # Cosmos DB Account with VNet filtering (Enterprise Secure)
 resource "azurerm_cosmosdb_account" "main" {
   name                              = var.name
@@ -60,6 +88,46 @@ resource "azurerm_cosmosdb_sql_container" "container" {
     included_path {
       path = "/*"
     }
+
+    # Never filtered or sorted on - skipping them saves index RU on every write
+    dynamic "excluded_path" {
+      for_each = local.unindexed_employee_paths
+      content {
+        path = excluded_path.value
+      }
+    }
+
+    # Sorted lists (orderBy=lastName|hireDate) for active-only, per-department
+    # and all-employee listings, plus the dashboard's recent hires
+    dynamic "composite_index" {
+      for_each = local.employee_composite_indexes
+      content {
+        dynamic "index" {
+          for_each = composite_index.value
+          content {
+            path  = index.value
+            order = "Ascending"
+          }
+        }
+      }
+    }
+  }
+}
+
+# Cosmos DB Container for application metadata (materialized summaries, probes)
+resource "azurerm_cosmosdb_sql_container" "metadata" {
+  name                = var.metadata_container_name
+  resource_group_name = var.resource_group_name
+  account_name        = azurerm_cosmosdb_account.main.name
+  database_name       = azurerm_cosmosdb_sql_database.database.name
+  partition_key_paths = ["/id"]
+
+  indexing_policy {
+    indexing_mode = "consistent"
+    # Only ever read by id - skip indexing entirely
+    excluded_path {
+      path = "/*"
+    }
   }
 }
 
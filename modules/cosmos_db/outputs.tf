@@ -30,3 +30,8 @@ output "container_name" {
   description = "Container name"
   value       = azurerm_cosmosdb_sql_container.container.name
 }
+
+output "metadata_container_name" {
+  description = "Metadata container name"
+  value       = azurerm_cosmosdb_sql_container.metadata.name
+}
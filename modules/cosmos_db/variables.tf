@@ -33,6 +33,12 @@ variable "container_name" {
   default     = "employees"
 }
 
+variable "metadata_container_name" {
+  description = "Metadata container name (summary documents, partitioned on /id)"
+  type        = string
+  default     = "metadata"
+}
+
 variable "partition_key_path" {
   description = "Partition key path"
   type        = string
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+=============================================================================
+BACKFILL SEARCH TOKENS - add /searchTokens to existing employee documents
+=============================================================================
+GET /api/employees?search= matches on the precomputed searchTokens array
+that the API writes with every create and update. Documents written before
+that field existed are invisible to search until this script has run.
+
+Each document gets a single patch operation (no full rewrite), so the
+backfill is cheap and safe to run while the app serves traffic. Documents
+drop out of the source query as they are patched, so a rerun simply picks
+up whatever is left.
+
+Use --all after changing the token rules in employee_model.py to recompute
+the field on every document.
+
+Usage:
+    python backfill-search-tokens.py --connection-string "<conn str>"
+    python backfill-search-tokens.py --endpoint <url> --key <key> --all
+
+Credentials default to the same environment variables the Function App uses
+(CosmosDbConnectionString, CosmosDbEndpoint, CosmosDbKey).
+=============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from azure.cosmos import exceptions
+from azure.cosmos.partition_key import NonePartitionKeyValue
+
+# Share the token rules with the Function App
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app" / "backend"))
+from employee_model import PARTITION_KEY_FIELD, SEARCH_TOKENS_FIELD, build_search_tokens  # noqa: E402
+from cosmos_script_helpers import Colors, get_client, next_documents, print_color, request_charge, with_retry  # noqa: E402
+
+MISSING_QUERY = f"SELECT * FROM c WHERE NOT IS_DEFINED(c.{SEARCH_TOKENS_FIELD})"
+ALL_QUERY = "SELECT * FROM c"
+
+
+def patch_page(container, documents):
+    """Set searchTokens on one page of documents, returning (patched, RU charge)."""
+    patched, charge = 0, 0.0
+    for document in documents:
+        tokens = build_search_tokens(document)
+        if document.get(SEARCH_TOKENS_FIELD) == tokens:
+            continue
+        # Legacy documents without departmentId live in the "undefined" partition
+        partition_key = document.get(PARTITION_KEY_FIELD, NonePartitionKeyValue)
+        try:
+            with_retry(lambda: container.patch_item(
+                item=document["id"],
+                partition_key=partition_key,
+                patch_operations=[{"op": "set", "path": f"/{SEARCH_TOKENS_FIELD}", "value": tokens}]
+            ))
+            patched += 1
+            charge += request_charge(container)
+        except exceptions.CosmosResourceNotFoundError:
+            pass  # Deleted or moved since the page was read
+    return patched, charge
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Populate /searchTokens on existing employee documents',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python backfill-search-tokens.py
+  python backfill-search-tokens.py --all
+        """
+    )
+    parser.add_argument('--connection-string', help='Cosmos DB connection string')
+    parser.add_argument('--endpoint', help='Cosmos DB endpoint')
+    parser.add_argument('--key', help='Cosmos DB key')
+    parser.add_argument('--database', default=os.environ.get("CosmosDbDatabaseName", "employeedb"))
+    parser.add_argument('--container', default=os.environ.get("CosmosDbContainerName", "employees"))
+    parser.add_argument('--all', action='store_true', help='Recompute tokens on every document, not only missing ones')
+    parser.add_argument('--page-size', type=int, default=100, help='Documents per page (default: 100)')
+
+    args = parser.parse_args()
+
+    client = get_client(args)
+    container = client.get_database_client(args.database).get_container_client(args.container)
+
+    print_color(Colors.CYAN, "============================================")
+    print_color(Colors.CYAN, "Backfilling employee search tokens")
+    print_color(Colors.CYAN, "============================================")
+
+    started = time.monotonic()
+    total_patched, total_ru, page_number = 0, 0.0, 0
+    if args.all:
+        pages = container.query_items(query=ALL_QUERY, enable_cross_partition_query=True,
+                                      max_item_count=args.page_size).by_page()
+        next_page = lambda: next_documents(pages)
+    else:
+        # Patched documents leave the result set, so always re-query from the start
+        def next_page():
+            pages = container.query_items(query=MISSING_QUERY, enable_cross_partition_query=True,
+                                          max_item_count=args.page_size).by_page()
+            return next_documents(pages)
+
+    while True:
+        documents = next_page()
+        if documents is None:
+            break
+        patched, charge = patch_page(container, documents)
+        if not patched and not args.all:
+            print_color(Colors.RED, "Documents are still missing searchTokens after patching - stopping")
+            sys.exit(1)
+        page_number += 1
+        total_patched += patched
+        total_ru += charge
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f"  page {page_number}: {total_patched} patched | "
+              f"{total_patched / elapsed:.1f} docs/s | {total_ru / elapsed:.1f} RU/s")
+
+    elapsed = time.monotonic() - started
+    print_color(Colors.GREEN, f"\n✓ Done: {total_patched} documents patched in {elapsed:.1f}s, {total_ru:.0f} RU")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+=============================================================================
+BENCHMARK API - Function App handlers against an in-memory Cosmos DB
+=============================================================================
+Runs the real HTTP handlers from app/backend/function_app.py in-process,
+with fake_cosmos.py standing in for Cosmos DB, so performance changes can be
+measured before they are deployed. For each dataset size the container is
+seeded directly, then every workload is driven through the handlers:
+
+  list         GET /api/employees, walking pages with continuationToken
+  search       GET /api/employees?search=<name prefix>
+  get          GET /api/employees/{id}?departmentId=...
+  update       PUT /api/employees/{id} with a partial body
+  departments  GET /api/departments
+
+Reported per workload: throughput, latency p50/p95/p99/max, simulated RU per
+request and peak traced memory (from a separate, shorter tracemalloc pass so
+tracing doesn't distort the timings). Results are written as JSON tagged with
+the git commit; pass an earlier file with --compare to see the change.
+
+Usage:
+    python benchmark-api.py
+    python benchmark-api.py --sizes 1000,10000 --requests 500 --concurrency 8
+    python benchmark-api.py --mode sync --latency-ms 5 --json before.json
+    python benchmark-api.py --json after.json --compare before.json
+=============================================================================
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = SCRIPT_DIR.parent / "app" / "backend"
+
+# ANSI colors
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    CYAN = '\033[0;36m'
+    NC = '\033[0m'  # No Color
+
+def print_color(color, message):
+    print(f"{color}{message}{Colors.NC}")
+
+WORKLOADS = ["list", "search", "get", "update", "departments"]
+
+DEPARTMENTS = ["Engineering", "Marketing", "Sales", "HR", "Finance", "Operations", "Legal", "Support"]
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "Michael", "Linda", "David", "Elizabeth", "Wei", "Priya",
+               "Carlos", "Fatima", "Kenji", "Olga", "Ahmed", "Sofia"]
+LAST_NAMES = ["Garcia", "Miller", "Davis", "Rodriguez", "Martinez", "Chen", "Patel", "Kim", "Nguyen", "Ivanova",
+              "Hassan", "Rossi", "Tanaka", "Murphy", "Schmidt", "Silva"]
+SEARCHES = ["gar", "chen", "pri", "mi", "kenji tan", "sofia r", "da", "olga"]
+
+# Requests in the tracemalloc pass (tracing makes every allocation slower)
+MEMORY_SAMPLE_REQUESTS = 20
+
+
+def git_commit():
+    """Short commit hash of the working tree, marked dirty when it has changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", str(BACKEND_DIR)], cwd=SCRIPT_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_function_app(args):
+    """Import function_app configured for the benchmark (must run before the first import)"""
+    os.environ["CosmosClientMode"] = args.mode
+    os.environ["ReadCacheEnabled"] = "false" if args.no_read_cache else "true"
+    os.environ.setdefault("CosmosDbEndpoint", "https://localhost:8081/")
+    sys.path.insert(0, str(BACKEND_DIR))
+    import azure.functions as func
+    import function_app
+    from employee_model import build_employee
+    # Per-request metric log lines would dominate the output
+    logging.disable(logging.INFO)
+    return func, function_app, build_employee
+
+
+class Harness:
+    """Calls handlers the way the Functions host does, on one event loop"""
+
+    def __init__(self, func, function_app, build_employee, latency_ms):
+        from fake_cosmos import FakeCosmosClient
+
+        self.func = func
+        self.app = function_app
+        self.build_employee = build_employee
+        self.database_name = os.environ.get("CosmosDbDatabaseName", "employeedb")
+        self.container_name = os.environ.get("CosmosDbContainerName", "employees")
+        self.client = FakeCosmosClient(
+            partition_keys={self.container_name: "/departmentId", function_app.METADATA_CONTAINER_NAME: "/id"},
+            latency_ms=latency_ms,
+        )
+        async_client = self.client.as_async()
+        function_app.reset_cosmos_client()
+        function_app.build_cosmos_client = lambda use_async=False: async_client if use_async else self.client
+        self.loop = asyncio.new_event_loop()
+        self.handlers = {}
+        self.employees = []
+        self.last_token = None
+
+    def container(self, name):
+        return self.client.container(self.database_name, name)
+
+    def reset_read_cache(self):
+        """Start every workload cold, with the cache settings the app was imported with"""
+        cache = self.app.read_cache
+        self.app.read_cache = self.app.ReadCache(cache.max_bytes, cache.ttl_seconds, cache.enabled,
+                                                cache.stale_seconds)
+
+    def request_charge(self):
+        return sum(container.total_request_charge for container in self.client._containers.values())
+
+    async def call(self, handler, method, url, params=None, route_params=None, body=None):
+        if handler not in self.handlers:
+            self.handlers[handler] = getattr(self.app, handler).build().get_user_function()
+        req = self.func.HttpRequest(
+            method, url, params=params or {}, route_params=route_params or {},
+            body=json.dumps(body).encode("utf-8") if body is not None else b"",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        response = self.handlers[handler](req)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+    def seed(self, size):
+        """Write size employees straight into the fake container and rebuild the summary"""
+        rng = random.Random(size)
+        container = self.container(self.container_name)
+        for i in range(size):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            employee = self.build_employee({
+                "firstName": first,
+                "lastName": last,
+                "email": f"{first}.{last}.{i}@example.com".lower(),
+                "department": rng.choice(DEPARTMENTS),
+                "position": "Engineer",
+                "phone": f"555-{i:07d}",
+                "hireDate": f"{rng.randint(2005, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "salary": rng.randrange(40000, 200000, 500),
+            })
+            container.create_item(body=employee)
+            self.employees.append((employee["id"], employee["departmentId"]))
+        self.loop.run_until_complete(self.call("rebuild_departments", "POST", "/api/departments/rebuild"))
+
+
+def workload_requests(harness, name, rng):
+    """Endless generator of (handler, method, url, params, route_params, body) for a workload"""
+    token = None
+    while True:
+        if name == "list":
+            params = {"limit": "100"}
+            if token:
+                params["continuationToken"] = token
+            yield "get_employees", "GET", "/api/employees", params, None, None
+        elif name == "search":
+            yield "get_employees", "GET", "/api/employees", {"search": rng.choice(SEARCHES)}, None, None
+        elif name == "get":
+            employee_id, department_id = rng.choice(harness.employees)
+            yield ("get_employee", "GET", f"/api/employees/{employee_id}", {"departmentId": department_id},
+                   {"id": employee_id}, None)
+        elif name == "update":
+            employee_id, department_id = rng.choice(harness.employees)
+            yield ("update_employee", "PUT", f"/api/employees/{employee_id}", {"departmentId": department_id},
+                   {"id": employee_id}, {"phone": f"555-{rng.randint(0, 9999999):07d}"})
+        elif name == "departments":
+            yield "get_departments", "GET", "/api/departments", None, None, None
+        # The list workload follows continuation tokens like a scrolling client
+        token = harness.last_token if name == "list" else None
+
+
+async def drive(harness, name, count, concurrency, rng):
+    """Send count requests with up to concurrency in flight, returning latencies and error count"""
+    requests = workload_requests(harness, name, rng)
+    latencies, errors = [], 0
+    harness.last_token = None
+    remaining = count
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            handler, method, url, params, route_params, body = next(requests)
+            started = time.perf_counter()
+            response = await harness.call(handler, method, url, params, route_params, body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            if name == "list":
+                harness.last_token = next_list_token(response)
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latencies, errors
+
+
+def next_list_token(response):
+    """continuationToken from a (possibly gzip-compressed) list response"""
+    import gzip
+    body = response.get_body()
+    if response.headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body).get("continuationToken")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_workload(harness, name, args):
+    """Timed pass plus a tracemalloc pass for one workload"""
+    rng = random.Random(name)
+    # Warm the handler and the client before timing, then start from an empty read cache
+    harness.loop.run_until_complete(drive(harness, name, min(10, args.requests), 1, rng))
+    harness.reset_read_cache()
+
+    charge_before = harness.request_charge()
+    started = time.perf_counter()
+    latencies, errors = harness.loop.run_until_complete(drive(harness, name, args.requests, args.concurrency, rng))
+    elapsed = time.perf_counter() - started
+    request_charge = harness.request_charge() - charge_before
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    harness.loop.run_until_complete(drive(harness, name, MEMORY_SAMPLE_REQUESTS, args.concurrency, rng))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "ru_per_request": round(request_charge / len(latencies), 2),
+        "peak_memory_kb": round((peak - baseline) / 1024, 1),
+    }
+
+
+def print_comparison(results, baseline_path):
+    """Change in p50 latency, throughput and RU against an earlier results file"""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print_color(Colors.CYAN, f"\nCompared with {baseline_path} (commit {baseline.get('commit')})")
+    print(f"{'employees':>10} {'workload':<12} {'p50':>10} {'throughput':>12} {'RU/req':>10}")
+    for size, workloads in results["results"].items():
+        for name, current in workloads.items():
+            before = baseline.get("results", {}).get(size, {}).get(name)
+            if not before:
+                continue
+            change = lambda key: (current[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            print(f"{size:>10} {name:<12} {change('p50_ms'):>+9.1f}% {change('throughput_rps'):>+11.1f}% "
+                  f"{change('ru_per_request'):>+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Function App handlers against an in-memory Cosmos DB')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated employee counts')
+    parser.add_argument('--workloads', default=','.join(WORKLOADS), help='Comma-separated workloads to run')
+    parser.add_argument('--requests', type=int, default=200, help='Timed requests per workload (default: 200)')
+    parser.add_argument('--concurrency', type=int, default=1, help='Requests in flight at once (default: 1)')
+    parser.add_argument('--mode', choices=['async', 'sync'], default='async', help='CosmosClientMode to benchmark')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Simulated Cosmos round trip per call')
+    parser.add_argument('--no-read-cache', action='store_true', help='Run with ReadCacheEnabled=false')
+    parser.add_argument('--json', default='benchmark-results.json', help='Results file (default: benchmark-results.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    workloads = [w.strip() for w in args.workloads.split(",")]
+    unknown = [w for w in workloads if w not in WORKLOADS]
+    if unknown:
+        print_color(Colors.RED, f"Unknown workloads: {', '.join(unknown)} (choose from {', '.join(WORKLOADS)})")
+        sys.exit(1)
+
+    func, function_app, build_employee = load_function_app(args)
+
+    print_color(Colors.CYAN, "============================================")
+    print_color(Colors.CYAN, "Employee API benchmark (in-memory Cosmos)")
+    print_color(Colors.CYAN, "============================================")
+    print(f"mode: {args.mode} | concurrency: {args.concurrency} | latency: {args.latency_ms} ms | "
+          f"read cache: {'off' if args.no_read_cache else 'on'} | requests per workload: {args.requests}\n")
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "results": {},
+    }
+    print(f"{'employees':>10} {'workload':<12} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'RU/req':>8} {'peak KB':>9} {'errors':>7}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        harness = Harness(func, function_app, build_employee, args.latency_ms)
+        seed_started = time.perf_counter()
+        harness.seed(size)
+        print_color(Colors.YELLOW, f"{size:>10} seeded in {time.perf_counter() - seed_started:.1f}s")
+
+        results["results"][str(size)] = {}
+        for name in workloads:
+            harness.reset_read_cache()
+            result = run_workload(harness, name, args)
+            results["results"][str(size)][name] = result
+            print(f"{size:>10} {name:<12} {result['throughput_rps']:>9.1f} {result['p50_ms']:>9.2f} "
+                  f"{result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['ru_per_request']:>8.2f} "
+                  f"{result['peak_memory_kb']:>9.1f} {result['errors']:>7}")
+        harness.loop.close()
+
+    Path(args.json).write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+    print_color(Colors.GREEN, "\n✓ Done")
+
+
+if __name__ == "__main__":
+    main()
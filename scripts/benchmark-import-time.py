@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+=============================================================================
+BENCHMARK IMPORT TIME - cold-start cost of loading the Function App module
+=============================================================================
+Measures what a fresh worker pays before it can answer its first request:
+
+  import      python -X importtime -c "import function_app"
+  health      the import plus one GET /api/health (must not load azure.cosmos)
+  cosmos      the import plus loading the Cosmos SDK the way the first
+              data request does
+  appinsights the import with APPLICATIONINSIGHTS_CONNECTION_STRING set, as
+              in Azure, so configure_otel() sets up the exporter (must not
+              attach a log exporter - the host already ships the logs)
+
+Each scenario runs in a fresh interpreter several times; the median is
+reported together with the slowest modules from -X importtime. Use
+--max-import-ms in CI to fail when cold start regresses.
+
+Usage:
+    python benchmark-import-time.py
+    python benchmark-import-time.py --runs 10 --top 15
+    python benchmark-import-time.py --max-import-ms 400 --json import-time.json
+=============================================================================
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "app" / "backend"
+
+# ANSI colors
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    CYAN = '\033[0;36m'
+    NC = '\033[0m'  # No Color
+
+def print_color(color, message):
+    print(f"{color}{message}{Colors.NC}")
+
+HEAVY_MODULES = ("azure.cosmos", "azure.identity")
+
+SCENARIOS = {
+    "import": "import function_app",
+    "health": (
+        "import sys, azure.functions as func, function_app\n"
+        "handler = function_app.health_check.build().get_user_function()\n"
+        "handler(func.HttpRequest('GET', '/api/health', body=b''))\n"
+        "handler = function_app.options_employees.build().get_user_function()\n"
+        "handler(func.HttpRequest('OPTIONS', '/api/employees', body=b''))\n"
+        f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "assert not loaded, f'health/OPTIONS loaded {loaded}'\n"
+    ),
+    "cosmos": "import function_app, azure.cosmos, azure.cosmos.aio",
+    "appinsights": (
+        "import logging, function_app\n"
+        "exporters = [h for h in logging.getLogger().handlers if type(h).__module__.startswith('opentelemetry')]\n"
+        "assert not exporters, f'configure_otel attached log exporters {exporters}'\n"
+    ),
+}
+
+# Extra environment per scenario; every other scenario runs without App Insights
+SCENARIO_ENV = {
+    "appinsights": {
+        # Unreachable ingestion endpoint - nothing leaves the machine
+        "APPLICATIONINSIGHTS_CONNECTION_STRING": (
+            "InstrumentationKey=00000000-0000-0000-0000-000000000000;IngestionEndpoint=http://127.0.0.1:9/"
+        ),
+        "APPLICATIONINSIGHTS_STATSBEAT_DISABLED_ALL": "true",
+    },
+}
+
+
+def parse_importtime(stderr):
+    """Per-module timings from -X importtime output (depth 0 = imported directly)"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = {"self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": depth}
+    return modules
+
+
+def importtime(code, extra_env=None):
+    """Run code in a fresh interpreter with -X importtime, returning per-module timings"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env.pop("APPLICATIONINSIGHTS_CONNECTION_STRING", None)
+    env.update(extra_env or {})
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print_color(Colors.RED, result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+        sys.exit(1)
+    return parse_importtime(result.stderr)
+
+
+def run_scenario(code, startup_modules, extra_env=None):
+    """Import cost of a scenario in ms (interpreter startup excluded) and its module timings"""
+    modules = importtime(code, extra_env)
+    total_us = sum(m["cumulative_us"] for name, m in modules.items()
+                   if m["depth"] == 0 and name not in startup_modules)
+    return total_us / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure Function App import time with python -X importtime')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per scenario (median is reported)')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports of function_app to list')
+    parser.add_argument('--max-import-ms', type=float, help='Fail if the median "import" scenario exceeds this')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    print_color(Colors.CYAN, "============================================")
+    print_color(Colors.CYAN, "Function App import-time benchmark")
+    print_color(Colors.CYAN, "============================================")
+    print(f"python: {sys.version.split()[0]} | runs per scenario: {args.runs}\n")
+
+    # Modules every interpreter loads at startup (site, encodings, ...) aren't ours to optimize
+    startup_modules = set(importtime("pass"))
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        timings, modules = [], {}
+        for _ in range(args.runs):
+            total_ms, modules = run_scenario(code, startup_modules, SCENARIO_ENV.get(name))
+            timings.append(total_ms)
+        results[name] = {
+            "median_ms": round(statistics.median(timings), 1),
+            "min_ms": round(min(timings), 1),
+            "max_ms": round(max(timings), 1),
+            "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in modules],
+        }
+        print(f"{name:<11} median {results[name]['median_ms']:>8.1f} ms  "
+              f"(min {results[name]['min_ms']:.1f}, max {results[name]['max_ms']:.1f})  "
+              f"heavy: {', '.join(results[name]['heavy_modules_loaded']) or 'none'}")
+
+        if name == "import":
+            # Direct imports of function_app (it is the only depth-0 module here)
+            top = sorted(((m["cumulative_us"], module) for module, m in modules.items() if m["depth"] == 1),
+                         reverse=True)[:args.top]
+            results[name]["slowest_imports"] = {module: round(us / 1000, 1) for us, module in top}
+            for us, module in top:
+                print(f"              {us / 1000:>8.1f} ms  {module}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.json}")
+
+    if args.max_import_ms is not None and results["import"]["median_ms"] > args.max_import_ms:
+        print_color(Colors.RED, f"\n✗ Import took {results['import']['median_ms']} ms "
+                                f"(limit {args.max_import_ms} ms)")
+        sys.exit(1)
+    print_color(Colors.GREEN, "\n✓ Done")
+
+
+if __name__ == "__main__":
+    main()
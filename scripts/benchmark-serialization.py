@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+=============================================================================
+BENCHMARK SERIALIZATION - response encoding cost for employee list payloads
+=============================================================================
+Compares the old response path (stdlib json.dumps, uncompressed) with the
+Function App's json_response path (orjson when installed, then gzip or br
+compression) on synthetic employee lists.
+
+Runs entirely in-process - no Cosmos DB or Function host needed, only the
+backend requirements (azure-functions, azure-cosmos, optional orjson/brotli).
+
+Usage:
+    python benchmark-serialization.py
+    python benchmark-serialization.py --sizes 1000,10000 --repeat 10
+=============================================================================
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Benchmark the Function App's own helpers
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app" / "backend"))
+import function_app  # noqa: E402
+from employee_model import build_employee  # noqa: E402
+
+# ANSI colors
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    CYAN = '\033[0;36m'
+    NC = '\033[0m'  # No Color
+
+def print_color(color, message):
+    print(f"{color}{message}{Colors.NC}")
+
+DEPARTMENTS = ["Engineering", "Marketing", "Sales", "HR", "Finance"]
+
+
+def build_payload(count):
+    """List response body as get_employees returns it, with Cosmos system properties"""
+    employees = []
+    for i in range(count):
+        employee = build_employee({
+            "firstName": f"First{i}",
+            "lastName": f"Last{i}",
+            "email": f"employee{i}@example.com",
+            "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+            "position": "Engineer",
+            "phone": f"555-{i:07d}",
+            "salary": 50000 + i % 50000,
+        })
+        employee.update({"_rid": f"rid{i}", "_etag": f'"etag-{i}"', "_ts": 1700000000 + i})
+        employees.append(employee)
+    return {"employees": employees, "continuationToken": None}
+
+
+def measure(operation, repeat):
+    """Median wall time in milliseconds and the last result"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = operation()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON serialization and compression of employee lists')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated employee counts')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (median is reported)')
+    args = parser.parse_args()
+
+    print_color(Colors.CYAN, "============================================")
+    print_color(Colors.CYAN, "Response serialization benchmark")
+    print_color(Colors.CYAN, "============================================")
+    print(f"serializer: {'orjson' if function_app.orjson else 'stdlib json'} | "
+          f"brotli: {'yes' if function_app.brotli else 'not installed'}\n")
+
+    print(f"{'employees':>10} {'path':<22} {'ms':>9} {'bytes':>12} {'time vs before':>15}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        payload = build_payload(size)
+
+        before_ms, before = measure(lambda: json.dumps(payload).encode("utf-8"), args.repeat)
+        encode_ms, encoded = measure(lambda: function_app.encode_json(payload), args.repeat)
+        rows = [("before: json.dumps", before_ms, len(before)), ("after: encode_json", encode_ms, len(encoded))]
+
+        gzip_ms, gzipped = measure(
+            lambda: gzip.compress(function_app.encode_json(payload), compresslevel=function_app.GZIP_COMPRESS_LEVEL),
+            args.repeat)
+        rows.append(("after: + gzip", gzip_ms, len(gzipped)))
+        if function_app.brotli:
+            br_ms, compressed = measure(
+                lambda: function_app.brotli.compress(function_app.encode_json(payload),
+                                                     quality=function_app.BROTLI_QUALITY),
+                args.repeat)
+            rows.append(("after: + br", br_ms, len(compressed)))
+
+        for name, ms, size_bytes in rows:
+            print(f"{size:>10} {name:<22} {ms:>9.1f} {size_bytes:>12,} {ms / before_ms:>14.2f}x")
+        print()
+
+    print_color(Colors.GREEN, "✓ Done")
+
+
+if __name__ == "__main__":
+    main()
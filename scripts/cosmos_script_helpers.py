@@ -0,0 +1,77 @@
+"""
+=============================================================================
+COSMOS SCRIPT HELPERS - shared plumbing for the maintenance scripts
+=============================================================================
+Client construction, 429 retries, RU accounting and query paging used by
+backfill-search-tokens.py and repartition-employees.py. Document rules live
+in app/backend/employee_model.py; this module only talks to Cosmos DB.
+=============================================================================
+"""
+
+import os
+import sys
+import time
+
+from azure.cosmos import CosmosClient, exceptions
+
+# ANSI colors
+class Colors:
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    CYAN = '\033[0;36m'
+    NC = '\033[0m'  # No Color
+
+def print_color(color, message):
+    print(f"{color}{message}{Colors.NC}")
+
+MAX_THROTTLE_RETRIES = 20
+
+
+def get_client(args):
+    """Build a Cosmos client from arguments or Function App style environment variables."""
+    connection_string = args.connection_string or os.environ.get("CosmosDbConnectionString")
+    endpoint = args.endpoint or os.environ.get("CosmosDbEndpoint")
+    key = args.key or os.environ.get("CosmosDbKey")
+
+    if connection_string:
+        return CosmosClient.from_connection_string(connection_string)
+    if endpoint and key:
+        return CosmosClient(endpoint, key)
+    if endpoint:
+        from azure.identity import DefaultAzureCredential
+        return CosmosClient(endpoint, credential=DefaultAzureCredential())
+
+    print_color(Colors.RED, "Error: provide --connection-string, --endpoint/--key or the CosmosDb* environment variables")
+    sys.exit(1)
+
+
+def request_charge(container):
+    """RU charge of the last request made through this container's client."""
+    headers = container.client_connection.last_response_headers or {}
+    return float(headers.get("x-ms-request-charge", 0) or 0)
+
+
+def with_retry(operation):
+    """Run a Cosmos operation, sleeping through 429 responses."""
+    for attempt in range(MAX_THROTTLE_RETRIES):
+        try:
+            return operation()
+        except exceptions.CosmosHttpResponseError as e:
+            if e.status_code != 429 or attempt == MAX_THROTTLE_RETRIES - 1:
+                raise
+            retry_after_ms = float((e.headers or {}).get("x-ms-retry-after-ms", 1000))
+            print_color(Colors.YELLOW, f"  throttled, retrying in {retry_after_ms:.0f} ms")
+            time.sleep(retry_after_ms / 1000)
+
+
+def next_documents(pages):
+    """Next non-empty page of a query, or None once it is exhausted."""
+    # Cross-partition queries can return empty pages that still carry a continuation token
+    while True:
+        page = with_retry(lambda: next(pages, None))
+        if page is None:
+            return None
+        documents = list(page)
+        if documents:
+            return documents
@@ -11,16 +11,37 @@ Usage:
     
 Or get values automatically from terraform:
     python deploy-simple.py --auto
+
+Backend and frontend deploy concurrently, and each is skipped when its
+content hash (sources plus requirements.txt / package-lock.json) matches the
+last successful deploy recorded in .deploy-manifest.json. Terraform outputs
+and the SWA deployment token are cached in .deploy-cache.json (mode 0600);
+use --force to redeploy everything and --refresh to bypass the cache.
+
+Load a dataset instead of the built-in sample employees (resumable - a rerun
+skips batches recorded in the checkpoint file):
+    python deploy-simple.py --auto --load employees.csv --workers 16
+    python deploy-simple.py --api-url http://localhost:7071/api --synthetic 50000
 =============================================================================
 """
 
 import argparse
+import csv
+import hashlib
+import http.client
 import json
 import os
+import random
+import statistics
 import subprocess
 import sys
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
+from urllib.parse import urlsplit
 
 # ANSI colors
 class Colors:
@@ -54,115 +75,595 @@ def run_command(command, cwd=None, capture=False, check=True):
             sys.exit(1)
         return None
 
-def get_terraform_outputs():
-    """Get resource names from terraform output."""
-    print("Getting values from terraform output...")
-    
-    function_app = run_command("terraform output -raw function_app_name", capture=True)
-    static_web_app = run_command("terraform output -raw static_web_app_name", capture=True)
-    resource_group = run_command("terraform output -raw resource_group_name", capture=True)
-    
-    return function_app, static_web_app, resource_group
+# Local state between runs (both gitignored); the cache holds a deployment secret
+DEPLOY_MANIFEST = ".deploy-manifest.json"
+DEPLOY_CACHE = ".deploy-cache.json"
+DEPLOY_CACHE_TTL_SECONDS = 12 * 3600
 
-def deploy_backend(function_app_name, backend_dir):
-    """Deploy Python Function App."""
-    print_color(Colors.YELLOW, "\n[1/3] Deploying Backend to Function App...")
-    
-    if not backend_dir.exists():
-        print_color(Colors.RED, f"Backend directory not found: {backend_dir}")
-        sys.exit(1)
+TERRAFORM_OUTPUTS = ("function_app_name", "static_web_app_name", "resource_group_name",
+                     "static_web_app_hostname", "static_web_app_deployment_token")
+
+# Build output, installed packages and local-only settings never change what gets published
+HASH_EXCLUDED_DIRS = {"node_modules", "build", "__pycache__", ".python_packages", ".venv", ".git"}
+HASH_EXCLUDED_FILES = {"local.settings.json", ".DS_Store"}
+BACKEND_DEPENDENCY_FILES = ("requirements.txt",)
+FRONTEND_DEPENDENCY_FILES = ("package.json", "package-lock.json")
+
+print_lock = threading.Lock()
+
+
+class DeployError(Exception):
+    """A deployment step failed"""
+
+
+def log(prefix, message, color=None):
+    """Print one line tagged with the pipeline it belongs to (backend and frontend interleave)"""
+    line = f"[{prefix}] {message}" if prefix else message
+    with print_lock:
+        print(f"{color}{line}{Colors.NC}" if color else line, flush=True)
+
+
+def stream_command(command, cwd, prefix, env=None):
+    """Run a shell command, echoing its output line by line under a prefix."""
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace"
+    )
+    for line in process.stdout:
+        log(prefix, line.rstrip())
+    if process.wait() != 0:
+        raise DeployError(f"Command failed ({process.returncode}): {command}")
+
+
+def hash_files(directory, names=None, extra=""):
+    """sha256 over relative paths and contents of a directory tree (or only the named files in it)"""
+    directory = Path(directory)
+    if names is not None:
+        paths = [directory / name for name in names if (directory / name).is_file()]
+    else:
+        paths = []
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if d not in HASH_EXCLUDED_DIRS]
+            paths.extend(Path(root) / name for name in files
+                         if name not in HASH_EXCLUDED_FILES and not name.endswith((".pyc", ".pyo")))
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    for path in sorted(paths):
+        data = path.read_bytes()
+        digest.update(f"{path.relative_to(directory).as_posix()}\0{len(data)}\0".encode("utf-8"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class StepTimings:
+    """Wall time of every deployment step, for the summary at the end"""
     
-    os.chdir(backend_dir)
+    def __init__(self):
+        self.steps = []
+        self.lock = threading.Lock()
     
-    # Install dependencies
-    print("Installing Python dependencies...")
-    run_command("pip install -r requirements.txt -q")
+    def record(self, name, status, seconds=0.0):
+        with self.lock:
+            self.steps.append((name, status, seconds))
     
-    # Deploy to Azure
-    print(f"Publishing to Azure Function App: {function_app_name}")
-    run_command(f"func azure functionapp publish {function_app_name} --python")
+    @contextmanager
+    def step(self, name):
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.record(name, "failed", time.monotonic() - started)
+            raise
+        self.record(name, "ok", time.monotonic() - started)
+    
+    def print_summary(self, total_seconds):
+        print_color(Colors.CYAN, "\nStep timings:")
+        colors = {"ok": Colors.GREEN, "failed": Colors.RED, "skipped": Colors.YELLOW, "cached": Colors.YELLOW}
+        for name, status, seconds in self.steps:
+            print_color(colors.get(status, Colors.NC), f"  {name:<28} {status:<8} {seconds:>7.1f}s")
+        # Backend and frontend overlap, so the steps add up to more than this
+        print(f"  {'total (wall clock)':<28} {'':<8} {total_seconds:>7.1f}s")
+
+
+class DeployManifest:
+    """Content hashes of what was last deployed from this machine, per component and target"""
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.state = {}
+        if self.path.exists():
+            try:
+                self.state = json.loads(self.path.read_text())
+            except ValueError:
+                print_color(Colors.YELLOW, f"Ignoring unreadable manifest {self.path}")
+        self.lock = threading.Lock()
+    
+    def get(self, component, target):
+        entry = self.state.get(component) or {}
+        return entry if entry.get("target") == target else {}
+    
+    def record(self, component, target, **hashes):
+        with self.lock:
+            self.state[component] = {
+                "target": target,
+                **hashes,
+                "deployedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self.state, indent=2))
+            tmp.replace(self.path)
+
+
+class DeployCache:
+    """Terraform outputs and the SWA deployment token, kept between runs in a 0600 file"""
+    
+    def __init__(self, path, read=True):
+        self.path = Path(path)
+        self.state = {}
+        if read and self.path.exists():
+            try:
+                self.state = json.loads(self.path.read_text())
+            except ValueError:
+                pass
+        self.lock = threading.Lock()
+    
+    def get(self, name, key):
+        entry = self.state.get(name)
+        if entry and entry.get("key") == key and time.time() - entry.get("savedAt", 0) < DEPLOY_CACHE_TTL_SECONDS:
+            return entry["value"]
+        return None
     
-    print_color(Colors.GREEN, "✓ Backend deployed successfully!")
+    def set(self, name, key, value):
+        with self.lock:
+            self.state[name] = {"key": key, "value": value, "savedAt": time.time()}
+            self._save()
+    
+    def forget(self, name):
+        with self.lock:
+            if self.state.pop(name, None) is not None:
+                self._save()
+    
+    def _save(self):
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.state, f)
+        os.chmod(tmp, 0o600)  # O_CREAT's mode does not apply to a leftover file
+        tmp.replace(self.path)
 
-def deploy_frontend(function_app_name, static_web_app_name, resource_group_name, frontend_dir):
-    """Deploy React Static Web App."""
-    print_color(Colors.YELLOW, "\n[2/3] Deploying Frontend to Static Web App...")
+
+def get_terraform_outputs(root_dir, cache):
+    """Get resource names from terraform output, cached until the root *.tf/*.tfvars files change."""
+    config_files = sorted(p.name for pattern in ("*.tf", "*.tfvars") for p in root_dir.glob(pattern))
+    key = hash_files(root_dir, config_files)
+    outputs = cache.get("terraform", key)
+    if outputs:
+        print("Using cached terraform outputs (--refresh to re-read them)")
+        return outputs, "cached"
     
-    if not frontend_dir.exists():
-        print_color(Colors.RED, f"Frontend directory not found: {frontend_dir}")
+    print("Getting values from terraform output...")
+    raw = run_command("terraform output -json", cwd=root_dir, capture=True)
+    values = {name: output.get("value") for name, output in json.loads(raw or "{}").items()}
+    outputs = {name: values.get(name) for name in TERRAFORM_OUTPUTS}
+    if not all(outputs[name] for name in TERRAFORM_OUTPUTS[:3]):
+        print_color(Colors.RED, "terraform output is missing function_app_name, static_web_app_name or resource_group_name")
         sys.exit(1)
     
-    os.chdir(frontend_dir)
-    
-    # Set API URL
-    api_url = f"https://{function_app_name}.azurewebsites.net/api"
-    os.environ['REACT_APP_API_URL'] = api_url
-    print(f"Backend API URL: {api_url}")
-    
-    # Install dependencies and build
-    print("Installing npm dependencies...")
-    run_command("npm install --silent")
-    
-    print("Building React app...")
-    run_command("npm run build")
-    
-    # Get deployment token
-    print("Getting Static Web App deployment token...")
+    # The token lives in its own cache entry so a rejected one can be dropped on its own
+    token = outputs.pop("static_web_app_deployment_token")
+    if token:
+        cache.set("swa_token", f"{outputs['resource_group_name']}/{outputs['static_web_app_name']}", token)
+    cache.set("terraform", key, outputs)
+    return outputs, "ok"
+
+
+def get_deployment_token(static_web_app_name, resource_group_name, cache):
+    """Static Web App deployment token from the cache or az, and whether it came from the cache."""
+    key = f"{resource_group_name}/{static_web_app_name}"
+    token = cache.get("swa_token", key)
+    if token:
+        return token, True
+    
+    log("frontend", "Getting Static Web App deployment token...")
     token = run_command(
         f'az staticwebapp secrets list --name {static_web_app_name} '
         f'--resource-group {resource_group_name} --query "properties.apiKey" -o tsv',
-        capture=True
+        capture=True,
+        check=False
     )
-    
     if not token:
-        print_color(Colors.RED, "Could not get Static Web App deployment token")
-        sys.exit(1)
+        raise DeployError("Could not get Static Web App deployment token")
+    cache.set("swa_token", key, token)
+    return token, False
+
+
+def deploy_backend(function_app_name, backend_dir, manifest, timings, force=False):
+    """Deploy Python Function App, unless app/backend is unchanged since the last publish."""
+    prefix = "backend"
+    if not backend_dir.exists():
+        raise DeployError(f"Backend directory not found: {backend_dir}")
     
-    # Deploy
-    print(f"Deploying to Static Web App: {static_web_app_name}")
-    run_command(f"npx @azure/static-web-apps-cli deploy ./build --deployment-token {token}")
+    sources = hash_files(backend_dir)
+    dependencies = hash_files(backend_dir, BACKEND_DEPENDENCY_FILES)
+    deployed = manifest.get("backend", function_app_name)
+    if deployed.get("sources") == sources and not force:
+        log(prefix, f"✓ Unchanged since {deployed['deployedAt']} - skipping (--force to publish anyway)", Colors.GREEN)
+        timings.record("backend", "skipped")
+        return
     
-    print_color(Colors.GREEN, "✓ Frontend deployed successfully!")
+    # Install dependencies
+    if deployed.get("dependencies") == dependencies and not force:
+        log(prefix, "requirements.txt unchanged - skipping pip install")
+        timings.record("backend: pip install", "skipped")
+    else:
+        log(prefix, "Installing Python dependencies...")
+        with timings.step("backend: pip install"):
+            stream_command("pip install -r requirements.txt -q", backend_dir, prefix)
+    
+    # Deploy to Azure
+    log(prefix, f"Publishing to Azure Function App: {function_app_name}")
+    with timings.step("backend: publish"):
+        stream_command(f"func azure functionapp publish {function_app_name} --python", backend_dir, prefix)
+    
+    manifest.record("backend", function_app_name, sources=sources, dependencies=dependencies)
+    log(prefix, "✓ Backend deployed successfully!", Colors.GREEN)
+
 
-def seed_data(function_app_name):
-    """Seed sample employee data."""
-    print_color(Colors.YELLOW, "\n[3/3] Seeding sample data to Cosmos DB...")
+def deploy_frontend(function_app_name, static_web_app_name, resource_group_name, frontend_dir,
+                    manifest, timings, cache, force=False):
+    """Deploy React Static Web App, unless app/frontend is unchanged since the last deploy."""
+    prefix = "frontend"
+    if not frontend_dir.exists():
+        raise DeployError(f"Frontend directory not found: {frontend_dir}")
     
+    # The API URL is baked into the build, so it is part of the content hash
     api_url = f"https://{function_app_name}.azurewebsites.net/api"
+    sources = hash_files(frontend_dir, extra=api_url)
+    dependencies = hash_files(frontend_dir, FRONTEND_DEPENDENCY_FILES)
+    deployed = manifest.get("frontend", static_web_app_name)
+    if deployed.get("sources") == sources and not force:
+        log(prefix, f"✓ Unchanged since {deployed['deployedAt']} - skipping (--force to deploy anyway)", Colors.GREEN)
+        timings.record("frontend", "skipped")
+        return
     
-    # Wait for function app to warm up
-    print("Waiting for Function App to be ready...")
-    time.sleep(10)
-    
-    employees = [
-        {"firstName": "John", "lastName": "Doe", "email": "john.doe@company.com", "department": "Engineering", "position": "Senior Developer"},
-        {"firstName": "Jane", "lastName": "Smith", "email": "jane.smith@company.com", "department": "HR", "position": "HR Manager"},
-        {"firstName": "Bob", "lastName": "Johnson", "email": "bob.j@company.com", "department": "Engineering", "position": "DevOps Engineer"},
-        {"firstName": "Alice", "lastName": "Williams", "email": "alice.w@company.com", "department": "Finance", "position": "Financial Analyst"},
-        {"firstName": "Charlie", "lastName": "Brown", "email": "charlie.b@company.com", "department": "Sales", "position": "Sales Manager"},
-    ]
+    log(prefix, f"Backend API URL: {api_url}")
+    env = dict(os.environ, REACT_APP_API_URL=api_url)
     
+    # Install dependencies and build
+    if deployed.get("dependencies") == dependencies and (frontend_dir / "node_modules").exists() and not force:
+        log(prefix, "package.json/package-lock.json unchanged - skipping npm install")
+        timings.record("frontend: npm install", "skipped")
+    else:
+        log(prefix, "Installing npm dependencies...")
+        with timings.step("frontend: npm install"):
+            stream_command("npm install --silent", frontend_dir, prefix, env)
+    
+    log(prefix, "Building React app...")
+    with timings.step("frontend: npm run build"):
+        stream_command("npm run build", frontend_dir, prefix, env)
+    
+    # Deploy (the token goes through the environment, not the command line)
+    token, from_cache = get_deployment_token(static_web_app_name, resource_group_name, cache)
+    log(prefix, f"Deploying to Static Web App: {static_web_app_name}")
+    with timings.step("frontend: deploy"):
+        try:
+            stream_command("npx @azure/static-web-apps-cli deploy ./build", frontend_dir, prefix,
+                           dict(env, SWA_CLI_DEPLOYMENT_TOKEN=token))
+        except DeployError:
+            if not from_cache:
+                raise
+            log(prefix, "Deploy failed with the cached token - fetching a fresh one and retrying", Colors.YELLOW)
+            cache.forget("swa_token")
+            token, _ = get_deployment_token(static_web_app_name, resource_group_name, cache)
+            stream_command("npx @azure/static-web-apps-cli deploy ./build", frontend_dir, prefix,
+                           dict(env, SWA_CLI_DEPLOYMENT_TOKEN=token))
+    
+    manifest.record("frontend", static_web_app_name, sources=sources, dependencies=dependencies)
+    log(prefix, "✓ Frontend deployed successfully!", Colors.GREEN)
+
+
+def run_pipelines(pipelines):
+    """Run the backend and frontend pipelines side by side, returning {name: error} for failures."""
+    failures = {}
+    if not pipelines:
+        return failures
+    print_color(Colors.YELLOW, f"\nDeploying {' and '.join(pipelines)}...")
+    with ThreadPoolExecutor(max_workers=len(pipelines)) as pool:
+        futures = {pool.submit(pipeline): name for name, pipeline in pipelines.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                future.result()
+            except DeployError as e:
+                failures[name] = e
+                log(name, f"✗ {e}", Colors.RED)
+    return failures
+
+
+SAMPLE_EMPLOYEES = [
+    {"firstName": "John", "lastName": "Doe", "email": "john.doe@company.com", "department": "Engineering", "position": "Senior Developer"},
+    {"firstName": "Jane", "lastName": "Smith", "email": "jane.smith@company.com", "department": "HR", "position": "HR Manager"},
+    {"firstName": "Bob", "lastName": "Johnson", "email": "bob.j@company.com", "department": "Engineering", "position": "DevOps Engineer"},
+    {"firstName": "Alice", "lastName": "Williams", "email": "alice.w@company.com", "department": "Finance", "position": "Financial Analyst"},
+    {"firstName": "Charlie", "lastName": "Brown", "email": "charlie.b@company.com", "department": "Sales", "position": "Sales Manager"},
+]
+
+SYNTHETIC_FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "Michael", "Linda", "David", "Elizabeth", "Wei", "Priya",
+                         "Carlos", "Fatima", "Kenji", "Olga", "Ahmed", "Sofia"]
+SYNTHETIC_LAST_NAMES = ["Garcia", "Miller", "Davis", "Rodriguez", "Martinez", "Chen", "Patel", "Kim", "Nguyen", "Ivanova",
+                        "Hassan", "Rossi", "Tanaka", "Murphy", "Schmidt", "Silva"]
+SYNTHETIC_DEPARTMENTS = {
+    "Engineering": ["Software Engineer", "Senior Developer", "DevOps Engineer", "QA Engineer"],
+    "HR": ["HR Manager", "Recruiter"],
+    "Finance": ["Financial Analyst", "Accountant"],
+    "Sales": ["Sales Manager", "Account Executive"],
+    "Marketing": ["Marketing Specialist", "Content Writer"],
+}
+
+# Stable ids make reruns idempotent: an employee already loaded comes back as 409
+EMPLOYEE_ID_NAMESPACE = uuid.UUID("6f1c2b0e-3d4a-5b6c-8d9e-0f1a2b3c4d5e")
+
+LOAD_MAX_ATTEMPTS = 8
+LOAD_BACKOFF_MAX_SECONDS = 30
+RETRYABLE_STATUS_CODES = (429, 503)
+NUMERIC_FIELDS = ("salary",)
+
+
+def read_employees(path):
+    """Employee rows from a CSV (header row) or JSONL file"""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            rows = [{k: v for k, v in row.items() if k and v not in ("", None)} for row in csv.DictReader(f)]
+        for row in rows:
+            for field in NUMERIC_FIELDS:
+                if field in row:
+                    row[field] = float(row[field]) if "." in row[field] else int(row[field])
+        return rows
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_employees(count, seed=42):
+    """Deterministic synthetic employees (the same count always yields the same rows)"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        first, last = rng.choice(SYNTHETIC_FIRST_NAMES), rng.choice(SYNTHETIC_LAST_NAMES)
+        department = rng.choice(list(SYNTHETIC_DEPARTMENTS))
+        rows.append({
+            "firstName": first,
+            "lastName": last,
+            "email": f"{first}.{last}.{i}@example.com".lower(),
+            "department": department,
+            "position": rng.choice(SYNTHETIC_DEPARTMENTS[department]),
+            "phone": f"555-{rng.randint(0, 9999999):07d}",
+            "hireDate": f"{rng.randint(2005, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "salary": rng.randrange(40000, 200000, 500),
+        })
+    return rows
+
+
+def with_stable_ids(rows):
+    """Give every row with an email a deterministic id (uuid5 of the email) unless it has one"""
+    for row in rows:
+        email = str(row.get("email") or "").strip().lower()
+        if email and "id" not in row:
+            row["id"] = str(uuid.uuid5(EMPLOYEE_ID_NAMESPACE, email))
+        # Rows without an email get no id here - the API reports them as invalid instead of the load aborting
+    return rows
+
+
+def wait_for_api(api_url, timeout=300):
+    """Poll /api/health until the Function App answers (instead of a fixed sleep)"""
     import urllib.request
-    import urllib.error
     
-    for emp in employees:
-        name = f"{emp['firstName']} {emp['lastName']}"
+    print("Waiting for Function App to be ready...")
+    started = time.monotonic()
+    delay = 1
+    while time.monotonic() - started < timeout:
+        try:
+            with urllib.request.urlopen(f"{api_url}/health", timeout=10) as resp:
+                if resp.status == 200:
+                    print(f"  Ready after {time.monotonic() - started:.1f}s")
+                    return True
+        except Exception:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 10)
+    print_color(Colors.YELLOW, f"  Warning: /health did not answer within {timeout}s")
+    return False
+
+
+class LoadCheckpoint:
+    """Batches already loaded for one dataset, saved after every batch"""
+    
+    def __init__(self, path, dataset):
+        self.path = Path(path)
+        self.state = {"dataset": dataset, "done": []}
+        if self.path.exists():
+            saved = json.loads(self.path.read_text())
+            if saved.get("dataset") == dataset:
+                self.state = saved
+                print_color(Colors.YELLOW, f"Resuming from checkpoint: {len(self.state['done'])} batches already loaded")
+            else:
+                print_color(Colors.YELLOW, f"Checkpoint {self.path} belongs to another dataset or API - starting over")
+        self.done = set(self.state["done"])
+        self.lock = threading.Lock()
+    
+    def record(self, batch_number):
+        with self.lock:
+            self.done.add(batch_number)
+            self.state["done"] = sorted(self.done)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self.state))
+            tmp.replace(self.path)
+
+
+class BatchLoader:
+    """POSTs batches to /employees:batch from a pool of threads, each with one keep-alive connection"""
+    
+    def __init__(self, api_url, workers):
+        parts = urlsplit(api_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.netloc
+        self.path = f"{parts.path.rstrip('/')}/employees:batch"
+        self.workers = workers
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.stats = {"created": 0, "existing": 0, "failed": 0, "retries": 0}
+        self.errors = []
+    
+    def connection(self):
+        if getattr(self.local, "connection", None) is None:
+            self.local.connection = self.connection_class(self.host, timeout=120)
+        return self.local.connection
+    
+    def post(self, rows):
+        """One request on this thread's connection, returning (status, headers, parsed body)"""
+        body = json.dumps(rows).encode("utf-8")
+        started = time.perf_counter()
+        try:
+            connection = self.connection()
+            connection.request("POST", self.path, body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            # Drop the broken connection; the next attempt reconnects
+            self.local.connection.close()
+            self.local.connection = None
+            raise
+        with self.lock:
+            self.latencies.append(time.perf_counter() - started)
         try:
-            data = json.dumps(emp).encode('utf-8')
-            req = urllib.request.Request(
-                f"{api_url}/employees",
-                data=data,
-                headers={'Content-Type': 'application/json'},
-                method='POST'
-            )
-            urllib.request.urlopen(req, timeout=30)
-            print(f"  Added: {name}")
-        except urllib.error.HTTPError as e:
-            print_color(Colors.YELLOW, f"  Warning: Could not add {name} (may already exist)")
-        except Exception as e:
-            print_color(Colors.YELLOW, f"  Warning: Could not add {name}: {e}")
-    
-    print_color(Colors.GREEN, "✓ Sample data seeded!")
+            parsed = json.loads(payload) if payload else {}
+        except ValueError:
+            parsed = {}
+        return response.status, response.headers, parsed
+    
+    def backoff(self, attempt, retry_after=None):
+        with self.lock:
+            self.stats["retries"] += 1
+        delay = float(retry_after) if retry_after else min(LOAD_BACKOFF_MAX_SECONDS, 0.5 * 2 ** attempt)
+        time.sleep(delay * random.uniform(0.8, 1.2))
+    
+    def load_batch(self, rows):
+        """Load one batch, retrying throttled requests and throttled items until they succeed"""
+        pending, last_error = rows, None
+        for attempt in range(LOAD_MAX_ATTEMPTS):
+            try:
+                status, headers, payload = self.post(pending)
+            except (OSError, http.client.HTTPException) as e:
+                last_error = str(e)
+                self.backoff(attempt)
+                continue
+            if status in RETRYABLE_STATUS_CODES:
+                last_error = f"HTTP {status}"
+                self.backoff(attempt, headers.get("Retry-After"))
+                continue
+            if status >= 300 and status != 207:
+                last_error = payload.get("error", f"HTTP {status}")
+                break
+            
+            retry = []
+            with self.lock:
+                for result in payload.get("results", []):
+                    if result["status"] < 300:
+                        self.stats["created"] += 1
+                    elif result["status"] == 409:
+                        self.stats["existing"] += 1
+                    elif result["status"] in RETRYABLE_STATUS_CODES:
+                        retry.append(pending[result["index"]])
+                    else:
+                        self.stats["failed"] += 1
+                        self.errors.append(f"{pending[result['index']].get('email')}: {result.get('error')}")
+            if not retry:
+                return True
+            pending = retry
+            last_error = "throttled items"
+            self.backoff(attempt)
+        
+        with self.lock:
+            self.stats["failed"] += len(pending)
+            self.errors.append(f"batch of {len(pending)} gave up: {last_error}")
+        return False
+    
+    def run(self, batches, checkpoint):
+        """Load every batch not yet in the checkpoint, printing progress as batches finish"""
+        todo = [(number, rows) for number, rows in enumerate(batches) if number not in checkpoint.done]
+        total_rows = sum(len(rows) for _, rows in todo)
+        started = time.monotonic()
+        loaded_rows = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.load_batch, rows): (number, len(rows)) for number, rows in todo}
+            for finished, future in enumerate(as_completed(futures), start=1):
+                number, count = futures[future]
+                if future.result():
+                    checkpoint.record(number)
+                loaded_rows += count
+                if finished % 10 == 0 or finished == len(futures):
+                    elapsed = max(time.monotonic() - started, 1e-6)
+                    print(f"  {loaded_rows}/{total_rows} rows | {loaded_rows / elapsed:.0f} rows/s")
+        return total_rows, time.monotonic() - started
+
+
+def latency_percentiles(latencies):
+    """p50/p95/p99 request latency in milliseconds"""
+    if len(latencies) < 2:
+        value = latencies[0] * 1000 if latencies else 0.0
+        return value, value, value
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return cuts[49] * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+
+def seed_data(api_url, rows, dataset, workers=8, batch_size=100, checkpoint_path="seed-checkpoint.json"):
+    """Load employees through the bulk endpoint with concurrent, resumable batches."""
+    print_color(Colors.YELLOW, "\nSeeding employee data to Cosmos DB...")
+    
+    wait_for_api(api_url)
+    
+    rows = with_stable_ids(rows)
+    batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+    # Keyed by target API too, so a checkpoint from another environment can't skip batches here
+    checkpoint = LoadCheckpoint(checkpoint_path, f"{api_url}|{dataset}|{batch_size}")
+    loader = BatchLoader(api_url, workers)
+    print(f"Loading {len(rows)} employees in {len(batches)} batches of {batch_size} with {workers} workers")
+    
+    total_rows, elapsed = loader.run(batches, checkpoint)
+    
+    p50, p95, p99 = latency_percentiles(loader.latencies)
+    stats = loader.stats
+    print(f"  created: {stats['created']} | already present: {stats['existing']} | "
+          f"failed: {stats['failed']} | retries: {stats['retries']}")
+    print(f"  {total_rows} rows in {elapsed:.1f}s = {total_rows / max(elapsed, 1e-6):.0f} rows/s | "
+          f"batch latency p50 {p50:.0f} ms, p95 {p95:.0f} ms, p99 {p99:.0f} ms")
+    for error in loader.errors[:10]:
+        print_color(Colors.YELLOW, f"  Warning: {error}")
+    
+    if stats["failed"]:
+        print_color(Colors.YELLOW, f"⚠ {stats['failed']} employees not loaded - rerun to retry the remaining batches")
+    else:
+        print_color(Colors.GREEN, "✓ Employee data seeded!")
+
+
+def seed_source(args):
+    """Rows to seed and a dataset key for the checkpoint"""
+    if args.load:
+        path = Path(args.load)
+        if not path.exists():
+            print_color(Colors.RED, f"Data file not found: {path}")
+            sys.exit(1)
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+        return read_employees(path), f"file:{path.name}:{digest}"
+    if args.synthetic:
+        return synthetic_employees(args.synthetic), f"synthetic:{args.synthetic}"
+    return [dict(employee) for employee in SAMPLE_EMPLOYEES], "sample"
 
 def get_static_web_app_url(static_web_app_name, resource_group_name):
     """Get the Static Web App URL."""
@@ -181,6 +682,7 @@ def main():
 Examples:
   python deploy-simple.py --auto
   python deploy-simple.py -f func-dte-dev -s swa-dte-dev -r rg-dte-dev
+  python deploy-simple.py --auto --force --refresh
         """
     )
     parser.add_argument('--auto', action='store_true', help='Get values from terraform output')
@@ -190,9 +692,21 @@ Examples:
     parser.add_argument('--skip-backend', action='store_true', help='Skip backend deployment')
     parser.add_argument('--skip-frontend', action='store_true', help='Skip frontend deployment')
     parser.add_argument('--skip-seed', action='store_true', help='Skip data seeding')
+    parser.add_argument('--force', action='store_true', help='Deploy even if the content hash matches the last deploy')
+    parser.add_argument('--refresh', action='store_true', help='Re-read terraform outputs and the SWA token instead of using the cache')
+    parser.add_argument('--api-url', help='Only seed data, into this API (e.g. http://localhost:7071/api)')
+    parser.add_argument('--load', help='Seed from a CSV or JSONL file instead of the sample employees')
+    parser.add_argument('--synthetic', type=int, help='Seed N generated employees instead of the sample employees')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent batch requests when seeding (default: 8)')
+    parser.add_argument('--batch-size', type=int, default=100, help='Employees per batch request (default: 100)')
+    parser.add_argument('--checkpoint', default='seed-checkpoint.json', help='Seed progress file (default: seed-checkpoint.json)')
     
     args = parser.parse_args()
     
+    args.checkpoint = str(Path(args.checkpoint).resolve())
+    if args.load:
+        args.load = str(Path(args.load).resolve())
+    
     # Get script directory
     script_dir = Path(__file__).parent.resolve()
     root_dir = script_dir.parent
@@ -201,10 +715,26 @@ Examples:
     print_color(Colors.CYAN, "OPTION 1: Simple Local Deployment")
     print_color(Colors.CYAN, "============================================")
     
+    if args.api_url:
+        rows, dataset = seed_source(args)
+        seed_data(args.api_url.rstrip("/"), rows, dataset, args.workers, args.batch_size, args.checkpoint)
+        return
+    
+    started = time.monotonic()
+    timings = StepTimings()
+    cache = DeployCache(root_dir / DEPLOY_CACHE, read=not args.refresh)
+    manifest = DeployManifest(root_dir / DEPLOY_MANIFEST)
+    swa_hostname = None
+    
     # Get resource names
     if args.auto:
-        os.chdir(root_dir)
-        function_app, static_web_app, resource_group = get_terraform_outputs()
+        step_started = time.monotonic()
+        outputs, status = get_terraform_outputs(root_dir, cache)
+        timings.record("terraform output", status, time.monotonic() - step_started)
+        function_app = outputs["function_app_name"]
+        static_web_app = outputs["static_web_app_name"]
+        resource_group = outputs["resource_group_name"]
+        swa_hostname = outputs.get("static_web_app_hostname")
     else:
         if not all([args.function_app, args.static_web_app, args.resource_group]):
             print_color(Colors.RED, "Error: Provide all arguments or use --auto")
@@ -218,25 +748,36 @@ Examples:
     print(f"Static Web App:  {static_web_app}")
     print(f"Resource Group:  {resource_group}")
     
-    # Deploy
+    # Deploy - backend and frontend are independent, so they run concurrently
     backend_dir = root_dir / "app" / "backend"
     frontend_dir = root_dir / "app" / "frontend"
     
+    pipelines = {}
     if not args.skip_backend:
-        deploy_backend(function_app, backend_dir)
-    
+        pipelines["backend"] = lambda: deploy_backend(function_app, backend_dir, manifest, timings, args.force)
     if not args.skip_frontend:
-        deploy_frontend(function_app, static_web_app, resource_group, frontend_dir)
+        pipelines["frontend"] = lambda: deploy_frontend(function_app, static_web_app, resource_group, frontend_dir,
+                                                        manifest, timings, cache, args.force)
+    failures = run_pipelines(pipelines)
+    if failures:
+        timings.print_summary(time.monotonic() - started)
+        print_color(Colors.RED, f"\n✗ Deployment failed: {', '.join(failures)} (rerun to retry - unchanged parts are skipped)")
+        sys.exit(1)
     
     if not args.skip_seed:
-        seed_data(function_app)
+        rows, dataset = seed_source(args)
+        with timings.step("seed data"):
+            seed_data(f"https://{function_app}.azurewebsites.net/api", rows, dataset,
+                      args.workers, args.batch_size, args.checkpoint)
     
     # Done!
     print_color(Colors.CYAN, "\n============================================")
     print_color(Colors.GREEN, "DEPLOYMENT COMPLETE!")
     print_color(Colors.CYAN, "============================================")
     
-    swa_url = get_static_web_app_url(static_web_app, resource_group)
+    timings.print_summary(time.monotonic() - started)
+    
+    swa_url = swa_hostname or get_static_web_app_url(static_web_app, resource_group)
     print_color(Colors.CYAN, f"\nYour app is live at: https://{swa_url}")
     print_color(Colors.CYAN, f"API endpoint: https://{function_app}.azurewebsites.net/api/employees")
 
@@ -0,0 +1,816 @@
+"""
+=============================================================================
+FAKE COSMOS - in-memory Cosmos DB stand-in for local benchmarks
+=============================================================================
+Implements the slice of the azure.cosmos container API the Function App uses
+(point operations, patch, paged SQL queries, read_all_items) on top of plain
+dicts, for both the sync and the aio client. Request charges follow a rough
+RU model (ChargeModel) and every call can be delayed by a simulated network
+latency, so workloads can be compared without an Azure account.
+
+The SQL dialect covers what function_app.py sends:
+SELECT [DISTINCT] [VALUE] [TOP n] ... FROM c [WHERE ...] [ORDER BY ...] with
+comparison operators, AND/OR/NOT, IN, and the CONTAINS, LOWER, UPPER,
+STARTSWITH, ENDSWITH, ARRAY_CONTAINS, IS_DEFINED and COUNT functions.
+
+Usage (see benchmark-api.py):
+    client = FakeCosmosClient(partition_keys={"employees": "/departmentId"}, latency_ms=2)
+    function_app.build_cosmos_client = lambda use_async=False: client.as_async() if use_async else client
+=============================================================================
+"""
+import asyncio
+import copy
+import json
+import re
+import threading
+import time
+import uuid
+
+from azure.core import MatchConditions
+from azure.core.async_paging import AsyncItemPaged, AsyncList
+from azure.core.paging import ItemPaged
+from azure.cosmos import exceptions
+from azure.cosmos.partition_key import NonePartitionKeyValue
+
+
+class _Undefined:
+    """Cosmos 'undefined' - a missing property, distinct from null"""
+
+    def __repr__(self):
+        return "undefined"
+
+
+UNDEFINED = _Undefined()
+_MISSING_PARTITION = "\0undefined"
+SYSTEM_PROPERTIES = ("_rid", "_self", "_etag", "_attachments", "_ts")
+
+
+# ----------------------------------------------------------------------------
+# Request charge model (rough approximation of published RU costs)
+# ----------------------------------------------------------------------------
+class ChargeModel:
+    point_read_per_kb = 1.0
+    write_per_kb = 5.5
+    query_base = 2.3
+    query_per_indexed_doc = 0.0025
+    query_per_scanned_doc = 0.04
+    query_per_returned_kb = 0.3
+
+    @staticmethod
+    def size_kb(document):
+        return max(len(json.dumps(document, default=str)) / 1024.0, 1.0)
+
+
+# ----------------------------------------------------------------------------
+# SQL parsing
+# ----------------------------------------------------------------------------
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    | (?P<number>-?\d+(?:\.\d+)?)
+    | (?P<param>@\w+)
+    | (?P<op><=|>=|!=|<>|=|<|>|\(|\)|,|\*|\.|\[|\])
+    | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+    )""", re.VERBOSE)
+
+_KEYWORDS = {"SELECT", "DISTINCT", "VALUE", "TOP", "FROM", "WHERE", "ORDER", "BY", "ASC", "DESC",
+             "AND", "OR", "NOT", "AS", "TRUE", "FALSE", "NULL", "IN", "OFFSET", "LIMIT", "UNDEFINED"}
+
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise exceptions.CosmosHttpResponseError(status_code=400, message=f"Syntax error near: {text[pos:pos + 20]}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "word" and value.upper() in _KEYWORDS:
+            tokens.append(("kw", value.upper()))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+def _compare(op, left, right):
+    if left is UNDEFINED or right is UNDEFINED:
+        return UNDEFINED
+    if op == "=":
+        return type(left) is type(right) and left == right or (_numeric(left) and _numeric(right) and left == right)
+    if op in ("!=", "<>"):
+        return not _compare("=", left, right)
+    comparable = (_numeric(left) and _numeric(right)) or (isinstance(left, str) and isinstance(right, str))
+    if not comparable:
+        return UNDEFINED
+    return {"<": left < right, ">": left > right, "<=": left <= right, ">=": left >= right}[op]
+
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _truthy(value):
+    return value is True
+
+
+def _fn_contains(s, sub, ignore_case=False):
+    if not isinstance(s, str) or not isinstance(sub, str):
+        return UNDEFINED
+    return sub.lower() in s.lower() if ignore_case is True else sub in s
+
+
+def _fn_startswith(s, prefix, ignore_case=False):
+    if not isinstance(s, str) or not isinstance(prefix, str):
+        return UNDEFINED
+    return s.lower().startswith(prefix.lower()) if ignore_case is True else s.startswith(prefix)
+
+
+def _fn_endswith(s, suffix, ignore_case=False):
+    if not isinstance(s, str) or not isinstance(suffix, str):
+        return UNDEFINED
+    return s.lower().endswith(suffix.lower()) if ignore_case is True else s.endswith(suffix)
+
+
+def _fn_array_contains(array, value, partial=False):
+    if not isinstance(array, list):
+        return UNDEFINED
+    return value in array
+
+
+_FUNCTIONS = {
+    "CONTAINS": _fn_contains,
+    "STARTSWITH": _fn_startswith,
+    "ENDSWITH": _fn_endswith,
+    "ARRAY_CONTAINS": _fn_array_contains,
+    "LOWER": lambda s: s.lower() if isinstance(s, str) else UNDEFINED,
+    "UPPER": lambda s: s.upper() if isinstance(s, str) else UNDEFINED,
+    "IS_DEFINED": lambda v: v is not UNDEFINED,
+    "ARRAY_LENGTH": lambda a: len(a) if isinstance(a, list) else UNDEFINED,
+    "LENGTH": lambda s: len(s) if isinstance(s, str) else UNDEFINED,
+}
+
+_AGGREGATES = {"COUNT", "SUM", "MIN", "MAX", "AVG"}
+
+# Functions that defeat the index and force a scan of every document
+_SCAN_FUNCTIONS = {"CONTAINS", "LOWER", "UPPER", "ENDSWITH", "LENGTH"}
+
+
+class _Query:
+    def __init__(self):
+        self.distinct = False
+        self.value = False
+        self.top = None
+        self.select = []       # [(alias, evaluator, aggregate name or None)]
+        self.star = False
+        self.where = None
+        self.order_by = []     # [(evaluator, descending)]
+        self.offset = None
+        self.limit = None
+        self.scans = False
+
+
+class _Parser:
+    def __init__(self, text, parameters):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.params = {p["name"]: p["value"] for p in (parameters or [])}
+        self.scans = False
+
+    # token helpers
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def accept(self, kind, value=None):
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.pos += 1
+            return token
+        return None
+
+    def expect(self, kind, value=None):
+        token = self.accept(kind, value)
+        if token is None:
+            raise exceptions.CosmosHttpResponseError(
+                status_code=400, message=f"Expected {value or kind}, got {self.peek()[1]!r}")
+        return token
+
+    def param(self, name):
+        if name not in self.params:
+            raise exceptions.CosmosHttpResponseError(status_code=400, message=f"Missing parameter {name}")
+        return self.params[name]
+
+    # grammar
+    def parse_query(self):
+        query = _Query()
+        self.expect("kw", "SELECT")
+        query.distinct = bool(self.accept("kw", "DISTINCT"))
+        query.value = bool(self.accept("kw", "VALUE"))
+        if self.accept("kw", "TOP"):
+            token = self.accept("number") or self.expect("param")
+            query.top = int(token[1]) if token[0] == "number" else int(self.param(token[1]))
+        if self.accept("op", "*"):
+            query.star = True
+        else:
+            while True:
+                start = self.pos
+                aggregate = None
+                if self.peek()[0] == "word" and self.peek()[1].upper() in _AGGREGATES and self.peek(1) == ("op", "("):
+                    aggregate = self.peek()[1].upper()
+                    self.pos += 2
+                    evaluator = self.parse_expr() if not self.accept("op", "*") else (lambda doc: 1)
+                    self.expect("op", ")")
+                else:
+                    evaluator = self.parse_expr()
+                alias = None
+                if self.accept("kw", "AS"):
+                    alias = self.expect("word")[1]
+                else:
+                    consumed = self.tokens[start:self.pos]
+                    # A bare property path projects under its last segment (c.a.b -> "b")
+                    if consumed and all(t == ("op", ".") if i % 2 else t[0] == "word"
+                                        for i, t in enumerate(consumed)) and len(consumed) > 1:
+                        alias = consumed[-1][1]
+                query.select.append((alias or f"${len(query.select) + 1}", evaluator, aggregate))
+                if not self.accept("op", ","):
+                    break
+        self.expect("kw", "FROM")
+        self.expect("word")
+        if self.accept("kw", "WHERE"):
+            query.where = self.parse_expr()
+        if self.accept("kw", "ORDER"):
+            self.expect("kw", "BY")
+            while True:
+                evaluator = self.parse_expr()
+                descending = bool(self.accept("kw", "DESC"))
+                if not descending:
+                    self.accept("kw", "ASC")
+                query.order_by.append((evaluator, descending))
+                if not self.accept("op", ","):
+                    break
+        if self.accept("kw", "OFFSET"):
+            token = self.accept("number") or self.expect("param")
+            query.offset = int(token[1]) if token[0] == "number" else int(self.param(token[1]))
+            self.expect("kw", "LIMIT")
+            token = self.accept("number") or self.expect("param")
+            query.limit = int(token[1]) if token[0] == "number" else int(self.param(token[1]))
+        if self.pos != len(self.tokens):
+            raise exceptions.CosmosHttpResponseError(status_code=400, message=f"Unexpected {self.peek()[1]!r}")
+        query.scans = self.scans
+        return query
+
+    def parse_expr(self):
+        return self.parse_or()
+
+    def parse_or(self):
+        left = self.parse_and()
+        while self.accept("kw", "OR"):
+            right = self.parse_and()
+            left = (lambda a, b: lambda doc: _truthy(a(doc)) or _truthy(b(doc)))(left, right)
+        return left
+
+    def parse_and(self):
+        left = self.parse_not()
+        while self.accept("kw", "AND"):
+            right = self.parse_not()
+            left = (lambda a, b: lambda doc: _truthy(a(doc)) and _truthy(b(doc)))(left, right)
+        return left
+
+    def parse_not(self):
+        if self.accept("kw", "NOT"):
+            inner = self.parse_not()
+
+            def negate(doc):
+                value = inner(doc)
+                return UNDEFINED if not isinstance(value, bool) else not value
+            return negate
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        left = self.parse_primary()
+        token = self.peek()
+        if token[0] == "op" and token[1] in ("=", "!=", "<>", "<", ">", "<=", ">="):
+            self.pos += 1
+            right = self.parse_primary()
+            return (lambda op, a, b: lambda doc: _compare(op, a(doc), b(doc)))(token[1], left, right)
+        if self.accept("kw", "IN"):
+            self.expect("op", "(")
+            options = [self.parse_primary()]
+            while self.accept("op", ","):
+                options.append(self.parse_primary())
+            self.expect("op", ")")
+            return lambda doc: any(_compare("=", left(doc), option(doc)) is True for option in options)
+        return left
+
+    def parse_primary(self):
+        kind, value = self.peek()
+        if kind == "string":
+            self.pos += 1
+            literal = json.loads('"' + value[1:-1].replace('"', '\\"') + '"') if value[0] == "'" else json.loads(value)
+            return lambda doc: literal
+        if kind == "number":
+            self.pos += 1
+            number = float(value) if "." in value else int(value)
+            return lambda doc: number
+        if kind == "param":
+            self.pos += 1
+            bound = self.param(value)
+            return lambda doc: bound
+        if kind == "kw" and value in ("TRUE", "FALSE", "NULL", "UNDEFINED"):
+            self.pos += 1
+            constant = {"TRUE": True, "FALSE": False, "NULL": None, "UNDEFINED": UNDEFINED}[value]
+            return lambda doc: constant
+        if self.accept("op", "("):
+            inner = self.parse_expr()
+            self.expect("op", ")")
+            return inner
+        if self.accept("op", "["):
+            items = []
+            if not self.accept("op", "]"):
+                items.append(self.parse_expr())
+                while self.accept("op", ","):
+                    items.append(self.parse_expr())
+                self.expect("op", "]")
+            return lambda doc: [item(doc) for item in items]
+        if kind == "word" and self.peek(1) == ("op", "("):
+            name = value.upper()
+            if name not in _FUNCTIONS:
+                raise exceptions.CosmosHttpResponseError(status_code=400, message=f"Unsupported function {value}")
+            if name in _SCAN_FUNCTIONS:
+                self.scans = True
+            self.pos += 2
+            args = []
+            if not self.accept("op", ")"):
+                args.append(self.parse_expr())
+                while self.accept("op", ","):
+                    args.append(self.parse_expr())
+                self.expect("op", ")")
+            function = _FUNCTIONS[name]
+            return lambda doc: function(*[arg(doc) for arg in args])
+        if kind == "word":
+            self.pos += 1
+            path = []
+            while True:
+                if self.accept("op", "."):
+                    path.append(self.expect("word")[1])
+                elif self.peek() == ("op", "[") and self.peek(1)[0] == "string":
+                    self.pos += 1
+                    path.append(json.loads(self.expect("string")[1].replace("'", '"')))
+                    self.expect("op", "]")
+                else:
+                    break
+
+            def lookup(doc):
+                current = doc
+                for key in path:
+                    if not isinstance(current, dict) or key not in current:
+                        return UNDEFINED
+                    current = current[key]
+                return current
+            return lookup
+        raise exceptions.CosmosHttpResponseError(status_code=400, message=f"Unexpected token {value!r}")
+
+
+def _sort_key(value):
+    # Cosmos ordering across types: undefined < null < false/true < numbers < strings
+    if value is UNDEFINED:
+        return (0, 0)
+    if value is None:
+        return (1, 0)
+    if isinstance(value, bool):
+        return (2, value)
+    if _numeric(value):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5, json.dumps(value, sort_keys=True, default=str))
+
+
+class _Descending:
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+
+def run_query(documents, text, parameters=None, start=0, count=None):
+    """Evaluate a query over documents, returning (results, documents scanned, full scan?)
+
+    start/count select a window of the results; rows outside it are never
+    projected or copied, so paging through a large container stays cheap.
+    """
+    query = _Parser(text, parameters).parse_query()
+    matched = [doc for doc in documents if query.where is None or _truthy(query.where(doc))]
+
+    if query.order_by:
+        def key(doc):
+            parts = []
+            for evaluator, descending in query.order_by:
+                part = _sort_key(evaluator(doc))
+                parts.append(_Descending(part) if descending else part)
+            return parts
+        matched.sort(key=key)
+
+    aggregates = [entry for entry in query.select if entry[2]]
+    if aggregates:
+        row = {}
+        for alias, evaluator, aggregate in query.select:
+            values = [v for v in (evaluator(doc) for doc in matched) if v is not UNDEFINED]
+            if aggregate == "COUNT":
+                row[alias] = len(values)
+            elif aggregate == "SUM":
+                row[alias] = sum(values)
+            elif aggregate in ("MIN", "MAX") and values:
+                row[alias] = (min if aggregate == "MIN" else max)(values)
+            elif aggregate == "AVG" and values:
+                row[alias] = sum(values) / len(values)
+        results = [next(iter(row.values()))] if query.value else [row]
+        return results, len(documents), query.scans or query.where is None
+
+    if query.offset is not None:
+        matched = matched[query.offset:query.offset + query.limit]
+    if query.top is not None and not query.distinct:
+        matched = matched[:query.top]
+    if not query.distinct:
+        matched = matched[start:start + count if count is not None else None]
+
+    if query.star:
+        results = [copy.deepcopy(doc) for doc in matched]
+    elif query.value:
+        results = [copy.deepcopy(v) for v in (query.select[0][1](doc) for doc in matched) if v is not UNDEFINED]
+    else:
+        results = []
+        for doc in matched:
+            row = {}
+            for alias, evaluator, _ in query.select:
+                value = evaluator(doc)
+                if value is not UNDEFINED:
+                    row[alias] = copy.deepcopy(value)
+            results.append(row)
+
+    if query.distinct:
+        seen, unique = set(), []
+        for item in results:
+            marker = json.dumps(item, sort_keys=True, default=str)
+            if marker not in seen:
+                seen.add(marker)
+                unique.append(item)
+        if query.top is not None:
+            unique = unique[:query.top]
+        results = unique[start:start + count if count is not None else None]
+    return results, len(documents), query.scans
+
+
+# ----------------------------------------------------------------------------
+# Container, database and client
+# ----------------------------------------------------------------------------
+class FakeClientConnection:
+    """Holds last_response_headers and the current endpoints like the sync client connection"""
+
+    def __init__(self, endpoint="https://localhost/"):
+        self.last_response_headers = {}
+        self.ReadEndpoint = endpoint
+        self.WriteEndpoint = endpoint
+
+
+class AsyncFakeClientConnection:
+    """aio client connection: last_response_headers only (no public endpoints)"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    @property
+    def last_response_headers(self):
+        return self._connection.last_response_headers
+
+
+class FakeContainer:
+    """Dict-backed container implementing the sync azure.cosmos ContainerProxy surface"""
+
+    def __init__(self, container_id, partition_key_path="/id", latency_ms=0.0, client_connection=None):
+        self.id = container_id
+        self.partition_key_field = partition_key_path.strip("/")
+        self.latency_ms = latency_ms
+        self.client_connection = client_connection or FakeClientConnection()
+        self._documents = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self.total_request_charge = 0.0
+        self.operation_counts = {}
+
+    # helpers
+    def _partition_value(self, body):
+        value = body.get(self.partition_key_field, UNDEFINED)
+        return _MISSING_PARTITION if value is UNDEFINED else value
+
+    @staticmethod
+    def _partition_arg(partition_key):
+        if partition_key is NonePartitionKeyValue:
+            return _MISSING_PARTITION
+        return partition_key
+
+    def _respond(self, operation, charge, result=None, response_hook=None):
+        # The aio wrapper awaits the latency itself instead of blocking the event loop
+        if self.latency_ms and not getattr(self._local, "async_call", False):
+            time.sleep(self.latency_ms / 1000.0)
+        headers = {
+            "x-ms-request-charge": f"{charge:.2f}",
+            "x-ms-activity-id": str(uuid.uuid4()),
+        }
+        if isinstance(result, dict) and "_etag" in result:
+            headers["etag"] = result["_etag"]
+        self.client_connection.last_response_headers = headers
+        with self._lock:
+            self.total_request_charge += charge
+            self.operation_counts[operation] = self.operation_counts.get(operation, 0) + 1
+        if response_hook:
+            response_hook(headers, result)
+        return result
+
+    def _stamp(self, body):
+        document = copy.deepcopy(body)
+        document["_rid"] = document.get("_rid") or uuid.uuid4().hex[:16]
+        document["_self"] = f"dbs/fake/colls/{self.id}/docs/{document['_rid']}/"
+        document["_etag"] = f'"{uuid.uuid4()}"'
+        document["_attachments"] = "attachments/"
+        document["_ts"] = int(time.time())
+        return document
+
+    def _check_etag(self, existing, etag, match_condition):
+        if etag is None or match_condition is None:
+            return
+        if match_condition == MatchConditions.IfNotModified and existing["_etag"] != etag:
+            raise exceptions.CosmosAccessConditionFailedError(status_code=412, message="Precondition failed", response=None)
+
+    def _not_found(self):
+        return exceptions.CosmosResourceNotFoundError(status_code=404, message="Entity with the specified id does not exist", response=None)
+
+    # point operations
+    def read_item(self, item, partition_key, response_hook=None, **kwargs):
+        key = (self._partition_arg(partition_key), item)
+        with self._lock:
+            document = self._documents.get(key)
+        if document is None:
+            self._respond("read", 1.0)
+            raise self._not_found()
+        return self._respond("read", ChargeModel.size_kb(document) * ChargeModel.point_read_per_kb,
+                             copy.deepcopy(document), response_hook)
+
+    def create_item(self, body, response_hook=None, **kwargs):
+        document = self._stamp(body)
+        key = (self._partition_value(document), document["id"])
+        with self._lock:
+            if key in self._documents:
+                self._respond("create", 1.0)
+                raise exceptions.CosmosResourceExistsError(status_code=409, message="Entity with the specified id already exists", response=None)
+            self._documents[key] = document
+        return self._respond("create", ChargeModel.size_kb(document) * ChargeModel.write_per_kb,
+                             copy.deepcopy(document), response_hook)
+
+    def upsert_item(self, body, response_hook=None, **kwargs):
+        document = self._stamp(body)
+        key = (self._partition_value(document), document["id"])
+        with self._lock:
+            self._documents[key] = document
+        return self._respond("upsert", ChargeModel.size_kb(document) * ChargeModel.write_per_kb,
+                             copy.deepcopy(document), response_hook)
+
+    def replace_item(self, item, body, etag=None, match_condition=None, response_hook=None, **kwargs):
+        item_id = item["id"] if isinstance(item, dict) else item
+        document = self._stamp(body)
+        key = (self._partition_value(document), item_id)
+        with self._lock:
+            existing = self._documents.get(key)
+            if existing is None:
+                self._respond("replace", 1.0)
+                raise self._not_found()
+            self._check_etag(existing, etag, match_condition)
+            self._documents[key] = document
+        return self._respond("replace", ChargeModel.size_kb(document) * ChargeModel.write_per_kb,
+                             copy.deepcopy(document), response_hook)
+
+    def delete_item(self, item, partition_key, etag=None, match_condition=None, response_hook=None, **kwargs):
+        item_id = item["id"] if isinstance(item, dict) else item
+        key = (self._partition_arg(partition_key), item_id)
+        with self._lock:
+            existing = self._documents.get(key)
+            if existing is None:
+                self._respond("delete", 1.0)
+                raise self._not_found()
+            self._check_etag(existing, etag, match_condition)
+            del self._documents[key]
+        self._respond("delete", ChargeModel.size_kb(existing) * ChargeModel.write_per_kb, None, response_hook)
+
+    def patch_item(self, item, partition_key, patch_operations, filter_predicate=None, etag=None,
+                   match_condition=None, response_hook=None, **kwargs):
+        item_id = item["id"] if isinstance(item, dict) else item
+        key = (self._partition_arg(partition_key), item_id)
+        with self._lock:
+            existing = self._documents.get(key)
+            if existing is None:
+                self._respond("patch", 1.0)
+                raise self._not_found()
+            self._check_etag(existing, etag, match_condition)
+            if filter_predicate:
+                matched, _, _ = run_query([existing], "SELECT * " + filter_predicate)
+                if not matched:
+                    self._respond("patch", 1.0)
+                    raise exceptions.CosmosAccessConditionFailedError(status_code=412, message="Precondition failed", response=None)
+            document = copy.deepcopy(existing)
+            for operation in patch_operations:
+                _apply_patch(document, operation)
+            document = self._stamp(document)
+            self._documents[key] = document
+        return self._respond("patch", ChargeModel.size_kb(document) * ChargeModel.write_per_kb,
+                             copy.deepcopy(document), response_hook)
+
+    # queries
+    def _documents_in(self, partition_key):
+        with self._lock:
+            if partition_key is None:
+                return list(self._documents.values())
+            value = self._partition_arg(partition_key)
+            return [doc for (pk, _), doc in self._documents.items() if pk == value]
+
+    def _page_source(self, query, parameters, partition_key, max_item_count):
+        page_size = max_item_count if max_item_count and max_item_count > 0 else 100
+
+        def get_next(token):
+            start = int(token or 0)
+            # One extra row tells us whether there is a next page
+            results, scanned, full_scan = run_query(self._documents_in(partition_key), query, parameters,
+                                                    start=start, count=page_size + 1)
+            page = results[:page_size]
+            # Charge the whole evaluation on the first page, transfer per page
+            charge = ChargeModel.query_base + sum(ChargeModel.size_kb(d) if isinstance(d, dict) else 0.01
+                                                  for d in page) * ChargeModel.query_per_returned_kb
+            if start == 0:
+                charge += scanned * (ChargeModel.query_per_scanned_doc if full_scan
+                                     else ChargeModel.query_per_indexed_doc)
+            next_token = str(start + page_size) if len(results) > page_size else None
+            self._respond("query", charge)
+            return next_token, page
+
+        def extract(response):
+            next_token, page = response
+            return next_token, iter(page)
+
+        return get_next, extract
+
+    def query_items(self, query, parameters=None, partition_key=None, enable_cross_partition_query=None,
+                    max_item_count=None, **kwargs):
+        get_next, extract = self._page_source(query, parameters, partition_key, max_item_count)
+        return ItemPaged(get_next, extract)
+
+    def read_all_items(self, max_item_count=None, **kwargs):
+        return self.query_items("SELECT * FROM c", max_item_count=max_item_count)
+
+    def read(self, **kwargs):
+        return {"id": self.id, "partitionKey": {"paths": [f"/{self.partition_key_field}"]}}
+
+    def __len__(self):
+        return len(self._documents)
+
+
+def _apply_patch(document, operation):
+    path = [part.replace("~1", "/").replace("~0", "~") for part in operation["path"].strip("/").split("/")]
+    parent = document
+    for part in path[:-1]:
+        if part not in parent:
+            raise exceptions.CosmosHttpResponseError(status_code=400, message=f"Path {operation['path']} not found")
+        parent = parent[part]
+    leaf = path[-1]
+    op = operation["op"]
+    if op in ("set", "add", "replace"):
+        if op == "replace" and leaf not in parent:
+            raise exceptions.CosmosHttpResponseError(status_code=400, message=f"Path {operation['path']} not found")
+        parent[leaf] = copy.deepcopy(operation["value"])
+    elif op == "remove":
+        parent.pop(leaf, None)
+    elif op == "incr":
+        parent[leaf] = parent.get(leaf, 0) + operation["value"]
+    else:
+        raise exceptions.CosmosHttpResponseError(status_code=400, message=f"Unsupported patch op {op}")
+
+
+class AsyncFakeContainer:
+    """azure.cosmos.aio flavour of FakeContainer - same storage, awaitable methods"""
+
+    def __init__(self, container):
+        self._container = container
+        self.id = container.id
+        self.client_connection = AsyncFakeClientConnection(container.client_connection)
+
+    def _run(self, function, *args, **kwargs):
+        local = self._container._local
+        local.async_call = True
+        try:
+            return function(*args, **kwargs)
+        finally:
+            local.async_call = False
+
+    async def _latency(self):
+        if self._container.latency_ms:
+            await asyncio.sleep(self._container.latency_ms / 1000.0)
+
+    def __getattr__(self, name):
+        method = getattr(self._container, name)
+
+        async def call(*args, **kwargs):
+            await self._latency()
+            return self._run(method, *args, **kwargs)
+        return call
+
+    def query_items(self, query, parameters=None, partition_key=None, max_item_count=None, **kwargs):
+        get_next, extract = self._container._page_source(query, parameters, partition_key, max_item_count)
+
+        async def get_next_async(token):
+            await self._latency()
+            return self._run(get_next, token)
+
+        async def extract_async(response):
+            next_token, page = response
+            return next_token, AsyncList(page)
+
+        return AsyncItemPaged(get_next_async, extract_async)
+
+    def read_all_items(self, max_item_count=None, **kwargs):
+        return self.query_items("SELECT * FROM c", max_item_count=max_item_count)
+
+
+class FakeDatabase:
+    def __init__(self, client, database_id, use_async=False):
+        self._client = client
+        self.id = database_id
+        self._async = use_async
+
+    def get_container_client(self, container_id):
+        container = self._client.container(self.id, container_id)
+        return AsyncFakeContainer(container) if self._async else container
+
+    def read(self, **kwargs):
+        result = {"id": self.id}
+        if self._async:
+            async def done():
+                return result
+            return done()
+        return result
+
+
+class FakeCosmosClient:
+    """Stand-in for azure.cosmos.CosmosClient (and the aio client via as_async())"""
+
+    def __init__(self, partition_keys=None, latency_ms=0.0, region="Local Fake"):
+        self.partition_keys = partition_keys or {}
+        self.latency_ms = latency_ms
+        self.region = region
+        self.client_connection = FakeClientConnection()
+        self._containers = {}
+        self._lock = threading.Lock()
+
+    def container(self, database_id, container_id):
+        with self._lock:
+            key = (database_id, container_id)
+            if key not in self._containers:
+                self._containers[key] = FakeContainer(
+                    container_id,
+                    self.partition_keys.get(container_id, "/id"),
+                    latency_ms=self.latency_ms,
+                    client_connection=self.client_connection,
+                )
+            return self._containers[key]
+
+    def get_database_client(self, database_id):
+        return FakeDatabase(self, database_id)
+
+    def get_database_account(self, **kwargs):
+        return type("DatabaseAccount", (), {
+            "ReadableLocations": [{"name": self.region, "databaseAccountEndpoint": "https://localhost/"}],
+            "WritableLocations": [{"name": self.region, "databaseAccountEndpoint": "https://localhost/"}],
+        })()
+
+    def as_async(self):
+        return AsyncFakeCosmosClient(self)
+
+    def close(self):
+        pass
+
+
+class AsyncFakeCosmosClient:
+    """Stand-in for azure.cosmos.aio.CosmosClient - no public get_database_account()"""
+
+    def __init__(self, client):
+        self._client = client
+        self.client_connection = AsyncFakeClientConnection(client.client_connection)
+
+    def get_database_client(self, database_id):
+        return FakeDatabase(self._client, database_id, use_async=True)
+
+    async def close(self):
+        pass
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+=============================================================================
+REPARTITION EMPLOYEES - populate /departmentId on existing documents
+=============================================================================
+The employees container is partitioned on /departmentId, but documents
+written before the API set that field all live in the single "undefined"
+logical partition. This script streams those documents into their proper
+partition while the app keeps serving traffic.
+
+Two modes:
+
+  In place (default): rewrites each legacy document into its departmentId
+  partition in the same container, then deletes the legacy copy if the API
+  has not changed it meanwhile (otherwise the next pass moves the newer
+  version). Documents drop out of the source query as they are migrated, so
+  a rerun simply picks up whatever is left.
+
+  Copy (--target-container): streams every document into another container
+  partitioned on /departmentId. Progress is checkpointed by continuation
+  token. Run again with --catch-up to copy documents changed since the first
+  pass started, then point CosmosDbContainerName at the new container.
+
+Throttled (429) requests are retried after the server's retry-after hint,
+and --max-docs-per-sec caps the write rate so the migration does not starve
+the live API of RU/s.
+
+Usage:
+    python repartition-employees.py --connection-string "<conn str>"
+    python repartition-employees.py --endpoint <url> --key <key> --target-container employees-v2
+    python repartition-employees.py --target-container employees-v2 --catch-up
+
+Credentials default to the same environment variables the Function App uses
+(CosmosDbConnectionString, CosmosDbEndpoint, CosmosDbKey).
+=============================================================================
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from azure.core import MatchConditions
+from azure.cosmos import PartitionKey, exceptions
+from azure.cosmos.partition_key import NonePartitionKeyValue
+
+# Share the departmentId derivation with the Function App
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app" / "backend"))
+from employee_model import PARTITION_KEY_FIELD, derive_department_id, strip_system_properties  # noqa: E402
+from cosmos_script_helpers import Colors, get_client, next_documents, print_color, request_charge, with_retry  # noqa: E402
+
+LEGACY_QUERY = f"SELECT * FROM c WHERE NOT IS_DEFINED(c.{PARTITION_KEY_FIELD})"
+COPY_QUERY = "SELECT * FROM c"
+CATCH_UP_QUERY = "SELECT * FROM c WHERE c._ts >= @since"
+
+
+class Progress:
+    """Checkpoint file plus running throughput counters."""
+
+    def __init__(self, path, mode):
+        self.path = Path(path)
+        self.state = {"mode": mode, "continuation": None, "migrated": 0, "pages": 0, "started_ts": None,
+                      "done": False}
+        if self.path.exists():
+            saved = json.loads(self.path.read_text())
+            if saved.get("mode") != mode:
+                print_color(Colors.RED, f"Checkpoint {self.path} belongs to a '{saved.get('mode')}' run, not '{mode}'")
+                sys.exit(1)
+            self.state.update(saved)
+            print_color(Colors.YELLOW, f"Resuming from checkpoint: {self.state['migrated']} documents already migrated")
+        if self.state["done"]:
+            print_color(Colors.GREEN, f"Checkpoint {self.path} is already complete - delete it to run again")
+            sys.exit(0)
+        if self.state["started_ts"] is None:
+            self.state["started_ts"] = int(time.time())
+        self.session_start = time.monotonic()
+        self.session_docs = 0
+        self.session_ru = 0.0
+
+    def save(self):
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2))
+        tmp.replace(self.path)
+
+    def finish(self):
+        self.state["done"] = True
+        self.save()
+
+    def record_page(self, count, request_charge, continuation=None):
+        self.state["migrated"] += count
+        self.state["pages"] += 1
+        self.state["continuation"] = continuation
+        self.session_docs += count
+        self.session_ru += request_charge
+        self.save()
+
+        elapsed = max(time.monotonic() - self.session_start, 1e-6)
+        print(f"  page {self.state['pages']}: {self.state['migrated']} migrated | "
+              f"{self.session_docs / elapsed:.1f} docs/s | {self.session_ru / elapsed:.1f} RU/s")
+
+
+class Throttle:
+    """Simple rate limiter for document writes."""
+
+    def __init__(self, max_per_second):
+        self.interval = 1.0 / max_per_second if max_per_second else 0
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self.next_slot > now:
+            time.sleep(self.next_slot - now)
+        self.next_slot = max(self.next_slot, now) + self.interval
+
+
+def prepare_document(document):
+    """Document body with departmentId derived from its department name."""
+    body = strip_system_properties(document)
+    body[PARTITION_KEY_FIELD] = derive_department_id(body.get("department"))
+    return body
+
+
+def write_page(target, documents, throttle):
+    """Upsert one page of documents into another container, returning the RU charge."""
+    charge = 0.0
+    for document in documents:
+        throttle.wait()
+        with_retry(lambda: target.upsert_item(body=prepare_document(document)))
+        charge += request_charge(target)
+    return charge
+
+
+def move_document(container, document):
+    """Move one legacy document into its partition, returning (moved, RU charge)."""
+    # Like the API's own moves (save_employee): never overwrite an existing copy, and only
+    # delete the legacy copy while it still has the ETag we read, so live updates are kept
+    body = prepare_document(document)
+    charge = 0.0
+    try:
+        created = with_retry(lambda: container.create_item(body=body))
+    except exceptions.CosmosResourceExistsError:
+        created = None  # Already moved (by the API or an earlier run) - keep that copy
+    charge += request_charge(container)
+
+    try:
+        with_retry(lambda: container.delete_item(
+            item=document["id"], partition_key=NonePartitionKeyValue,
+            etag=document["_etag"], match_condition=MatchConditions.IfNotModified
+        ))
+        charge += request_charge(container)
+    except exceptions.CosmosResourceNotFoundError:
+        pass  # The API moved or removed it after the page was read
+    except exceptions.CosmosAccessConditionFailedError:
+        # Updated after the page was read - drop our stale copy; the next pass moves the new version
+        charge += request_charge(container)
+        if created is not None:
+            try:
+                with_retry(lambda: container.delete_item(
+                    item=created["id"], partition_key=body[PARTITION_KEY_FIELD],
+                    etag=created["_etag"], match_condition=MatchConditions.IfNotModified
+                ))
+            except (exceptions.CosmosResourceNotFoundError, exceptions.CosmosAccessConditionFailedError):
+                pass
+        return False, charge
+    return created is not None, charge
+
+
+def move_page(container, documents, throttle):
+    """Move one page of legacy documents, returning (moved, RU charge)."""
+    moved, charge = 0, 0.0
+    for document in documents:
+        throttle.wait()
+        done, cost = move_document(container, document)
+        moved += done
+        charge += cost
+    return moved, charge
+
+
+def migrate_in_place(container, progress, page_size, throttle):
+    """Move legacy documents into their departmentId partition within one container."""
+    while True:
+        pages = container.query_items(query=LEGACY_QUERY, enable_cross_partition_query=True,
+                                      max_item_count=page_size).by_page()
+        documents = next_documents(pages)
+        if documents is None:
+            progress.finish()
+            return
+
+        moved, charge = move_page(container, documents, throttle)
+        progress.record_page(moved, charge)
+
+
+def migrate_copy(source, target, progress, page_size, throttle, since=None):
+    """Stream documents from the source into the target container, checkpointing each page."""
+    if since is None:
+        query, parameters = COPY_QUERY, None
+    else:
+        query, parameters = CATCH_UP_QUERY, [{"name": "@since", "value": since}]
+
+    pages = source.query_items(query=query, parameters=parameters, enable_cross_partition_query=True,
+                               max_item_count=page_size).by_page(progress.state["continuation"])
+    while True:
+        documents = next_documents(pages)
+        if documents is not None:
+            charge = write_page(target, documents, throttle)
+            progress.record_page(len(documents), charge, pages.continuation_token)
+        if documents is None or not pages.continuation_token:
+            progress.finish()
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Populate /departmentId and move employee documents into their partitions',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python repartition-employees.py
+  python repartition-employees.py --target-container employees-v2 --create-target
+  python repartition-employees.py --target-container employees-v2 --catch-up
+        """
+    )
+    parser.add_argument('--connection-string', help='Cosmos DB connection string')
+    parser.add_argument('--endpoint', help='Cosmos DB endpoint')
+    parser.add_argument('--key', help='Cosmos DB key')
+    parser.add_argument('--database', default=os.environ.get("CosmosDbDatabaseName", "employeedb"))
+    parser.add_argument('--source-container', default=os.environ.get("CosmosDbContainerName", "employees"))
+    parser.add_argument('--target-container', help='Copy into this container instead of migrating in place')
+    parser.add_argument('--create-target', action='store_true', help='Create the target container if missing')
+    parser.add_argument('--catch-up', action='store_true',
+                        help='Copy documents changed since the first copy pass started')
+    parser.add_argument('--page-size', type=int, default=100, help='Documents per page (default: 100)')
+    parser.add_argument('--max-docs-per-sec', type=float, default=0, help='Write rate cap (default: unlimited)')
+    parser.add_argument('--checkpoint', default='repartition-checkpoint.json', help='Checkpoint file path')
+
+    args = parser.parse_args()
+
+    client = get_client(args)
+    database = client.get_database_client(args.database)
+    source = database.get_container_client(args.source_container)
+    throttle = Throttle(args.max_docs_per_sec)
+
+    print_color(Colors.CYAN, "============================================")
+    print_color(Colors.CYAN, "Repartitioning employees on /departmentId")
+    print_color(Colors.CYAN, "============================================")
+
+    started = time.monotonic()
+    if args.target_container:
+        if args.create_target:
+            database.create_container_if_not_exists(
+                id=args.target_container, partition_key=PartitionKey(path=f"/{PARTITION_KEY_FIELD}"))
+        target = database.get_container_client(args.target_container)
+
+        if args.catch_up:
+            if not Path(args.checkpoint).exists():
+                print_color(Colors.RED, f"No copy checkpoint at {args.checkpoint} - run the copy pass first")
+                sys.exit(1)
+            since = json.loads(Path(args.checkpoint).read_text())["started_ts"]
+            progress = Progress(args.checkpoint + ".catch-up", "catch-up")
+            print(f"Copying documents changed since {since} into {args.target_container}...")
+            migrate_copy(source, target, progress, args.page_size, throttle, since=since)
+        else:
+            progress = Progress(args.checkpoint, "copy")
+            print(f"Copying {args.source_container} -> {args.target_container}...")
+            migrate_copy(source, target, progress, args.page_size, throttle)
+    else:
+        progress = Progress(args.checkpoint, "in-place")
+        print(f"Migrating legacy documents in {args.source_container}...")
+        migrate_in_place(source, progress, args.page_size, throttle)
+
+    elapsed = time.monotonic() - started
+    print_color(Colors.GREEN, f"\n✓ Done: {progress.session_docs} documents this run "
+                              f"({progress.state['migrated']} total) in {elapsed:.1f}s, "
+                              f"{progress.session_ru:.0f} RU")
+
+
+if __name__ == "__main__":
+    main()
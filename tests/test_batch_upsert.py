@@ -0,0 +1,91 @@
+"""Regression tests for POST /api/employees:batch?mode=upsert against scripts/fake_cosmos.py"""
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "app" / "backend"))
+sys.path.insert(0, str(ROOT / "scripts"))
+import azure.functions as func  # noqa: E402
+import function_app  # noqa: E402
+from fake_cosmos import FakeCosmosClient  # noqa: E402
+
+
+class BatchUpsertTests(unittest.TestCase):
+    mode = "async"
+
+    def setUp(self):
+        self.client = FakeCosmosClient(partition_keys={"employees": "/departmentId", "metadata": "/id"})
+        async_client = self.client.as_async()
+        self.patches = {
+            "build_cosmos_client": lambda use_async=False: async_client if use_async else self.client,
+            "COSMOS_CLIENT_MODE": self.mode,
+            "read_cache": function_app.ReadCache(function_app.READ_CACHE_MAX_BYTES, function_app.READ_CACHE_TTL_SECONDS),
+        }
+        self.saved = {name: getattr(function_app, name) for name in self.patches}
+        for name, value in self.patches.items():
+            setattr(function_app, name, value)
+        function_app.reset_cosmos_client()
+        with function_app._partition_index_lock:
+            function_app._partition_index.clear()
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(function_app, name, value)
+        function_app.reset_cosmos_client()
+        self.loop.close()
+
+    def call(self, handler, method, url, body=None, params=None):
+        request = func.HttpRequest(method, url, body=json.dumps(body).encode() if body is not None else b"",
+                                   params=params or {})
+        response = handler.build().get_user_function()(request)
+        if asyncio.iscoroutine(response):
+            response = self.loop.run_until_complete(response)
+        return response.status_code, json.loads(response.get_body() or b"null")
+
+    def documents(self, employee_id):
+        container = next(c for (_, name), c in self.client._containers.items() if name == "employees")
+        return [document for (_, document_id), document in container._documents.items() if document_id == employee_id]
+
+    def employee(self, department):
+        return {"id": "emp-1", "firstName": "Ada", "lastName": "Lovelace", "email": "ada@example.com",
+                "department": department}
+
+    def test_upsert_into_another_department_moves_the_employee(self):
+        status, _ = self.call(function_app.batch_employees, "POST", "/api/employees:batch", [self.employee("Sales")])
+        self.assertEqual(status, 201)
+        # A fresh worker: the partition index doesn't know where emp-1 lives
+        with function_app._partition_index_lock:
+            function_app._partition_index.clear()
+
+        status, body = self.call(function_app.batch_employees, "POST", "/api/employees:batch",
+                                 [self.employee("HR")], params={"mode": "upsert"})
+        self.assertEqual((status, body["succeeded"]), (200, 1))
+
+        documents = self.documents("emp-1")
+        self.assertEqual([document["departmentId"] for document in documents], ["hr"])
+
+        status, body = self.call(function_app.rebuild_departments, "POST", "/api/departments/rebuild")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["departments"], [{"name": "HR", "count": 1}])
+
+    def test_upsert_same_department_replaces_in_place(self):
+        self.call(function_app.batch_employees, "POST", "/api/employees:batch", [self.employee("Sales")])
+        updated = dict(self.employee("Sales"), position="Analyst")
+        status, _ = self.call(function_app.batch_employees, "POST", "/api/employees:batch", [updated],
+                              params={"mode": "upsert"})
+        self.assertEqual(status, 200)
+        documents = self.documents("emp-1")
+        self.assertEqual([(d["departmentId"], d["position"]) for d in documents], [("sales", "Analyst")])
+
+
+class SyncBatchUpsertTests(BatchUpsertTests):
+    mode = "sync"
+
+
+if __name__ == "__main__":
+    unittest.main()
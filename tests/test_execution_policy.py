@@ -0,0 +1,54 @@
+"""Regression tests for the Cosmos execution policy in app/backend/function_app.py"""
+
+import asyncio
+import sys
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app" / "backend"))
+import function_app  # noqa: E402
+
+
+class ThrottledError(Exception):
+    status_code = 429
+    headers = {"x-ms-retry-after-ms": "50"}
+    message = "Request rate is large"
+
+
+class ExecuteCosmosOperationTests(unittest.TestCase):
+    def run_past_deadline(self, operation):
+        """Run operation through execute_cosmos_operation after the request's retry budget ran out"""
+        async def run():
+            token = function_app._retry_deadline.set(time.monotonic() - 1)
+            try:
+                return await function_app.execute_cosmos_operation(operation, idempotent=True)
+            finally:
+                function_app._retry_deadline.reset(token)
+        return asyncio.run(run())
+
+    def test_call_after_deadline_still_runs(self):
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            return "ok"
+
+        self.assertEqual(self.run_past_deadline(operation), "ok")
+        self.assertEqual(len(calls), 1)
+
+    def test_throttled_call_after_deadline_is_not_retried(self):
+        calls = []
+
+        async def operation():
+            calls.append(1)
+            raise ThrottledError()
+
+        with self.assertRaises(function_app.CosmosBusyError) as raised:
+            self.run_past_deadline(operation)
+        self.assertEqual(raised.exception.status_code, 429)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
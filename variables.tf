@@ -86,6 +86,35 @@ variable "function_app_runtime_version" {
   default     = "3.11"
 }
 
+variable "cosmos_client_mode" {
+  description = "Cosmos DB client used by the API: async (azure.cosmos.aio) or sync (blocking client on worker threads)"
+  type        = string
+  default     = "async"
+
+  validation {
+    condition     = contains(["async", "sync"], var.cosmos_client_mode)
+    error_message = "cosmos_client_mode must be \"async\" or \"sync\"."
+  }
+}
+
+variable "read_cache_enabled" {
+  description = "Cache employee and department reads in each Function worker (set false to switch the cache off)"
+  type        = bool
+  default     = true
+}
+
+variable "read_cache_ttl_seconds" {
+  description = "How long a worker may serve a cached read before going back to Cosmos DB"
+  type        = number
+  default     = 30
+}
+
+variable "read_cache_stale_seconds" {
+  description = "How long past the TTL a worker may serve a cached read while one request refreshes it"
+  type        = number
+  default     = 30
+}
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Monitoring
 # ─────────────────────────────────────────────────────────────────────────────